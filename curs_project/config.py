@@ -8,9 +8,92 @@ DB_CONFIG = {
     "port": 3306,
 }
 
+DB_POOL_NAME = "auto_tracker"
+DB_POOL_SIZE = 5
+DB_POOL_TIMEOUT = 10
+DB_IDLE_PING_SECONDS = 60
+
+QUERY_WORKERS = 3
+# Server-side prepared statements kept open per connection
+PREPARED_CACHE_SIZE = 32
+DISPATCH_POLL_MS = 25
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ASSETS_DIR = os.path.join(BASE_DIR, "assets")
 os.makedirs(ASSETS_DIR, exist_ok=True)
+# Uploaded photos, by content: purchase_images.image_url holds
+# "sha256:<hex>.<ext>", stored as ASSET_STORE_DIR/<hex[:2]>/<hex[2:4]>/<hex>.<ext>
+ASSET_STORE_DIR = os.path.join(ASSETS_DIR, "store")
+ASSET_KEY_PREFIX = "sha256:"
+
+# Queries slower than this go to the rotating slow-query log
+SLOW_QUERY_MS = 200
+SLOW_QUERY_LOG = os.path.join(BASE_DIR, "logs", "slow_queries.log")
+SLOW_QUERY_LOG_BYTES = 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 3
+
+TABLE_PAGE_SIZE = 50
+TABLE_PAGE_SIZES = (25, 50, 100, 200)
+
+# Must match the server's ngram_token_size (MySQL default is 2)
+SEARCH_NGRAM_SIZE = 2
+SEARCH_DEBOUNCE_MS = 250
+
+# Card grid: rows have a fixed height so the grid can tell which purchases
+# are on screen without laying out the rest
+CARD_COLUMNS = 3
+CARD_ROW_HEIGHT = 390
+CARD_OVERSCAN_ROWS = 1
+# Cards are fetched a page at a time; the next page is requested once the
+# viewport is within CARD_PREFETCH_ROWS rows of the end
+CARD_PAGE_SIZE = 60
+CARD_PREFETCH_ROWS = 2
+
+# Long lists are built in slices of at most this many ms of Tk time, so the
+# first rows show up at once and the window keeps handling input
+RENDER_CHUNK_MS = 30
+
+# Optional local mode of the admin cards screen: the purchases are kept in
+# memory and filtered there; changed rows are re-fetched at most this often
+PURCHASE_STORE_LOCAL = False
+PURCHASE_STORE_REFRESH_SECONDS = 30
+
+# Display sizes of purchase photos
+CARD_PHOTO_SIZE = (260, 160)
+CAROUSEL_PHOTO_SIZE = (500, 300)
+# Photos on each side of the current one decoded ahead in the carousel
+CAROUSEL_PREFETCH = 2
+
+# Background image loading
+IMAGE_WORKERS = 4
+IMAGE_FETCH_TIMEOUT = 15
+
+# Remote photos: connections kept per host, at most this many requests to
+# one host at a time; cached thumbnails are revalidated after a day and
+# failing URLs are skipped with exponential backoff (the most recent
+# HTTP_FAILURE_CACHE_SIZE of them are remembered)
+HTTP_PER_HOST_LIMIT = 2
+HTTP_MAX_IDLE_PER_HOST = 2
+HTTP_REVALIDATE_SECONDS = 24 * 60 * 60
+HTTP_FAILURE_BACKOFF = 30
+HTTP_FAILURE_BACKOFF_MAX = 60 * 60
+HTTP_FAILURE_CACHE_SIZE = 1000
+
+# Ready-to-show thumbnails persisted between runs
+THUMB_CACHE_DIR = os.path.join(BASE_DIR, "cache", "thumbnails")
+THUMB_CACHE_MAX_BYTES = 200 * 1024 * 1024
+THUMB_CACHE_QUALITY = 85
+# How often the index of the thumbnail cache is written to disk
+THUMB_CACHE_FLUSH_MS = 30 * 1000
+
+# Decoded images and PhotoImages kept in memory for the whole session
+IMAGE_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Uploaded photos: EXIF orientation applied, metadata dropped, longest side
+# capped; the display sizes go to the thumbnail cache at upload time
+INGEST_MAX_SIDE = 2048
+INGEST_QUALITY = 88
+INGEST_VARIANTS = (CARD_PHOTO_SIZE, CAROUSEL_PHOTO_SIZE)
 
 CANVAS_WIDTH = 800
 CANVAS_HEIGHT = 450
@@ -1,5 +1,23 @@
 # Database package initialization
 from .connection import safe_connect
+from .instrumentation import (QueryStats, InstrumentedCursor, get_query_stats, instrument,
+                              calling_screen, tagged_screen)
 from .db_init import DatabaseInitializer
+from .pool import ConnectionPool, get_pool
+from .schema import SchemaCatalog, get_schema_catalog
+from .reference_data import ReferenceData, REFERENCE_TABLES, get_reference_data
+from .paging import KeysetPager, OffsetPager
+from .image_summary import refresh_image_summary
+from .migrations import MIGRATIONS, LATEST_VERSION, apply_migrations
+from .search import search_clause, search_matches, search_narrows
+from .repository import (PurchaseRepository, PurchaseFilter, PURCHASE_TABLE_QUERY,
+                         get_purchase_repository)
+from .purchase_store import PurchaseStore, PurchaseRows, get_purchase_store
 
-__all__ = ['safe_connect', 'DatabaseInitializer']
\ No newline at end of file
+__all__ = ['safe_connect', 'QueryStats', 'InstrumentedCursor', 'get_query_stats', 'instrument', 'calling_screen', 'tagged_screen',
+           'DatabaseInitializer', 'ConnectionPool', 'get_pool', 'SchemaCatalog', 'get_schema_catalog',
+           'ReferenceData', 'REFERENCE_TABLES', 'get_reference_data', 'KeysetPager', 'OffsetPager',
+           'refresh_image_summary', 'MIGRATIONS', 'LATEST_VERSION', 'apply_migrations',
+           'search_clause', 'search_matches', 'search_narrows',
+           'PurchaseRepository', 'PurchaseFilter', 'PURCHASE_TABLE_QUERY', 'get_purchase_repository',
+           'PurchaseStore', 'PurchaseRows', 'get_purchase_store']
\ No newline at end of file
@@ -1,12 +1,9 @@
-import mysql.connector
-from mysql.connector import Error
 from tkinter import messagebox
-from config import DB_CONFIG
+from .pool import get_pool
 
 def safe_connect():
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
-        return conn
+        return get_pool().acquire()
     except Exception as e:
         messagebox.showerror("Помилка БД", f"Не вдалося підключитися: {e}")
         return None
\ No newline at end of file
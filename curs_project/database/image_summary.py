@@ -0,0 +1,30 @@
+# purchases.image_count / purchases.cover_image_id are maintained copies of
+# what used to be correlated subqueries on purchase_images. Call this after
+# any write to purchase_images (same transaction), or with no ids to rebuild
+# every purchase. Touched purchases get a new updated_at even when the count
+# and cover stay the same (e.g. the cover's URL changed), so the purchase
+# store's incremental refresh picks them up.
+def refresh_image_summary(cursor, purchase_ids=None):
+    query = """
+        UPDATE purchases p
+        SET p.image_count = (
+                SELECT COUNT(*) FROM purchase_images i
+                WHERE i.purchase_id = p.purchase_id
+            ),
+            p.cover_image_id = (
+                SELECT i.image_id FROM purchase_images i
+                WHERE i.purchase_id = p.purchase_id
+                ORDER BY i.image_type, i.uploaded_at, i.image_id
+                LIMIT 1
+            )
+    """
+    if purchase_ids is None:
+        cursor.execute(query)
+        return
+
+    ids = sorted({int(pid) for pid in purchase_ids if pid not in (None, "")})
+    if not ids:
+        return
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(query + f", p.updated_at = CURRENT_TIMESTAMP WHERE p.purchase_id IN ({placeholders})",
+                   tuple(ids))
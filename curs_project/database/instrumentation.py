@@ -0,0 +1,248 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+from config import SLOW_QUERY_MS, SLOW_QUERY_LOG, SLOW_QUERY_LOG_BYTES, SLOW_QUERY_LOG_BACKUPS
+
+_DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_UI_DIR = os.path.join(os.path.dirname(_DATABASE_DIR), "ui")
+# Plumbing between a screen and the cursor, never the "caller" itself
+_SKIP_FILES = {
+    os.path.join(_DATABASE_DIR, "instrumentation.py"),
+    os.path.join(_DATABASE_DIR, "pool.py"),
+    os.path.join(_DATABASE_DIR, "repository.py"),
+    os.path.join(_UI_DIR, "background.py"),
+    os.path.join(_UI_DIR, "search.py"),
+}
+_APP_FILE = os.path.join(_UI_DIR, "app.py")
+
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%s|%\(\w+\)s|\?")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+_logger = logging.getLogger("auto_tracker.db")
+_screen = threading.local()
+
+
+# Same statement shape -> same fingerprint, whatever the literal values.
+def fingerprint(sql):
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PLACEHOLDER_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def _screen_name(code):
+    qualname = getattr(code, "co_qualname", code.co_name)
+    outer = qualname.split(".<locals>.")[0]
+    parts = outer.split(".")
+    if code.co_filename == _APP_FILE and not parts[-1].startswith("__"):
+        # EnhancedAutoTrackerApp._show_admin_dashboard -> _show_admin_dashboard
+        return parts[-1]
+    # Widgets and everything else: the class (ModernCRUDDialog) or function
+    return parts[0] if len(parts) > 1 else outer
+
+
+# The innermost UI frame on the stack names the screen; background jobs are
+# closures defined inside the screen method, so they resolve the same way.
+# QueryExecutor resolves it once per job (see tagged_screen), so the stack is
+# only walked per statement for queries run directly on the Tk thread.
+def calling_screen():
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        code = frame.f_code
+        filename = code.co_filename
+        if filename not in _SKIP_FILES:
+            if filename.startswith(_UI_DIR):
+                return _screen_name(code)
+            if fallback is None:
+                fallback = _screen_name(code)
+        frame = frame.f_back
+    return fallback or "?"
+
+
+# Statements run inside are credited to `screen` without a stack walk
+class tagged_screen:
+    def __init__(self, screen):
+        self.screen = screen
+
+    def __enter__(self):
+        self._previous = getattr(_screen, "name", None)
+        _screen.name = self.screen
+        return self
+
+    def __exit__(self, *exc):
+        _screen.name = self._previous
+        return False
+
+
+def current_screen():
+    return getattr(_screen, "name", None) or calling_screen()
+
+
+class QueryStats:
+    def __init__(self, slow_ms=SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._logger = None
+
+    def _slow_logger(self):
+        if self._logger is None:
+            logger = logging.getLogger("auto_tracker.slow_queries")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            if not logger.handlers:
+                os.makedirs(os.path.dirname(SLOW_QUERY_LOG), exist_ok=True)
+                handler = RotatingFileHandler(
+                    SLOW_QUERY_LOG, maxBytes=SLOW_QUERY_LOG_BYTES,
+                    backupCount=SLOW_QUERY_LOG_BACKUPS, encoding="utf-8"
+                )
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                logger.addHandler(handler)
+            self._logger = logger
+        return self._logger
+
+    def record(self, sql, screen, seconds, rows, failed=False):
+        fp = fingerprint(sql)
+        ms = seconds * 1000
+        with self._lock:
+            entry = self._stats.get((screen, fp))
+            if entry is None:
+                entry = self._stats[(screen, fp)] = {
+                    "screen": screen, "fingerprint": fp, "calls": 0, "errors": 0,
+                    "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                }
+            entry["calls"] += 1
+            entry["errors"] += 1 if failed else 0
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["rows"] += rows
+
+        if ms >= self.slow_ms:
+            try:
+                self._slow_logger().info("%.1f ms  rows=%d  screen=%s  %s", ms, rows, screen, fp)
+            except OSError as e:
+                _logger.warning("Не вдалося записати журнал повільних запитів: %s", e)
+
+    def summary(self):
+        with self._lock:
+            entries = [dict(entry) for entry in self._stats.values()]
+        for entry in entries:
+            entry["avg_ms"] = entry["total_ms"] / entry["calls"] if entry["calls"] else 0.0
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+_stats = QueryStats()
+
+
+def get_query_stats():
+    return _stats
+
+
+# Cursor proxy: a statement is timed from execute() until its result set is
+# exhausted (or the cursor closed, or the next statement started), so the
+# transfer of unbuffered rows is included and every fetched row is counted.
+# Statements without a result set are recorded as soon as execute() returns.
+class InstrumentedCursor:
+    def __init__(self, cursor, stats=None):
+        self._cursor = cursor
+        self._stats = stats or _stats
+        self._pending = None
+        self._rows = 0
+
+    def _start(self, operation):
+        self._finish()
+        self._pending = (operation, current_screen(), time.perf_counter())
+        self._rows = 0
+
+    def _finish(self, rows=0, failed=False):
+        if self._pending is None:
+            return
+        operation, screen, started = self._pending
+        self._pending = None
+        self._stats.record(operation, screen, time.perf_counter() - started,
+                           self._rows + rows, failed)
+
+    def _affected(self):
+        rowcount = getattr(self._cursor, "rowcount", -1)
+        return rowcount if rowcount and rowcount > 0 else 0
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._start(operation)
+        try:
+            if params is None:
+                result = self._cursor.execute(operation, *args, **kwargs)
+            else:
+                result = self._cursor.execute(operation, params, *args, **kwargs)
+        except Exception:
+            self._finish(failed=True)
+            raise
+        if self._cursor.description is None:
+            self._finish(self._affected())
+        return result
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        self._start(operation)
+        try:
+            result = self._cursor.executemany(operation, seq_params, *args, **kwargs)
+        except Exception:
+            self._finish(failed=True)
+            raise
+        self._finish(self._affected())
+        return result
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._finish(len(rows))
+        return rows
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        if rows:
+            self._rows += len(rows)
+        else:
+            self._finish()
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def instrument(cursor):
+    return InstrumentedCursor(cursor)
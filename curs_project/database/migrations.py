@@ -0,0 +1,125 @@
+import logging
+from .image_summary import refresh_image_summary
+from .seed import seed_reference_data
+from .instrumentation import instrument
+
+_logger = logging.getLogger("auto_tracker.db")
+
+
+# Schema changes after the base tables of DatabaseInitializer._create_tables.
+# Steps run in version order, each at most once per database (recorded in
+# schema_version). MySQL commits DDL implicitly, so every step must also be
+# safe to re-run after a half-finished attempt.
+
+def _column_exists(cursor, table, column):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+    """, (table, column))
+    return cursor.fetchone()[0] > 0
+
+
+def _index_exists(cursor, table, index):
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s
+    """, (table, index))
+    return cursor.fetchone()[0] > 0
+
+
+def _create_index(cursor, table, index, columns):
+    if not _index_exists(cursor, table, index):
+        cursor.execute(f"CREATE INDEX `{index}` ON `{table}` ({columns})")
+
+
+def _add_image_summary(cursor):
+    if not _column_exists(cursor, "purchases", "image_count"):
+        cursor.execute("ALTER TABLE purchases ADD COLUMN image_count INT NOT NULL DEFAULT 0")
+    if not _column_exists(cursor, "purchases", "cover_image_id"):
+        cursor.execute("ALTER TABLE purchases ADD COLUMN cover_image_id INT NULL")
+    refresh_image_summary(cursor)
+
+
+def _add_list_indexes(cursor):
+    # Card lists and the table view: ORDER BY purchase_date DESC, purchase_id DESC
+    _create_index(cursor, "purchases", "idx_purchases_date", "purchase_date, purchase_id")
+    # "Мої покупки"
+    _create_index(cursor, "purchases", "idx_purchases_buyer_date", "buyer_id, purchase_date, purchase_id")
+    # Late cars on the admin dashboard
+    _create_index(cursor, "purchases", "idx_purchases_delivery", "is_delivered, estimated_arrival_date")
+    # Carousel and cover image lookup
+    _create_index(cursor, "purchase_images", "idx_images_purchase_type",
+                  "purchase_id, image_type, uploaded_at")
+
+
+def _add_search_indexes(cursor):
+    # VINs and model names are not words; with stopwords on, ngram tokens
+    # that happen to be stopwords ("at", "in", ...) would never match.
+    cursor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+    if not _index_exists(cursor, "purchases", "ft_purchases_search"):
+        cursor.execute("""
+            ALTER TABLE purchases
+            ADD FULLTEXT INDEX ft_purchases_search (vin_number, car_make, car_model)
+            WITH PARSER ngram
+        """)
+    # Prefix LIKE for one-character input
+    _create_index(cursor, "purchases", "idx_purchases_vin", "vin_number")
+    _create_index(cursor, "purchases", "idx_purchases_make", "car_make")
+    _create_index(cursor, "purchases", "idx_purchases_model", "car_model")
+
+
+def _add_purchase_updated_at(cursor):
+    # Lets the in-memory purchase store fetch only rows changed since its
+    # last refresh
+    if not _column_exists(cursor, "purchases", "updated_at"):
+        cursor.execute("""
+            ALTER TABLE purchases ADD COLUMN updated_at TIMESTAMP NOT NULL
+            DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        """)
+    _create_index(cursor, "purchases", "idx_purchases_updated", "updated_at")
+
+
+MIGRATIONS = [
+    (1, "purchases.image_count / cover_image_id", _add_image_summary),
+    (2, "indexes for list screens", _add_list_indexes),
+    (3, "reference data and demo users", seed_reference_data),
+    (4, "search indexes on VIN, make and model", _add_search_indexes),
+    (5, "purchases.updated_at", _add_purchase_updated_at),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """)
+
+
+def current_version(cursor):
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def apply_migrations(conn):
+    cursor = instrument(conn.cursor())
+    ensure_version_table(cursor)
+    version = current_version(cursor)
+
+    applied = []
+    for number, description, step in MIGRATIONS:
+        if number <= version:
+            continue
+        step(cursor)
+        cursor.execute("INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                       (number, description))
+        conn.commit()
+        _logger.info("🛠️ Міграція %s: %s", number, description)
+        applied.append(number)
+
+    cursor.close()
+    return applied
@@ -0,0 +1,176 @@
+from collections import namedtuple
+
+# offset: only set by OffsetPager
+PageRequest = namedtuple("PageRequest", "action sql params reverse offset", defaults=(None,))
+
+
+# Keyset ("seek") pagination: every page is fetched with a WHERE on the sort
+# key of the previous page's edge row instead of OFFSET, so the cost of a page
+# does not depend on how deep the user has paged.
+class KeysetPager:
+    supports_last = True
+
+    def __init__(self, base_query, key_columns, descending=False, page_size=50):
+        # key_columns: [(sql_expression, result_column), ...], most significant first
+        self.base_query = base_query
+        self.key_exprs = [expr for expr, _ in key_columns]
+        self.key_names = [name for _, name in key_columns]
+        self.descending = descending
+        self.page_size = page_size
+
+        self.page_number = None
+        self.first_key = None
+        self.last_key = None
+        self.has_prev = False
+        self.has_next = False
+        self.last_request = None
+
+    def _order_by(self, reverse):
+        desc = self.descending != reverse
+        direction = "DESC" if desc else "ASC"
+        return ", ".join(f"{expr} {direction}" for expr in self.key_exprs)
+
+    def _seek(self, values, forward):
+        # Rows strictly after `values` in the requested scan direction,
+        # expanded as (a > x) OR (a = x AND b > y) so MySQL can range-scan.
+        op = "<" if self.descending == forward else ">"
+        parts = []
+        params = []
+        for i, expr in enumerate(self.key_exprs):
+            conds = [f"{self.key_exprs[j]} = %s" for j in range(i)] + [f"{expr} {op} %s"]
+            parts.append("(" + " AND ".join(conds) + ")")
+            params.extend(values[:i + 1])
+        return "(" + " OR ".join(parts) + ")", params
+
+    def _build(self, action, where, params, reverse):
+        sql = self.base_query
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {self._order_by(reverse)} LIMIT %s"
+        return PageRequest(action, sql, list(params) + [self.page_size + 1], reverse)
+
+    def request(self, action, value=None):
+        if action == "next" and self.last_key is not None:
+            where, params = self._seek(self.last_key, forward=True)
+            return self._build(action, where, params, False)
+        if action == "prev" and self.first_key is not None:
+            where, params = self._seek(self.first_key, forward=False)
+            return self._build(action, where, params, True)
+        if action == "last":
+            return self._build(action, None, [], True)
+        if action == "jump" and value not in (None, ""):
+            op = "<=" if self.descending else ">="
+            return self._build(action, f"{self.key_exprs[0]} {op} %s", [value], False)
+        return self._build("first", None, [], False)
+
+    def refresh_request(self):
+        return self.last_request or self.request("first")
+
+    def accept(self, request, rows, cols, refresh=False):
+        # Returns the rows to show, or None when paging ran off either end
+        # (the current page stays as it is).
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if request.reverse:
+            rows = list(reversed(rows))
+
+        if refresh:
+            key_index = [cols.index(name) for name in self.key_names]
+            if rows:
+                self.first_key = [rows[0][i] for i in key_index]
+                self.last_key = [rows[-1][i] for i in key_index]
+            if request.reverse:
+                self.has_prev = more
+            else:
+                self.has_next = more
+            return rows
+
+        if not rows and request.action in ("next", "prev"):
+            if request.action == "next":
+                self.has_next = False
+            else:
+                self.has_prev = False
+            return None
+
+        key_index = [cols.index(name) for name in self.key_names]
+        if rows:
+            self.first_key = [rows[0][i] for i in key_index]
+            self.last_key = [rows[-1][i] for i in key_index]
+        else:
+            self.first_key = self.last_key = None
+
+        if request.action == "first":
+            self.page_number = 1
+            self.has_prev, self.has_next = False, more
+        elif request.action == "next":
+            self.page_number = self.page_number + 1 if self.page_number else None
+            self.has_prev, self.has_next = True, more
+        elif request.action == "prev":
+            self.page_number = self.page_number - 1 if self.page_number else None
+            self.has_prev, self.has_next = more, True
+            if not more:
+                self.page_number = 1
+        elif request.action == "last":
+            self.page_number = None
+            self.has_prev, self.has_next = more, False
+        else:
+            self.page_number = None
+            self.has_prev, self.has_next = True, more
+
+        self.last_request = request
+        return rows
+
+
+# LIMIT/OFFSET paging for tables without a primary key: seeking on a column
+# that is not unique would skip the rows sharing a value across a page edge.
+# Same interface as KeysetPager; "jump" takes a page number and there is no
+# "last" (it would need a COUNT first).
+class OffsetPager:
+    supports_last = False
+    key_names = ["Сторінка"]
+
+    def __init__(self, base_query, page_size=50):
+        self.base_query = base_query
+        self.page_size = page_size
+
+        self.page_number = None
+        self.first_key = None
+        self.last_key = None
+        self.has_prev = False
+        self.has_next = False
+        self.last_request = None
+
+    def _build(self, action, page):
+        offset = max(page - 1, 0) * self.page_size
+        sql = f"{self.base_query} LIMIT %s OFFSET %s"
+        return PageRequest(action, sql, [self.page_size + 1, offset], False, offset)
+
+    def request(self, action, value=None):
+        current = self.page_number or 1
+        if action == "next":
+            return self._build(action, current + 1)
+        if action == "prev":
+            return self._build(action, current - 1)
+        if action == "jump":
+            try:
+                return self._build(action, int(value))
+            except (TypeError, ValueError):
+                pass
+        return self._build("first", 1)
+
+    def refresh_request(self):
+        return self.last_request or self.request("first")
+
+    # Returns the rows to show, or None when the page is past the end
+    def accept(self, request, rows, cols, refresh=False):
+        more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if not rows and request.offset > 0 and not refresh:
+            self.has_next = False
+            return None
+
+        self.page_number = request.offset // self.page_size + 1
+        self.has_prev = request.offset > 0
+        self.has_next = more
+        self.last_request = request
+        return rows
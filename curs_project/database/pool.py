@@ -0,0 +1,124 @@
+import threading
+import time
+from contextlib import contextmanager
+from mysql.connector import pooling
+from mysql.connector.errors import InterfaceError, PoolError
+from .instrumentation import instrument
+from config import DB_CONFIG, DB_POOL_NAME, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_IDLE_PING_SECONDS
+
+
+# Drop-in replacement for a mysql.connector connection: after a long idle
+# period it pings (and reconnects) before handing out a cursor, so sessions
+# dropped by the server's wait_timeout recover. close() returns it to the pool.
+class ManagedConnection:
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+        self._last_used = time.monotonic()
+
+    def _ensure_alive(self):
+        if self._raw is None:
+            self._raw = self._pool._checkout()
+        elif time.monotonic() - self._last_used > DB_IDLE_PING_SECONDS:
+            self._raw.ping(reconnect=True, attempts=3, delay=1)
+        self._last_used = time.monotonic()
+        return self._raw
+
+    # Underlying pooled connection; identity changes only when this
+    # ManagedConnection is released and re-acquired.
+    def raw_connection(self):
+        return self._ensure_alive()
+
+    def cursor(self, *args, **kwargs):
+        return instrument(self._ensure_alive().cursor(*args, **kwargs))
+
+    # A closed connection has no transaction left to end
+    def _current(self):
+        if self._raw is None:
+            raise InterfaceError("З'єднання вже повернуто до пулу")
+        self._last_used = time.monotonic()
+        return self._raw
+
+    def commit(self):
+        self._current().commit()
+
+    def rollback(self):
+        self._current().rollback()
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool._release(raw)
+
+    def __getattr__(self, name):
+        return getattr(self._ensure_alive(), name)
+
+
+class ConnectionPool:
+    def __init__(self, config, size=DB_POOL_SIZE, name=DB_POOL_NAME):
+        # Sessions carry no state we rely on, so skip COM_RESET_CONNECTION
+        # on every return to the pool. The config is set separately: passed
+        # to the constructor it would open all `size` connections up front.
+        self._pool = pooling.MySQLConnectionPool(
+            pool_name=name,
+            pool_size=size,
+            pool_reset_session=False
+        )
+        self._pool.set_config(**config)
+        self._size = size
+        self._opened = 0
+        self._grow_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    # A free slot always has an idle connection behind it once `size`
+    # connections exist, so the pool only grows while it is smaller.
+    def _get_connection(self):
+        while True:
+            try:
+                return self._pool.get_connection()
+            except PoolError:
+                with self._grow_lock:
+                    if self._opened >= self._size:
+                        raise
+                    self._pool.add_connection()
+                    self._opened += 1
+
+    def _checkout(self, timeout=DB_POOL_TIMEOUT):
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolError("Пул з'єднань вичерпано")
+        try:
+            # get_connection() pings the pooled session and reconnects it
+            # if the server has closed it in the meantime.
+            return self._get_connection()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, raw):
+        try:
+            raw.close()
+        finally:
+            self._slots.release()
+
+    def acquire(self, timeout=DB_POOL_TIMEOUT):
+        return ManagedConnection(self, self._checkout(timeout))
+
+    @contextmanager
+    def connection(self, timeout=DB_POOL_TIMEOUT):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DB_CONFIG)
+        return _pool
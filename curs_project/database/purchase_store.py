@@ -0,0 +1,403 @@
+import datetime
+import threading
+import time
+from array import array
+from collections.abc import Sequence
+from itertools import islice
+from decimal import Decimal
+from config import PURCHASE_STORE_REFRESH_SECONDS, SEARCH_NGRAM_SIZE
+from .reference_data import REFERENCE_TABLES
+from .repository import PURCHASE_CARDS_QUERY, get_purchase_repository
+from .search import search_terms, SEARCH_COLUMNS
+
+# Joined names come from these tables
+_SOURCE_TABLES = REFERENCE_TABLES + ("users",)
+
+# How each column is kept. Anything not listed stays a plain list.
+_KINDS = {
+    "purchase_id": "int", "buyer_id": "int", "country_id": "int", "auction_id": "int",
+    "location_id": "int", "status_id": "int", "car_year": "int", "image_count": "int",
+    "cover_image_id": "int",
+    "price_usd": "money",
+    "purchase_date": "date", "estimated_arrival_date": "date",
+    "updated_at": "datetime",
+    "is_delivered": "bool", "has_images": "bool",
+    "car_make": "text", "car_model": "text", "country_name": "text", "auction_name": "text",
+    "location_name": "text", "status_name": "text", "status_key": "text", "username": "text",
+    "port_name": "text",
+}
+
+# Columns with a position bitmap per value
+_INDEXED = ("buyer_id", "status_key", "country_name", "car_year")
+_FACETS = ("status_key", "country_name", "car_year")
+
+_NULL = -2 ** 63
+_NULLS = {"text": 0, "date": 0, "bool": -1, "int": _NULL, "money": _NULL, "datetime": _NULL,
+          "str": None}
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+
+def _mask(positions, size):
+    bits = bytearray(b"0" * size)
+    for pos in positions:
+        bits[size - 1 - pos] = 0x31
+    return int(bits, 2) if size else 0
+
+
+def _iter_bits(mask):
+    bits = bin(mask)[:1:-1]
+    pos = bits.find("1")
+    while pos != -1:
+        yield pos
+        pos = bits.find("1", pos + 1)
+
+
+class _Column:
+    def __init__(self, kind):
+        self.kind = kind
+        if kind == "text":
+            # Interned: the array holds codes into `strings`, 0 is NULL
+            self.values = array("I")
+            self.strings = [None]
+            self.codes = {}
+        elif kind == "date":
+            self.values = array("i")
+        elif kind == "bool":
+            self.values = array("b")
+        elif kind in ("int", "money", "datetime"):
+            self.values = array("q")
+        else:
+            self.values = []
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(value)
+            self.codes[value] = code
+        return code
+
+    def encode(self, value):
+        if value is None:
+            return _NULLS[self.kind]
+        if self.kind == "text":
+            return self.code(value)
+        if self.kind == "int":
+            return int(value)
+        if self.kind == "money":
+            return int((Decimal(value) * 100).to_integral_value())
+        if self.kind == "date":
+            return value.toordinal()
+        if self.kind == "datetime":
+            return int((value - _EPOCH).total_seconds())
+        if self.kind == "bool":
+            return 1 if value else 0
+        return value
+
+    # `values` is an earlier array of this column (see PurchaseRows)
+    def get(self, i, values=None):
+        raw = (self.values if values is None else values)[i]
+        if self.kind == "text":
+            return self.strings[raw]
+        if self.kind == "str":
+            return raw
+        if self.kind == "bool":
+            return None if raw == -1 else bool(raw)
+        if self.kind == "date":
+            return datetime.date.fromordinal(raw) if raw else None
+        if raw == _NULL:
+            return None
+        if self.kind == "money":
+            return Decimal(raw).scaleb(-2)
+        if self.kind == "datetime":
+            return _EPOCH + datetime.timedelta(seconds=raw)
+        return raw
+
+    def append(self, value):
+        self.values.append(self.encode(value))
+
+    def set(self, i, value):
+        self.values[i] = self.encode(value)
+
+    # Later writes go to a private copy; results of find() keep the old one
+    def detach(self):
+        self.values = self.values[:]
+
+    def reorder(self, order):
+        values = [self.values[i] for i in order]
+        self.values = array(self.values.typecode, values) if isinstance(self.values, array) else values
+
+
+# Column-oriented copy of the purchases working set for the admin cards
+# screen. Every column is a typed array (ints, cents, date ordinals) or an
+# array of codes into a per-column string table, kept in display order
+# (purchase_date DESC, purchase_id DESC). Buyer, status, country and year
+# also get one bitmap (a Python int, bit = position) per value, so a filter
+# is a few big-int ANDs and a facet count a popcount; text search results
+# are cached as bitmaps too. Rows changed since the last refresh are fetched
+# by purchases.updated_at, deleted rows are noticed by comparing counts.
+class PurchaseStore:
+    def __init__(self, refresh_seconds=PURCHASE_STORE_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._names = None
+        self._columns = {}
+        self._alive = array("b")
+        self._positions = {}  # purchase_id -> position
+        self._search = []  # lowercased (vin, make, model) per position
+        self._size = 0
+        self._masks = {}
+        self._text_masks = {}
+        self._watermark = None
+        self._refreshed = None
+
+    @property
+    def loaded(self):
+        with self._lock:
+            return self._names is not None
+
+    def fresh(self):
+        with self._lock:
+            return (self._refreshed is not None and
+                    time.monotonic() - self._refreshed < self.refresh_seconds)
+
+    # A write to purchases (or its images, see refresh_image_summary) only
+    # makes the next use refresh incrementally. Joined names do not touch
+    # purchases.updated_at, so a write to a joined table drops everything.
+    def invalidate(self, table=None):
+        with self._lock:
+            if table in ("purchases", "purchase_images"):
+                self._refreshed = None
+            elif table is None or table in _SOURCE_TABLES:
+                self._reset()
+
+    def _fetch(self, conn, where="", params=()):
+        repository = get_purchase_repository()
+        [(now,)], _ = repository.execute(conn, "SELECT NOW()")
+        rows, cols = repository.execute(conn, PURCHASE_CARDS_QUERY + where, params)
+        return now, rows, cols
+
+    # Returns (position, indexed values before the update), the latter None
+    # for a new row.
+    def _put(self, values):
+        item = dict(zip(self._names, values))
+        pid = item["purchase_id"]
+        pos = self._positions.get(pid)
+        old = None
+        if pos is None:
+            pos = len(self._alive)
+            self._positions[pid] = pos
+            for name, column in self._columns.items():
+                column.append(item[name])
+            self._alive.append(1)
+            self._search.append(None)
+        else:
+            old = {name: self._columns[name].values[pos] for name in _INDEXED + ("purchase_date",)}
+            for name, column in self._columns.items():
+                column.set(pos, item[name])
+            self._alive[pos] = 1
+        self._search[pos] = tuple(str(item.get(col) or "").lower() for col in SEARCH_COLUMNS)
+        return pos, old
+
+    # Rows updated in place only move their own bits between bitmaps. False
+    # when a row is new or its date changed (its position is wrong now),
+    # which takes a _compact().
+    def _patch(self, changes):
+        dates = self._columns["purchase_date"].values
+        for pos, old in changes:
+            if old is None or old["purchase_date"] != dates[pos]:
+                return False
+
+        for pos, old in changes:
+            bit = 1 << pos
+            for name in _INDEXED:
+                value = self._columns[name].values[pos]
+                if value == old[name]:
+                    continue
+                masks = self._masks[name]
+                masks[old[name]] &= ~bit
+                if not masks[old[name]]:
+                    del masks[old[name]]
+                masks[value] = masks.get(value, 0) | bit
+        if changes:
+            self._text_masks = {}
+        return True
+
+    # Drops deleted rows, puts the rest back in display order and rebuilds
+    # the bitmaps.
+    def _compact(self):
+        dates = self._columns["purchase_date"].values
+        ids = self._columns["purchase_id"].values
+        alive = self._alive
+        order = sorted((i for i in range(len(alive)) if alive[i]),
+                       key=lambda i: (dates[i], ids[i]), reverse=True)
+
+        for column in self._columns.values():
+            column.reorder(order)
+        self._search = [self._search[i] for i in order]
+        self._size = len(order)
+        self._alive = array("b", [1]) * self._size
+        self._positions = {pid: pos for pos, pid in enumerate(self._columns["purchase_id"].values)}
+
+        self._masks = {}
+        for name in _INDEXED:
+            groups = {}
+            for pos, value in enumerate(self._columns[name].values):
+                groups.setdefault(value, []).append(pos)
+            self._masks[name] = {value: _mask(positions, self._size)
+                                 for value, positions in groups.items()}
+        self._text_masks = {}
+
+    def load(self, conn):
+        now, rows, cols = self._fetch(conn)
+        with self._lock:
+            self._reset()
+            self._names = cols
+            self._columns = {name: _Column(_KINDS.get(name, "str")) for name in cols}
+            for values in rows:
+                self._put(values)
+            self._compact()
+            self._watermark = now
+            self._refreshed = time.monotonic()
+
+    def refresh(self, conn):
+        with self._lock:
+            watermark = self._watermark
+        if watermark is None:
+            self.load(conn)
+            return
+
+        repository = get_purchase_repository()
+        now, rows, cols = self._fetch(conn, " WHERE p.updated_at >= %s", (watermark,))
+        [(total,)], _ = repository.execute(conn, "SELECT COUNT(*) FROM purchases")
+        with self._lock:
+            if cols != self._names:
+                # Columns changed (migration while the app was running)
+                reload = True
+            else:
+                reload = False
+                if rows:
+                    for column in self._columns.values():
+                        column.detach()
+                changes = [self._put(values) for values in rows]
+                deleted = sum(self._alive) != total
+        if reload:
+            self.load(conn)
+            return
+
+        existing = None
+        if deleted:
+            ids, _ = repository.execute(conn, "SELECT purchase_id FROM purchases")
+            existing = {row[0] for row in ids}
+
+        with self._lock:
+            if existing is not None:
+                for pid, pos in self._positions.items():
+                    if pid not in existing:
+                        self._alive[pos] = 0
+            if deleted or not self._patch(changes):
+                self._compact()
+            self._watermark = now
+            self._refreshed = time.monotonic()
+
+    def _text_mask(self, text):
+        terms = [t.lower() for t in search_terms(text)]
+        key = " ".join(terms)
+        mask = self._text_masks.get(key)
+        if mask is not None:
+            return mask
+
+        long_terms = [t for t in terms if len(t) >= SEARCH_NGRAM_SIZE]
+        if long_terms:
+            hits = (pos for pos, values in enumerate(self._search)
+                    if all(any(t in v for v in values) for t in long_terms))
+        else:
+            prefix = terms[0]
+            hits = (pos for pos, values in enumerate(self._search)
+                    if any(v.startswith(prefix) for v in values))
+        mask = _mask(hits, self._size)
+        self._text_masks[key] = mask
+        return mask
+
+    # Bitmap per active filter of `spec`
+    def _filter_masks(self, spec):
+        masks = {}
+        if spec.buyer_id is not None:
+            masks["buyer_id"] = self._masks["buyer_id"].get(int(spec.buyer_id), 0)
+        if spec.status_key is not None:
+            code = self._columns["status_key"].codes.get(spec.status_key)
+            masks["status_key"] = self._masks["status_key"].get(code, 0)
+        if spec.country_name is not None:
+            code = self._columns["country_name"].codes.get(spec.country_name)
+            masks["country_name"] = self._masks["country_name"].get(code, 0)
+        if spec.car_year is not None:
+            masks["car_year"] = self._masks["car_year"].get(int(spec.car_year), 0)
+        if search_terms(spec.search or ""):
+            masks["search"] = self._text_mask(spec.search)
+        return masks
+
+    def _combined(self, masks, skip=None):
+        mask = (1 << self._size) - 1
+        for name, value in masks.items():
+            if name != skip:
+                mask &= value
+        return mask
+
+    # Rows matching `spec` in display order, or None before the first load.
+    def find(self, spec, limit=None):
+        with self._lock:
+            if self._names is None:
+                return None
+            positions = _iter_bits(self._combined(self._filter_masks(spec)))
+            return PurchaseRows(self._columns, array("I", islice(positions, limit)))
+
+    # Counts per status_key / country_name / car_year among the rows that
+    # pass every *other* filter, i.e. what picking that value would show.
+    def facets(self, spec):
+        with self._lock:
+            if self._names is None:
+                return None
+            masks = self._filter_masks(spec)
+            counts = {}
+            for name in _FACETS:
+                others = self._combined(masks, skip=name)
+                strings = getattr(self._columns[name], "strings", None)
+                bucket = {}
+                for value, mask in self._masks[name].items():
+                    count = bin(mask & others).count("1")
+                    if count:
+                        bucket[strings[value] if strings else value] = count
+                counts[name] = bucket
+            return counts
+
+
+# A find() result: row dicts are only built when read, so a screen that
+# shows a few cards of thousands pays for those few. It holds the column
+# arrays as they were: a refresh copies them before writing (see
+# _Column.detach) and _compact() builds new ones, so positions stay valid
+# and rows keep the values they were found with.
+class PurchaseRows(Sequence):
+    def __init__(self, columns, positions):
+        self._columns = [(name, column, column.values) for name, column in columns.items()]
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._row(pos) for pos in self._positions[index]]
+        return self._row(self._positions[index])
+
+    def _row(self, pos):
+        return {name: column.get(pos, values) for name, column, values in self._columns}
+
+
+_store = PurchaseStore()
+
+
+def get_purchase_store():
+    return _store
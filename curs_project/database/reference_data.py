@@ -0,0 +1,104 @@
+import threading
+from .pool import get_pool
+
+REFERENCE_TABLES = ("countries", "statuses", "auctions", "locations", "ports")
+
+_PRIMARY_KEYS = {
+    "countries": "country_id",
+    "statuses": "status_id",
+    "auctions": "auction_id",
+    "locations": "location_id",
+    "ports": "port_id",
+}
+
+
+# In-process copy of the small lookup tables. Loaded once, served from memory
+# and dropped whenever one of REFERENCE_TABLES is written through the app.
+class ReferenceData:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+
+    def load(self, conn):
+        cur = conn.cursor(dictionary=True)
+        rows = {}
+        for table in REFERENCE_TABLES:
+            cur.execute(f"SELECT * FROM `{table}` ORDER BY `{_PRIMARY_KEYS[table]}`")
+            rows[table] = cur.fetchall()
+        cur.close()
+
+        by_id = {
+            table: {row[_PRIMARY_KEYS[table]]: row for row in table_rows}
+            for table, table_rows in rows.items()
+        }
+
+        locations_by_country = {}
+        for loc in sorted(rows["locations"], key=lambda r: r["location_name"]):
+            locations_by_country.setdefault(loc["country_id"], []).append(
+                (loc["location_id"], loc["location_name"])
+            )
+
+        data = {
+            "rows": rows,
+            "by_id": by_id,
+            "countries": sorted(rows["countries"], key=lambda r: r["country_name"]),
+            "statuses": sorted(rows["statuses"], key=lambda r: r["order_index"]),
+            "status_keys": {str(r["status_key"]): int(r["status_id"]) for r in rows["statuses"]},
+            "locations_by_country": locations_by_country,
+        }
+
+        with self._lock:
+            self._data = data
+        return data
+
+    # With `conn` the data is reloaded on it straight away, so readers (often
+    # executor jobs that already hold a pooled connection) never need a
+    # second connection to fill it.
+    def invalidate(self, table=None, conn=None):
+        if table is not None and table not in REFERENCE_TABLES:
+            return
+        with self._lock:
+            self._data = None
+        if conn is not None:
+            self.load(conn)
+
+    # The app loads the data at login; a connection of its own is only taken
+    # when nothing has (scripts, a failed reload).
+    def _get(self):
+        with self._lock:
+            data = self._data
+        if data is None:
+            with get_pool().connection() as conn:
+                data = self.load(conn)
+        return data
+
+    def rows(self, table):
+        return list(self._get()["rows"][table])
+
+    def get(self, table, row_id):
+        return self._get()["by_id"][table].get(row_id)
+
+    def country_names(self):
+        return [row["country_name"] for row in self._get()["countries"]]
+
+    def statuses(self):
+        return list(self._get()["statuses"])
+
+    def status_key_map(self):
+        return dict(self._get()["status_keys"])
+
+    def locations_for_country(self, country_id):
+        return list(self._get()["locations_by_country"].get(country_id, []))
+
+    def location(self, location_id):
+        return self.get("locations", location_id)
+
+    def port(self, port_id):
+        return self.get("ports", port_id)
+
+
+_reference_data = ReferenceData()
+
+
+def get_reference_data():
+    return _reference_data
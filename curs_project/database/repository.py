@@ -0,0 +1,199 @@
+import threading
+import weakref
+from collections import namedtuple, OrderedDict
+from mysql.connector import Error
+from config import PREPARED_CACHE_SIZE, CARD_PAGE_SIZE
+from .search import search_clause
+from .instrumentation import instrument
+
+# Server gone away, lost connection during query, unknown prepared
+# statement handler: the session (and its statements) is gone
+_LOST_CONNECTION = (2006, 2013)
+_UNKNOWN_STATEMENT = 1243
+
+# Any field left as None is not filtered on.
+PurchaseFilter = namedtuple(
+    "PurchaseFilter", "buyer_id status_key country_name car_year search",
+    defaults=(None, None, None, None, None)
+)
+
+PURCHASE_CARDS_QUERY = """
+    SELECT p.*, c.country_name, a.auction_name, l.location_name,
+           s.status_name, s.status_key, u.username, port.port_name,
+           p.image_count > 0 as has_images,
+           ci.image_url as first_image_path
+    FROM purchases p
+    LEFT JOIN purchase_images ci ON ci.image_id = p.cover_image_id
+    LEFT JOIN countries c ON p.country_id = c.country_id
+    LEFT JOIN auctions a ON p.auction_id = a.auction_id
+    LEFT JOIN locations l ON p.location_id = l.location_id
+    LEFT JOIN statuses s ON p.status_id = s.status_id
+    LEFT JOIN users u ON p.buyer_id = u.id
+    LEFT JOIN locations loc ON p.location_id = loc.location_id
+    LEFT JOIN ports port ON loc.default_port_id = port.port_id
+"""
+
+PURCHASE_TABLE_QUERY = """
+    SELECT p.*, c.country_name, a.auction_name, l.location_name,
+           s.status_name, u.username,
+           p.image_count > 0 as has_images
+    FROM purchases p
+    LEFT JOIN countries c ON p.country_id = c.country_id
+    LEFT JOIN auctions a ON p.auction_id = a.auction_id
+    LEFT JOIN locations l ON p.location_id = l.location_id
+    LEFT JOIN statuses s ON p.status_id = s.status_id
+    LEFT JOIN users u ON p.buyer_id = u.id
+"""
+
+PURCHASE_ORDER = " ORDER BY p.purchase_date DESC, p.purchase_id DESC"
+# Rows after (purchase_date, purchase_id) in PURCHASE_ORDER, written out so
+# MySQL range-scans idx_purchases_date / idx_purchases_buyer_date
+PURCHASE_SEEK = " AND (p.purchase_date < %s OR (p.purchase_date = %s AND p.purchase_id < %s))"
+
+_BOOL_COLUMNS = ("has_images", "is_delivered")
+
+
+def _normalise(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8")
+    return value
+
+
+def _typed_row(cols, row):
+    item = {col: _normalise(value) for col, value in zip(cols, row)}
+    for col in _BOOL_COLUMNS:
+        if col in item and item[col] is not None:
+            item[col] = bool(item[col])
+    return item
+
+
+# Builds the purchase list queries from a PurchaseFilter and runs them as
+# server-side prepared statements. A prepared cursor is kept per distinct SQL
+# text per physical connection (not per checkout, whose wrapper is new every
+# time), so each filter combination is parsed and planned once per
+# connection and afterwards only executed.
+class PurchaseRepository:
+    def __init__(self, cache_size=PREPARED_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cursors = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _physical(conn):
+        raw = conn.raw_connection()
+        # PooledMySQLConnection wraps the connection for one checkout
+        return getattr(raw, "_cnx", raw)
+
+    def _cursor(self, raw, sql):
+        with self._lock:
+            cache = self._cursors.setdefault(raw, OrderedDict())
+            cur = cache.pop(sql, None)
+        if cur is None:
+            cur = instrument(raw.cursor(prepared=True))
+
+        with self._lock:
+            cache[sql] = cur
+            while len(cache) > self.cache_size:
+                _, old = cache.popitem(last=False)
+                try:
+                    old.close()
+                except Error:
+                    pass
+        return cur
+
+    def _forget(self, raw, sql):
+        with self._lock:
+            cur = self._cursors.get(raw, {}).pop(sql, None)
+        if cur is not None:
+            try:
+                cur.close()
+            except Error:
+                pass
+
+    def _forget_all(self, raw):
+        with self._lock:
+            cache = self._cursors.pop(raw, None)
+        for cur in (cache or {}).values():
+            try:
+                cur.close()
+            except Error:
+                pass
+
+    def execute(self, conn, sql, params=()):
+        raw = self._physical(conn)
+        params = tuple(params)
+        try:
+            cur = self._cursor(raw, sql)
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        except Error as e:
+            # The statement handles die with the session (reconnect after a
+            # ping, server restart): reconnect if needed and prepare once
+            # more. Any other error is the query's own.
+            if e.errno in _LOST_CONNECTION:
+                self._forget_all(raw)
+                raw.reconnect(attempts=1, delay=0)
+            elif e.errno == _UNKNOWN_STATEMENT:
+                self._forget(raw, sql)
+            else:
+                raise
+            raw = self._physical(conn)
+            cur = self._cursor(raw, sql)
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+        cols = [description[0] for description in cur.description]
+        rows = [tuple(_normalise(v) for v in row) for row in rows]
+        return rows, cols
+
+    # `after`: (purchase_date, purchase_id) of the last row already shown
+    def build(self, spec, limit=None, after=None):
+        sql = PURCHASE_CARDS_QUERY + " WHERE 1=1"
+        params = []
+
+        if spec.buyer_id is not None:
+            sql += " AND p.buyer_id = %s"
+            params.append(spec.buyer_id)
+        if spec.status_key is not None:
+            sql += " AND s.status_key = %s"
+            params.append(spec.status_key)
+        if spec.country_name is not None:
+            sql += " AND c.country_name = %s"
+            params.append(spec.country_name)
+        if spec.car_year is not None:
+            sql += " AND p.car_year = %s"
+            params.append(int(spec.car_year))
+        if spec.search:
+            search_sql, search_params = search_clause(spec.search)
+            if search_sql:
+                sql += f" AND {search_sql}"
+                params.extend(search_params)
+        if after is not None:
+            sql += PURCHASE_SEEK
+            params.extend([after[0], after[0], after[1]])
+
+        sql += PURCHASE_ORDER
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(int(limit))
+        return sql, params
+
+    def find(self, conn, spec, limit=None, after=None):
+        sql, params = self.build(spec, limit, after)
+        rows, cols = self.execute(conn, sql, params)
+        return [_typed_row(cols, row) for row in rows]
+
+    # One page of cards plus the cursor for the next one (None at the end).
+    def find_page(self, conn, spec, after=None, page_size=CARD_PAGE_SIZE):
+        items = self.find(conn, spec, limit=page_size + 1, after=after)
+        if len(items) <= page_size:
+            return items, None
+        items = items[:page_size]
+        last = items[-1]
+        return items, (last["purchase_date"], last["purchase_id"])
+
+
+_repository = PurchaseRepository()
+
+
+def get_purchase_repository():
+    return _repository
@@ -0,0 +1,92 @@
+import threading
+from .pool import get_pool
+
+
+def _text(value):
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode("utf-8")
+    return value
+
+
+# Column, primary key and foreign key metadata for every table of the current
+# database, introspected in a single pass and kept until invalidate() is
+# called (i.e. until the schema changes).
+class SchemaCatalog:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = None
+
+    def load(self, conn):
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME, COLUMN_TYPE, IS_NULLABLE,
+                   COLUMN_KEY, COLUMN_DEFAULT, EXTRA
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """)
+        tables = {}
+        for row in cur.fetchall():
+            table, field, coltype, null, key, default, extra = [_text(v) for v in row]
+            info = tables.setdefault(table, {"columns": [], "primary_key": None, "foreign_keys": {}})
+            info["columns"].append((field, coltype, null, key, default, extra))
+
+        cur.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME, CONSTRAINT_NAME,
+                   REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE()
+            AND (CONSTRAINT_NAME = 'PRIMARY' OR REFERENCED_TABLE_NAME IS NOT NULL)
+            ORDER BY TABLE_NAME, CONSTRAINT_NAME, ORDINAL_POSITION
+        """)
+        for row in cur.fetchall():
+            table, column, constraint, ref_table, ref_column = [_text(v) for v in row]
+            info = tables.get(table)
+            if info is None:
+                continue
+            if constraint == "PRIMARY":
+                if info["primary_key"] is None:
+                    info["primary_key"] = column
+            else:
+                info["foreign_keys"].setdefault(column, (ref_table, ref_column))
+        cur.close()
+
+        with self._lock:
+            self._tables = tables
+        return tables
+
+    def invalidate(self):
+        with self._lock:
+            self._tables = None
+
+    # The app loads the catalog at login; a connection of its own is only
+    # taken when nothing has (scripts).
+    def _table(self, table):
+        with self._lock:
+            tables = self._tables
+        if tables is None:
+            with get_pool().connection() as conn:
+                tables = self.load(conn)
+        return tables.get(table, {"columns": [], "primary_key": None, "foreign_keys": {}})
+
+    def columns(self, table):
+        return list(self._table(table)["columns"])
+
+    def column_names(self, table):
+        return [col[0] for col in self._table(table)["columns"]]
+
+    def primary_key(self, table):
+        return self._table(table)["primary_key"]
+
+    def is_foreign_key(self, table, column):
+        return column in self._table(table)["foreign_keys"]
+
+    def foreign_key(self, table, column):
+        return self._table(table)["foreign_keys"].get(column, (None, None))
+
+
+_catalog = SchemaCatalog()
+
+
+def get_schema_catalog():
+    return _catalog
@@ -0,0 +1,60 @@
+from config import SEARCH_NGRAM_SIZE
+
+# Must match the column list of the ft_purchases_search index (migration 4).
+SEARCH_COLUMNS = ("vin_number", "car_make", "car_model")
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_terms(text):
+    terms = [t.replace('"', "") for t in text.split()]
+    return [t for t in terms if t]
+
+
+# WHERE fragment for the VIN / make / model search box. Terms of at least
+# SEARCH_NGRAM_SIZE characters go through the FULLTEXT ngram index as
+# required phrases (substring match, case-insensitive via the collation);
+# shorter input falls back to an indexed prefix LIKE.
+def search_clause(text, alias="p"):
+    terms = search_terms(text)
+    if not terms:
+        return None, []
+
+    long_terms = [t for t in terms if len(t) >= SEARCH_NGRAM_SIZE]
+    if long_terms:
+        columns = ", ".join(f"{alias}.{col}" for col in SEARCH_COLUMNS)
+        against = " ".join(f'+"{t}"' for t in long_terms)
+        return f"MATCH({columns}) AGAINST (%s IN BOOLEAN MODE)", [against]
+
+    prefix = _escape_like(terms[0]) + "%"
+    clause = " OR ".join(f"{alias}.{col} LIKE %s" for col in SEARCH_COLUMNS)
+    return f"({clause})", [prefix] * len(SEARCH_COLUMNS)
+
+
+# Python mirror of search_clause() for rows that are already in memory.
+def search_matches(row, text):
+    terms = search_terms(text)
+    if not terms:
+        return True
+
+    values = [str(row.get(col) or "").lower() for col in SEARCH_COLUMNS]
+    long_terms = [t.lower() for t in terms if len(t) >= SEARCH_NGRAM_SIZE]
+    if long_terms:
+        return all(any(t in v for v in values) for t in long_terms)
+
+    prefix = terms[0].lower()
+    return any(v.startswith(prefix) for v in values)
+
+
+# True when every row matching `text` also matches `previous`, i.e. the
+# result for `previous` can be filtered locally instead of re-queried.
+# Prefix mode ("a" -> "ab") does not qualify: "ab" also matches mid-word.
+def search_narrows(previous, text):
+    if not text.startswith(previous):
+        return False
+    terms = search_terms(previous)
+    if not terms:
+        return True
+    return any(len(t) >= SEARCH_NGRAM_SIZE for t in terms)
@@ -0,0 +1,91 @@
+from werkzeug.security import generate_password_hash
+
+
+# Lookup rows and the two demo accounts. Every block checks for existing rows
+# first, so running this against an already seeded database changes nothing.
+def seed_reference_data(cursor):
+    cursor.execute("SELECT COUNT(*) FROM statuses")
+    if cursor.fetchone()[0] == 0:
+        statuses = [
+            ('bought_auction', 'Авто щойно куплено на аукціоні', 1),
+            ('paid', 'Оплачено', 2),
+            ('to_port', 'Їде в порт', 3),
+            ('at_port', 'В порту', 4),
+            ('in_sea', 'У морі', 5),
+            ('in_klaipeda', 'У Клайпеді', 6),
+            ('to_ukraine', 'Їде в Україну', 7),
+            ('cleared_customs', 'Розмитнено', 8),
+            ('in_ukraine', 'В Україні', 9)
+        ]
+        cursor.executemany("INSERT INTO statuses (status_key, status_name, order_index) VALUES (%s, %s, %s)", statuses)
+
+    cursor.execute("SELECT COUNT(*) FROM countries")
+    if cursor.fetchone()[0] == 0:
+        countries = [
+            ('Сполучені Штати Америки',),
+            ('Японія',),
+            ('Німеччина',),
+            ('Китай',),
+            ('Литва',),
+            ('Польща',)
+        ]
+        cursor.executemany("INSERT INTO countries (country_name) VALUES (%s)", countries)
+
+    cursor.execute("SELECT country_id, country_name FROM countries")
+    country_map = {name: id for id, name in cursor.fetchall()}
+
+    cursor.execute("SELECT COUNT(*) FROM ports")
+    if cursor.fetchone()[0] == 0:
+        ports = [
+            ('Baltimore', country_map['Сполучені Штати Америки'], 14),
+            ('Yokohama', country_map['Японія'], 16),
+            ('Hamburg', country_map['Німеччина'], 2),
+            ('Shanghai', country_map['Китай'], 20),
+            ('Klaipėda', country_map['Литва'], 0),
+            ('Gdynia', country_map['Польща'], 1)
+        ]
+        cursor.executemany("INSERT INTO ports (port_name, country_id, delivery_to_europe_days) VALUES (%s, %s, %s)", ports)
+
+    cursor.execute("SELECT port_id, port_name FROM ports")
+    port_map = {name: id for id, name in cursor.fetchall()}
+
+    cursor.execute("SELECT COUNT(*) FROM auctions")
+    if cursor.fetchone()[0] == 0:
+        auctions = [
+            ('Copart USA', country_map['Сполучені Штати Америки']),
+            ('IAAI USA', country_map['Сполучені Штати Америки']),
+            ('USS Japan', country_map['Японія']),
+            ('Autorola Germany', country_map['Німеччина']),
+            ('Copart China', country_map['Китай']),
+            ('Baltic Auctions LT', country_map['Литва'])
+        ]
+        cursor.executemany("INSERT INTO auctions (auction_name, country_id) VALUES (%s, %s)", auctions)
+
+    cursor.execute("SELECT COUNT(*) FROM locations")
+    if cursor.fetchone()[0] == 0:
+        locations = [
+            ('Маямі (США)', country_map['Сполучені Штати Америки'], port_map['Baltimore'], 3),
+            ('Лос-Анджелес (США)', country_map['Сполучені Штати Америки'], port_map['Baltimore'], 5),
+            ('Токіо (Японія)', country_map['Японія'], port_map['Yokohama'], 1),
+            ('Берлін (Німеччина)', country_map['Німеччина'], port_map['Hamburg'], 1),
+            ('Шанхай (Китай)', country_map['Китай'], port_map['Shanghai'], 2),
+            ('Вільнюс (Литва)', country_map['Литва'], port_map['Klaipėda'], 1),
+            ('Варшава (Польща)', country_map['Польща'], port_map['Gdynia'], 1)
+        ]
+        cursor.executemany("INSERT INTO locations (location_name, country_id, default_port_id, days_to_port) VALUES (%s, %s, %s, %s)", locations)
+
+    cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'demo_user'")
+    if cursor.fetchone()[0] == 0:
+        demo_password = generate_password_hash("demo123")
+        cursor.execute("""
+            INSERT INTO users (username, password_hash, role, phone, email) 
+            VALUES (%s, %s, %s, %s, %s)
+        """, ("demo_user", demo_password, "admin", "+380123456789", "demo@autotracker.com"))
+
+    cursor.execute("SELECT COUNT(*) FROM users WHERE username = 'user1'")
+    if cursor.fetchone()[0] == 0:
+        user_password = generate_password_hash("user123")
+        cursor.execute("""
+            INSERT INTO users (username, password_hash, role, phone, email) 
+            VALUES (%s, %s, %s, %s, %s)
+        """, ("user1", user_password, "user", "+380987654321", "user1@autotracker.com"))
@@ -1,5 +1,7 @@
+import logging
 from ui.app import EnhancedAutoTrackerApp
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = EnhancedAutoTrackerApp()
     app.mainloop()
\ No newline at end of file
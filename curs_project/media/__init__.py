@@ -0,0 +1,14 @@
+# Media package initialization
+from .assets import AssetStore, get_asset_store, is_asset_key
+from .http import FetchError, FetchResult, HttpFetcher, get_http_fetcher
+from .decode import resolve_source, open_image, load_thumbnail, decode_thumbnail, shrink
+from .thumb_cache import ThumbnailCache, get_thumbnail_cache, cached_thumbnail
+from .memory_cache import ImageMemoryCache, get_image_memory_cache, thumbnail, load_photo
+from .loader import ImageLoader
+from .ingest import ingest_image
+
+__all__ = ['AssetStore', 'get_asset_store', 'is_asset_key', 'FetchError', 'FetchResult',
+           'HttpFetcher', 'get_http_fetcher', 'resolve_source', 'open_image', 'load_thumbnail',
+           'decode_thumbnail', 'shrink', 'ThumbnailCache', 'get_thumbnail_cache', 'cached_thumbnail',
+           'ImageMemoryCache', 'get_image_memory_cache', 'thumbnail', 'load_photo', 'ImageLoader',
+           'ingest_image']
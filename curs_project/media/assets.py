@@ -0,0 +1,85 @@
+import hashlib
+import os
+import re
+import threading
+from config import ASSET_STORE_DIR, ASSET_KEY_PREFIX
+from .files import atomic_write
+
+_KEY_RE = re.compile(r"^" + re.escape(ASSET_KEY_PREFIX) + r"([0-9a-f]{64})(\.[a-z0-9]{1,5})?$")
+_EXT_RE = re.compile(r"^\.[a-z0-9]{1,5}$")
+
+
+def is_asset_key(value):
+    return bool(value) and _KEY_RE.match(value) is not None
+
+
+# Photos stored once per content. The key names the file, so resolving it is
+# a path join (no probing) and a key never needs cache revalidation; the
+# same photo uploaded twice is stored once. Paths under the root do not
+# depend on where the project is checked out.
+# A file is shared by every row with that content, so it is only removed
+# through remove_unused(), which checks for rows and for uploads that have
+# stored the content but not committed their row yet (pinned keys).
+class AssetStore:
+    def __init__(self, root=ASSET_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._pins = {}
+
+    def path(self, key):
+        match = _KEY_RE.match(key)
+        if match is None:
+            raise ValueError(f"Невірний ключ фото: {key}")
+        digest, ext = match.group(1), match.group(2) or ""
+        return os.path.join(self.root, digest[:2], digest[2:4], digest + ext)
+
+    # (key, True) when the content was new, (key, False) when already stored.
+    # An extension a key cannot carry (".backup1", ".jpg~") is left off.
+    # With `pin`, the caller calls release(key) once its row is committed.
+    def put_bytes(self, data, ext, pin=False):
+        ext = ext.lower()
+        if not _EXT_RE.match(ext):
+            ext = ""
+        key = f"{ASSET_KEY_PREFIX}{hashlib.sha256(data).hexdigest()}{ext}"
+        path = self.path(key)
+        with self._lock:
+            if pin:
+                self._pins[key] = self._pins.get(key, 0) + 1
+            if os.path.exists(path):
+                return key, False
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, data)
+            return key, True
+
+    def release(self, key):
+        with self._lock:
+            count = self._pins.pop(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+
+    def put_file(self, source):
+        with open(source, "rb") as f:
+            data = f.read()
+        return self.put_bytes(data, os.path.splitext(source)[1])
+
+    def remove(self, key):
+        try:
+            os.remove(self.path(key))
+            return True
+        except OSError:
+            return False
+
+    # is_used() checks for rows with this key; it must read committed data
+    # (a new transaction), as a pin is released only after the commit.
+    def remove_unused(self, key, is_used):
+        with self._lock:
+            if self._pins.get(key) or is_used():
+                return False
+            return self.remove(key)
+
+
+_store = AssetStore()
+
+
+def get_asset_store():
+    return _store
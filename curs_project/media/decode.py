@@ -0,0 +1,68 @@
+import io
+import os
+from PIL import Image
+from config import ASSETS_DIR
+from .http import get_http_fetcher
+from .assets import is_asset_key, get_asset_store
+
+
+# image_url values in purchase_images are asset store keys, http(s) URLs
+# or, from before the asset store, absolute paths and paths relative to
+# assets/. Returns ("file", path), ("url", url) or None. Keys resolve
+# without touching the disk.
+def resolve_source(source):
+    if not source:
+        return None
+    if is_asset_key(source):
+        return "file", get_asset_store().path(source)
+    if os.path.exists(source):
+        return "file", source
+    if source.startswith(("http://", "https://")):
+        return "url", source
+    alt = os.path.join(ASSETS_DIR, source)
+    if os.path.exists(alt):
+        return "file", alt
+    return None
+
+
+# Opened lazily: nothing is decoded until the caller loads or resizes it.
+def _open(source):
+    resolved = resolve_source(source)
+    if resolved is None:
+        return None
+    kind, location = resolved
+    if kind == "url":
+        return Image.open(io.BytesIO(get_http_fetcher().fetch(location).body))
+    return Image.open(location)
+
+
+def open_image(source):
+    pil = _open(source)
+    if pil is not None:
+        pil.load()
+    return pil
+
+
+# Shrinks a not yet loaded image to fit `size`. JPEGs are decoded straight
+# at 1/2, 1/4 or 1/8 scale (draft mode) when that still covers the box,
+# other formats are box-reduced by whole factors first; LANCZOS only does
+# the last, at most 2x, step. A 12 MP photo for a 260x160 card never gets
+# decoded at full size.
+def shrink(pil, size):
+    if pil.format == "JPEG":
+        pil.draft(None, size)
+    pil.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return pil
+
+
+# Safe to call from any thread: PIL only, no Tk objects.
+def load_thumbnail(source, size):
+    pil = _open(source)
+    if pil is None:
+        return None
+    return shrink(pil, size)
+
+
+# Thumbnail of an already downloaded image body.
+def decode_thumbnail(data, size):
+    return shrink(Image.open(io.BytesIO(data)), size)
@@ -0,0 +1,172 @@
+import http.client
+import ssl
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from urllib.parse import urlsplit, urljoin
+from config import (IMAGE_FETCH_TIMEOUT, HTTP_PER_HOST_LIMIT, HTTP_MAX_IDLE_PER_HOST,
+                    HTTP_FAILURE_BACKOFF, HTTP_FAILURE_BACKOFF_MAX, HTTP_FAILURE_CACHE_SIZE)
+
+# body is None when the server answered 304 to a conditional request;
+# validators carry the URL that answered, the only one they are sent to
+FetchResult = namedtuple("FetchResult", "url body validators not_modified")
+
+_REDIRECTS = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 5
+
+
+class FetchError(Exception):
+    pass
+
+
+# One fetcher for every remote photo: keep-alive connections per host, a cap
+# on parallel requests per host (auction CDNs throttle), conditional GETs
+# from stored ETag / Last-Modified, and a negative cache so a dead URL is
+# not retried on every render.
+class HttpFetcher:
+    def __init__(self, timeout=IMAGE_FETCH_TIMEOUT, per_host=HTTP_PER_HOST_LIMIT,
+                 max_idle=HTTP_MAX_IDLE_PER_HOST, max_failures=HTTP_FAILURE_CACHE_SIZE):
+        self.timeout = timeout
+        self.per_host = per_host
+        self.max_idle = max_idle
+        self.max_failures = max_failures
+        # Same trust settings the app has always used for photo URLs
+        self._ssl = ssl._create_unverified_context()
+        self._lock = threading.Lock()
+        self._idle = {}
+        self._slots = {}
+        self._failures = OrderedDict()  # url -> (failure count, retry not before), oldest first
+
+    def _host_slots(self, host):
+        with self._lock:
+            if host not in self._slots:
+                self._slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._slots[host]
+
+    # (connection, whether it was idle in the pool)
+    def _take(self, host):
+        with self._lock:
+            idle = self._idle.get(host)
+            if idle:
+                return idle.pop(), True
+        scheme, netloc = host
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl), False
+        return http.client.HTTPConnection(netloc, timeout=self.timeout), False
+
+    def _give_back(self, host, conn):
+        with self._lock:
+            idle = self._idle.setdefault(host, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _request(self, url, headers):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise FetchError(f"Непідтримувана адреса: {url}")
+        host = (parts.scheme, parts.netloc)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        with self._host_slots(host):
+            # A pooled connection may have been closed by the server while
+            # idle, so its failure means try the next one. A fresh connection
+            # failing means the host is down: no second timeout.
+            while True:
+                conn, reused = self._take(host)
+                try:
+                    conn.request("GET", path, headers=headers)
+                    response = conn.getresponse()
+                    body = response.read()
+                except (http.client.HTTPException, OSError):
+                    conn.close()
+                    if not reused:
+                        raise
+                    continue
+
+                if response.will_close:
+                    conn.close()
+                else:
+                    self._give_back(host, conn)
+                return response, body
+
+    def _check_backoff(self, url):
+        with self._lock:
+            failure = self._failures.get(url)
+        if failure and failure[1] > time.monotonic():
+            raise FetchError(f"Адреса недоступна, наступна спроба через "
+                             f"{failure[1] - time.monotonic():.0f} с: {url}")
+
+    def _failed(self, url):
+        with self._lock:
+            count = self._failures.get(url, (0, 0))[0] + 1
+            delay = min(HTTP_FAILURE_BACKOFF * 2 ** (count - 1), HTTP_FAILURE_BACKOFF_MAX)
+            self._failures[url] = (count, time.monotonic() + delay)
+            self._failures.move_to_end(url)
+            while len(self._failures) > self.max_failures:
+                self._failures.popitem(last=False)
+
+    def fetch(self, url, validators=None):
+        self._check_backoff(url)
+
+        headers = {"User-Agent": "Mozilla/5.0", "Connection": "keep-alive"}
+        validators = validators or {}
+        conditional = dict(headers)
+        if validators.get("etag"):
+            conditional["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            conditional["If-Modified-Since"] = validators["last_modified"]
+        # Entries cached before the URL was recorded came from the URL itself
+        validated_url = validators.get("url", url)
+
+        target = url
+        try:
+            for _ in range(_MAX_REDIRECTS + 1):
+                response, body = self._request(
+                    target, conditional if target == validated_url else headers)
+                if response.status in _REDIRECTS and response.getheader("Location"):
+                    target = urljoin(target, response.getheader("Location"))
+                    continue
+                break
+            else:
+                raise FetchError(f"Забагато переадресацій: {url}")
+
+            if response.status == 304:
+                result = FetchResult(target, None, validators, True)
+            elif response.status == 200:
+                result = FetchResult(target, body, {
+                    "etag": response.getheader("ETag"),
+                    "last_modified": response.getheader("Last-Modified"),
+                    "url": target,
+                }, False)
+            else:
+                raise FetchError(f"HTTP {response.status} {response.reason}: {url}")
+        except (FetchError, http.client.HTTPException, OSError):
+            self._failed(url)
+            raise
+
+        with self._lock:
+            self._failures.pop(url, None)
+        return result
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+_fetcher = None
+_fetcher_lock = threading.Lock()
+
+
+def get_http_fetcher():
+    global _fetcher
+    with _fetcher_lock:
+        if _fetcher is None:
+            _fetcher = HttpFetcher()
+        return _fetcher
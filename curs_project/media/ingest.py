@@ -0,0 +1,79 @@
+import io
+from PIL import Image, ImageCms, ImageOps
+from config import INGEST_MAX_SIDE, INGEST_QUALITY, INGEST_VARIANTS
+from .assets import get_asset_store
+from .thumb_cache import cached_thumbnail
+
+
+def _has_alpha(pil):
+    return pil.mode in ("RGBA", "LA") or (pil.mode == "P" and "transparency" in pil.info)
+
+
+# RGB (or greyscale) pixels for JPEG, and the ICC profile that still
+# describes them. A CMYK photo is converted through its own profile to
+# sRGB; a profile for another colour space is dropped with the conversion.
+def _jpeg_pixels(pil, icc_profile):
+    if pil.mode in ("RGB", "L"):
+        return pil, icc_profile
+    if pil.mode == "CMYK" and icc_profile:
+        try:
+            source = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+            srgb = ImageCms.createProfile("sRGB")
+            return ImageCms.profileToProfile(pil, source, srgb, outputMode="RGB"), None
+        except (ImageCms.PyCMSError, OSError):
+            pass
+    return pil.convert("RGB"), icc_profile if pil.mode in ("P", "RGBX") else None
+
+
+# Turns an uploaded photo into what the app stores: upright (EXIF
+# orientation applied), without EXIF/XMP/comments (the colour profile is
+# kept), no larger than max_side on its longest side, as JPEG (PNG when it
+# has transparency), in the asset store. The display variants are rendered
+# into the thumbnail cache straight away, so the first view does not decode
+# the original. Worker thread only; progress(done, total, text) is called
+# between steps. Returns the asset key for purchase_images.image_url; the
+# key is pinned in the store (see AssetStore.remove_unused) and the caller
+# releases it once the row is committed.
+def ingest_image(path, store=None, max_side=INGEST_MAX_SIDE, quality=INGEST_QUALITY,
+                 variants=INGEST_VARIANTS, progress=None):
+    store = store or get_asset_store()
+    total = 3 + len(variants)
+
+    def report(done, text):
+        if progress:
+            progress(done, total, text)
+
+    report(0, "Читання фото")
+    with Image.open(path) as src:
+        if src.format == "JPEG":
+            src.draft(None, (max_side, max_side))
+        pil = ImageOps.exif_transpose(src)
+
+    report(1, "Зменшення")
+    if max(pil.size) > max_side:
+        pil.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=2.0)
+
+    report(2, "Збереження")
+    icc_profile = pil.info.get("icc_profile")
+    pil.info = {}
+    buf = io.BytesIO()
+    if _has_alpha(pil):
+        ext = ".png"
+        pil.save(buf, "PNG", optimize=True, icc_profile=icc_profile)
+    else:
+        ext = ".jpg"
+        pil, icc_profile = _jpeg_pixels(pil, icc_profile)
+        pil.save(buf, "JPEG", quality=quality, optimize=True, progressive=True,
+                 icc_profile=icc_profile)
+    key, _ = store.put_bytes(buf.getvalue(), ext, pin=True)
+
+    try:
+        for i, size in enumerate(variants):
+            report(3 + i, f"Мініатюра {size[0]}x{size[1]}")
+            cached_thumbnail(key, size)
+    except Exception:
+        store.release(key)
+        raise
+
+    report(total, "Готово")
+    return key
@@ -0,0 +1,67 @@
+from tkinter import TclError
+from PIL import ImageTk
+from config import IMAGE_WORKERS, THUMB_CACHE_FLUSH_MS
+from ui.background import BackgroundPool
+from .http import get_http_fetcher
+from .thumb_cache import get_thumbnail_cache
+from .memory_cache import get_image_memory_cache, thumbnail
+
+
+# Fetches, decodes and thumbnails images on a fixed pool of worker threads;
+# the PhotoImage is created and handed to the callback on the Tk thread via
+# the dispatcher. Failures (missing file, dead URL, broken image) are
+# delivered as None so the caller keeps its placeholder.
+class ImageLoader(BackgroundPool):
+    def __init__(self, dispatcher, workers=IMAGE_WORKERS):
+        super().__init__(dispatcher, workers, "image-worker")
+        self._flush_job = self.dispatcher.root.after(THUMB_CACHE_FLUSH_MS, self._flush_cache)
+
+    # The thumbnail index is written on a worker, off the Tk thread
+    def _flush_cache(self):
+        self._workers.submit(get_thumbnail_cache().flush)
+        self._flush_job = self.dispatcher.root.after(THUMB_CACHE_FLUSH_MS, self._flush_cache)
+
+    def _load(self, source, size):
+        try:
+            return thumbnail(source, size)
+        except Exception as e:
+            print(f"Помилка завантаження зображення {source}: {e}")
+            return None
+
+    # With `key`, a newer request under the same key (e.g. a card that has
+    # been rebound to another purchase) cancels the older one if it has not
+    # started yet and suppresses its callback otherwise. An image already in
+    # memory is handed to the callback straight away.
+    def request(self, source, size, callback, owner=None, key=None):
+        memory = get_image_memory_cache()
+        photo = memory.get_photo(memory.key(source, size))
+        if photo is not None:
+            if key is not None:
+                self.cancel(key)
+            callback(photo)
+            return None
+
+        return self._submit(self._load, (source, size),
+                            lambda f: self._show(f, source, size, callback), owner, key)
+
+    def _show(self, future, source, size, callback):
+        pil = future.result()
+        if pil is None:
+            callback(None)
+            return
+
+        memory = get_image_memory_cache()
+        photo = ImageTk.PhotoImage(pil)
+        memory.put_photo(memory.key(source, size), photo)
+        callback(photo)
+
+    def shutdown(self):
+        if self._flush_job is not None:
+            try:
+                self.dispatcher.root.after_cancel(self._flush_job)
+            except TclError:
+                pass
+            self._flush_job = None
+        super().shutdown()
+        get_thumbnail_cache().flush()
+        get_http_fetcher().close()
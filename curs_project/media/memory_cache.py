@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+from PIL import ImageTk
+from config import IMAGE_MEMORY_BUDGET
+from .thumb_cache import cached_thumbnail
+
+
+def _pil_bytes(pil):
+    return pil.width * pil.height * len(pil.getbands())
+
+
+def _photo_bytes(photo):
+    # Tk keeps photo images as 32-bit RGBA
+    return photo.width() * photo.height() * 4
+
+
+# Process-wide LRU of decoded thumbnails, keyed by (source, size). An entry
+# holds the PIL image decoded by a worker thread until something shows it,
+# then the PhotoImage (Tk thread only). Evicted PhotoImages stay alive for
+# as long as a label still references them; the cache's own reference is
+# only dropped on the Tk thread, since eviction may run on a worker.
+class ImageMemoryCache:
+    def __init__(self, max_bytes=IMAGE_MEMORY_BUDGET):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total = 0
+        self._evicted_photos = []
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(source, size):
+        return source, int(size[0]), int(size[1])
+
+    def get_image(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["pil"] is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry["pil"]
+
+    # The last reference to a PhotoImage must go on the Tk thread: its
+    # __del__ deletes the Tcl image. Called from the Tk-only methods.
+    def _release_photos(self):
+        with self._lock:
+            evicted, self._evicted_photos = self._evicted_photos, []
+        evicted.clear()
+
+    # hits / misses count these lookups: one per image shown
+    def get_photo(self, key):
+        self._release_photos()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry["photo"] is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry["photo"]
+
+    def _store(self, key, **values):
+        with self._lock:
+            entry = self._entries.pop(key, None) or {"pil": None, "photo": None, "bytes": 0}
+            self._total -= entry["bytes"]
+            entry.update(values)
+            entry["bytes"] = ((_pil_bytes(entry["pil"]) if entry["pil"] is not None else 0) +
+                              (_photo_bytes(entry["photo"]) if entry["photo"] is not None else 0))
+            self._entries[key] = entry
+            self._total += entry["bytes"]
+
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._total -= old["bytes"]
+                self.evictions += 1
+                if old["photo"] is not None:
+                    self._evicted_photos.append(old["photo"])
+
+    def put_image(self, key, pil):
+        if pil is not None:
+            self._store(key, pil=pil)
+
+    # The PhotoImage replaces the PIL copy; nothing needs both.
+    def put_photo(self, key, photo):
+        if photo is not None:
+            self._store(key, photo=photo, pil=None)
+        self._release_photos()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+
+_memory_cache = ImageMemoryCache()
+
+
+def get_image_memory_cache():
+    return _memory_cache
+
+
+# Worker-safe: PIL thumbnail from memory, the disk cache or the source.
+def thumbnail(source, size):
+    cache = get_image_memory_cache()
+    key = cache.key(source, size)
+    pil = cache.get_image(key)
+    if pil is None:
+        pil = cached_thumbnail(source, size)
+        cache.put_image(key, pil)
+    return pil
+
+
+# Tk thread only: shared PhotoImage for (source, size), or None.
+def load_photo(source, size):
+    cache = get_image_memory_cache()
+    key = cache.key(source, size)
+    photo = cache.get_photo(key)
+    if photo is not None:
+        return photo
+
+    pil = thumbnail(source, size)
+    if pil is None:
+        return None
+    photo = ImageTk.PhotoImage(pil)
+    cache.put_photo(key, photo)
+    return photo
@@ -0,0 +1,128 @@
+# One-off move of purchase photos from file paths to asset store keys.
+# Run from curs_project/:
+#     python -m media.migrate_assets [--dry-run] [--delete-originals]
+# Rows are processed in image_id batches, each batch in its own transaction,
+# so the script can be stopped and re-run; rows that already hold a key or a
+# URL are skipped. Paths from another machine (/Users/.../assets/x.jpg) are
+# looked up by file name in this checkout's assets/; such matches are listed
+# at the end for the operator to confirm and are never deleted.
+import argparse
+import os
+from config import ASSETS_DIR, ASSET_STORE_DIR
+from database import get_pool, refresh_image_summary
+from .assets import get_asset_store, is_asset_key
+from .decode import resolve_source
+
+BATCH_SIZE = 200
+
+# Shipped with the app and opened by name, never photos to clean up
+_BUNDLED_ASSETS = ("app_icon.png", "app_icon.ico", "icon.png", "placeholder.jpg", "world_map.png")
+
+
+# (path, whether image_url named exactly this file) or None
+def _locate(image_url):
+    resolved = resolve_source(image_url)
+    if resolved is not None:
+        return (resolved[1], True) if resolved[0] == "file" else None
+    candidate = os.path.join(ASSETS_DIR, os.path.basename(image_url.replace("\\", "/")))
+    return (candidate, False) if os.path.isfile(candidate) else None
+
+
+# Only photos under assets/ may go: not the store's own
+# files and not the app's bundled images.
+def _deletable(path):
+    path = os.path.realpath(path)
+    assets_root = os.path.realpath(ASSETS_DIR) + os.sep
+    store_root = os.path.realpath(ASSET_STORE_DIR) + os.sep
+    return (path.startswith(assets_root) and not path.startswith(store_root)
+            and os.path.basename(path) not in _BUNDLED_ASSETS)
+
+
+def migrate(conn, dry_run=False, delete_originals=False, batch_size=BATCH_SIZE):
+    store = get_asset_store()
+    stats = {"rows": 0, "migrated": 0, "stored": 0, "duplicates": 0, "missing": 0, "by_name": 0}
+    originals = set()
+    by_name = []  # (image_id, image_url, file) matched by file name only
+    last_id = 0
+
+    while True:
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT image_id, purchase_id, image_url FROM purchase_images
+            WHERE image_id > %s ORDER BY image_id LIMIT %s
+        """, (last_id, batch_size))
+        rows = cur.fetchall()
+        if not rows:
+            cur.close()
+            break
+        last_id = rows[-1][0]
+
+        updates = []
+        touched = set()
+        for image_id, purchase_id, image_url in rows:
+            stats["rows"] += 1
+            if is_asset_key(image_url) or image_url.startswith(("http://", "https://")):
+                continue
+            located = _locate(image_url)
+            if located is None:
+                stats["missing"] += 1
+                print(f"⚠️ Фото #{image_id} не знайдено: {image_url}")
+                continue
+            path, exact = located
+            if not exact:
+                stats["by_name"] += 1
+                by_name.append((image_id, image_url, path))
+
+            if dry_run:
+                stats["migrated"] += 1
+                continue
+            key, new = store.put_file(path)
+            stats["stored" if new else "duplicates"] += 1
+            stats["migrated"] += 1
+            updates.append((key, image_id))
+            touched.add(purchase_id)
+            if exact:
+                originals.add(os.path.abspath(path))
+
+        if updates:
+            cur.executemany("UPDATE purchase_images SET image_url = %s WHERE image_id = %s", updates)
+            refresh_image_summary(cur, touched)
+        conn.commit()
+        cur.close()
+        print(f"… оброблено {stats['rows']} рядків")
+
+    if by_name:
+        print("⚠️ Знайдено лише за назвою файлу, перевірте вручну (оригінали не видаляються):")
+        for image_id, image_url, path in by_name:
+            print(f"   #{image_id}: {image_url} → {path}")
+
+    if delete_originals and not dry_run:
+        for path in sorted(originals):
+            if not _deletable(path):
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(f"⚠️ Не вдалося видалити {path}: {e}")
+
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Перенесення фото покупок у сховище за вмістом")
+    parser.add_argument("--dry-run", action="store_true", help="лише показати, що буде перенесено")
+    parser.add_argument("--delete-originals", action="store_true",
+                        help="видалити перенесені файли з assets/ (крім знайдених лише за назвою)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    with get_pool().connection() as conn:
+        stats = migrate(conn, args.dry_run, args.delete_originals, args.batch_size)
+
+    print(f"✅ Рядків: {stats['rows']}, перенесено: {stats['migrated']}, "
+          f"нових файлів: {stats['stored']}, дублікатів: {stats['duplicates']}, "
+          f"лише за назвою: {stats['by_name']}, не знайдено: {stats['missing']}")
+
+
+if __name__ == "__main__":
+    main()
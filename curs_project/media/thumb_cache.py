@@ -0,0 +1,257 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from PIL import Image
+from config import (THUMB_CACHE_DIR, THUMB_CACHE_MAX_BYTES, THUMB_CACHE_QUALITY,
+                    HTTP_REVALIDATE_SECONDS)
+from .decode import resolve_source, load_thumbnail, decode_thumbnail
+from .files import atomic_write
+from .assets import is_asset_key
+from .http import get_http_fetcher
+
+_INDEX_NAME = "index.json"
+_INDEX_VERSION = 1
+
+
+# An index entry as put() writes it; anything else is skipped on load
+def _valid_entry(key, entry):
+    return (isinstance(key, str) and isinstance(entry, dict)
+            and isinstance(entry.get("file"), str)
+            and entry["file"] == os.path.basename(entry["file"]) and entry["file"] != _INDEX_NAME
+            and isinstance(entry.get("bytes"), int) and entry["bytes"] >= 0
+            and isinstance(entry.get("used"), (int, float))
+            and isinstance(entry.get("checked", 0), (int, float))
+            and isinstance(entry.get("validators", {}), dict))
+
+
+# Thumbnails keyed by source + target size, stored as JPEG (PNG when the
+# image has transparency) with a JSON index in LRU order. Local files are
+# keyed by path, mtime and size, so an edited file gets a new entry; URLs by
+# the URL, with the response validators kept for revalidation. The index is
+# written by flush() (periodically and at shutdown), not on every put; a
+# broken or missing index only costs the cache contents, never an error.
+class ThumbnailCache:
+    def __init__(self, directory=THUMB_CACHE_DIR, max_bytes=THUMB_CACHE_MAX_BYTES,
+                 quality=THUMB_CACHE_QUALITY):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._entries = None
+        self._total = 0
+        self._dirty = False
+
+    def _index_path(self):
+        return os.path.join(self.directory, _INDEX_NAME)
+
+    def _load_index(self):
+        if self._entries is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+
+        entries = OrderedDict()
+        try:
+            with open(self._index_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == _INDEX_VERSION:
+                for item in data.get("entries", []):
+                    if not (isinstance(item, list) and len(item) == 2 and _valid_entry(*item)):
+                        continue
+                    key, entry = item
+                    if os.path.exists(os.path.join(self.directory, entry["file"])):
+                        entries[key] = entry
+        except (OSError, ValueError, TypeError, AttributeError):
+            entries = OrderedDict()
+
+        # Files the index does not know about (crash between writes, lost index)
+        known = {entry["file"] for entry in entries.values()}
+        for name in os.listdir(self.directory):
+            if name != _INDEX_NAME and name not in known:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+        self._entries = entries
+        self._total = sum(entry["bytes"] for entry in entries.values())
+
+    def _save_index(self):
+        data = {
+            "version": _INDEX_VERSION,
+            "entries": [[key, entry] for key, entry in self._entries.items()],
+        }
+        atomic_write(self._index_path(), json.dumps(data).encode("utf-8"))
+        self._dirty = False
+
+    @staticmethod
+    def key(source, size):
+        resolved = resolve_source(source)
+        if resolved is None:
+            return None
+        kind, location = resolved
+        if is_asset_key(source):
+            # Content-addressed: the key itself changes with the content
+            ident = f"asset|{source}"
+        elif kind == "file":
+            st = os.stat(location)
+            ident = f"file|{os.path.abspath(location)}|{st.st_mtime_ns}|{st.st_size}"
+        else:
+            ident = f"url|{location}"
+        return hashlib.sha1(f"{ident}|{size[0]}x{size[1]}".encode("utf-8")).hexdigest()
+
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._total -= entry["bytes"]
+        self._dirty = True
+        try:
+            os.remove(os.path.join(self.directory, entry["file"]))
+        except OSError:
+            pass
+
+    def entry(self, key):
+        with self._lock:
+            self._load_index()
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def get(self, key):
+        if key is None:
+            return None
+        with self._lock:
+            self._load_index()
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            entry["used"] = time.time()
+            self._dirty = True
+            path = os.path.join(self.directory, entry["file"])
+
+        try:
+            pil = Image.open(path)
+            pil.load()
+            return pil
+        except Exception:
+            with self._lock:
+                self._drop(key)
+            return None
+
+    def put(self, key, pil, validators=None):
+        if key is None or pil is None:
+            return
+        buf = io.BytesIO()
+        if pil.mode in ("RGBA", "LA") or (pil.mode == "P" and "transparency" in pil.info):
+            name = f"{key}.png"
+            pil.save(buf, "PNG", optimize=True)
+        else:
+            name = f"{key}.jpg"
+            pil.convert("RGB").save(buf, "JPEG", quality=self.quality, optimize=True)
+        data = buf.getvalue()
+
+        with self._lock:
+            self._load_index()
+            self._drop(key)
+            atomic_write(os.path.join(self.directory, name), data)
+            self._entries[key] = {
+                "file": name,
+                "bytes": len(data),
+                "used": time.time(),
+                "checked": time.time(),
+                "validators": validators or {},
+            }
+            self._total += len(data)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                self._drop(next(iter(self._entries)))
+            self._dirty = True
+
+    # The source answered 304: the stored thumbnail is still current.
+    def mark_checked(self, key):
+        with self._lock:
+            self._load_index()
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["checked"] = time.time()
+                self._dirty = True
+
+    def flush(self):
+        with self._lock:
+            if self._entries is not None and self._dirty:
+                try:
+                    self._save_index()
+                except OSError as e:
+                    print(f"Не вдалося зберегти індекс кешу мініатюр: {e}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_thumbnail_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache()
+        return _cache
+
+
+def _store(cache, key, pil, validators=None):
+    if pil is not None and key is not None:
+        try:
+            cache.put(key, pil, validators)
+        except OSError as e:
+            print(f"Не вдалося записати мініатюру в кеш: {e}")
+    return pil
+
+
+# Remote photo: a recently checked entry is used as is, an older one is
+# revalidated with a conditional request, and a stale entry is still
+# better than nothing when the host is down.
+def _cached_remote(url, size, cache, key):
+    entry = cache.entry(key) if key is not None else None
+    if entry and time.time() - entry.get("checked", 0) < HTTP_REVALIDATE_SECONDS:
+        pil = cache.get(key)
+        if pil is not None:
+            return pil
+        entry = None
+
+    fetcher = get_http_fetcher()
+    try:
+        result = fetcher.fetch(url, entry["validators"] if entry else None)
+    except Exception:
+        stale = cache.get(key) if entry else None
+        if stale is not None:
+            return stale
+        raise
+
+    if result.not_modified:
+        cache.mark_checked(key)
+        pil = cache.get(key)
+        if pil is not None:
+            return pil
+        result = fetcher.fetch(url)
+
+    return _store(cache, key, decode_thumbnail(result.body, size), result.validators)
+
+
+# Thumbnail from the disk cache, or decoded from the source and stored.
+def cached_thumbnail(source, size, cache=None):
+    cache = cache or get_thumbnail_cache()
+    try:
+        key = cache.key(source, size)
+    except OSError:
+        key = None
+
+    resolved = resolve_source(source)
+    if resolved is not None and resolved[0] == "url":
+        return _cached_remote(resolved[1], size, cache, key)
+
+    pil = cache.get(key)
+    if pil is not None:
+        return pil
+    return _store(cache, key, load_thumbnail(source, size))
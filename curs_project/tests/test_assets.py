@@ -0,0 +1,78 @@
+import hashlib
+import os
+import pytest
+import media.migrate_assets as migrate_assets
+from media.assets import AssetStore, is_asset_key
+
+DIGEST = hashlib.sha256(b"photo").hexdigest()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AssetStore(root=str(tmp_path))
+
+
+def test_key_names_content_and_path(store, tmp_path):
+    key, new = store.put_bytes(b"photo", ".JPG")
+    assert new and key == f"sha256:{DIGEST}.jpg" and is_asset_key(key)
+    assert store.path(key) == os.path.join(str(tmp_path), DIGEST[:2], DIGEST[2:4], DIGEST + ".jpg")
+    with open(store.path(key), "rb") as f:
+        assert f.read() == b"photo"
+
+
+def test_same_content_is_stored_once(store):
+    assert store.put_bytes(b"photo", ".jpg")[1]
+    assert store.put_bytes(b"photo", ".jpg") == (f"sha256:{DIGEST}.jpg", False)
+
+
+@pytest.mark.parametrize("ext", [".backup1", ".jpg~", "", "jpg", ".../x"])
+def test_odd_extensions_are_left_off(store, ext):
+    key, _ = store.put_bytes(b"photo", ext)
+    assert key == f"sha256:{DIGEST}"
+    assert is_asset_key(key)
+
+
+def test_bad_keys_are_rejected(store):
+    assert not is_asset_key(f"sha256:{DIGEST}/../../x")
+    assert not is_asset_key("assets/photo.jpg")
+    with pytest.raises(ValueError):
+        store.path("sha256:../../etc/passwd")
+
+
+def test_remove_unused_respects_rows(store):
+    key, _ = store.put_bytes(b"photo", ".jpg")
+    assert not store.remove_unused(key, lambda: True)
+    assert os.path.exists(store.path(key))
+    assert store.remove_unused(key, lambda: False)
+    assert not os.path.exists(store.path(key))
+
+
+def test_pinned_key_survives_until_every_pin_is_released(store):
+    key, _ = store.put_bytes(b"photo", ".jpg", pin=True)
+    store.put_bytes(b"photo", ".jpg", pin=True)
+    assert not store.remove_unused(key, lambda: False)
+    store.release(key)
+    assert not store.remove_unused(key, lambda: False)
+    store.release(key)
+    assert store.remove_unused(key, lambda: False)
+    store.release(key)
+    assert store._pins == {}
+
+
+def test_migration_deletes_only_loose_photos(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrate_assets, "ASSETS_DIR", str(tmp_path))
+    monkeypatch.setattr(migrate_assets, "ASSET_STORE_DIR", str(tmp_path / "store"))
+    assert migrate_assets._deletable(str(tmp_path / "car.jpg"))
+    assert migrate_assets._deletable(str(tmp_path / "old" / "car.jpg"))
+    assert not migrate_assets._deletable(str(tmp_path / "store" / "ab" / "cd" / "x.jpg"))
+    assert not migrate_assets._deletable(str(tmp_path / "placeholder.jpg"))
+    assert not migrate_assets._deletable(str(tmp_path.parent / "car.jpg"))
+
+
+def test_migration_marks_file_name_matches(tmp_path, monkeypatch):
+    monkeypatch.setattr(migrate_assets, "ASSETS_DIR", str(tmp_path))
+    photo = tmp_path / "car.jpg"
+    photo.write_bytes(b"photo")
+    assert migrate_assets._locate(str(photo)) == (str(photo), True)
+    assert migrate_assets._locate("/Users/someone/assets/car.jpg") == (str(photo), False)
+    assert migrate_assets._locate("/Users/someone/assets/other.jpg") is None
@@ -0,0 +1,89 @@
+from database.instrumentation import (fingerprint, tagged_screen, current_screen,
+                                      InstrumentedCursor, QueryStats)
+
+
+def test_fingerprint_ignores_literals():
+    assert (fingerprint("SELECT * FROM t WHERE a = 5 AND b = 'it\\'s'")
+            == fingerprint("SELECT *  FROM t\n WHERE a = %s AND b = %s")
+            == "SELECT * FROM t WHERE a = ? AND b = ?")
+
+
+def test_fingerprint_collapses_in_lists():
+    assert fingerprint("DELETE FROM t WHERE id IN (%s, %s, %s)") == "DELETE FROM t WHERE id IN (...)"
+    assert fingerprint("DELETE FROM t WHERE id IN (1,2)") == "DELETE FROM t WHERE id IN (...)"
+
+
+def test_fingerprint_keeps_identifiers_and_decodes_bytes():
+    assert fingerprint(b"SELECT col1 FROM t2 LIMIT 10") == "SELECT col1 FROM t2 LIMIT ?"
+
+
+def test_tagged_screen_nests():
+    with tagged_screen("outer"):
+        with tagged_screen("inner"):
+            assert current_screen() == "inner"
+        assert current_screen() == "outer"
+    assert current_screen() != "outer"
+
+
+class FakeCursor:
+    description = (("id",),)
+    rowcount = -1
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def execute(self, operation, params=None):
+        pass
+
+    def fetchone(self):
+        return self.rows.pop(0) if self.rows else None
+
+    def fetchmany(self, size=1):
+        taken, self.rows = self.rows[:size], self.rows[size:]
+        return taken
+
+    def fetchall(self):
+        taken, self.rows = self.rows, []
+        return taken
+
+    def close(self):
+        pass
+
+
+def run(rows, read):
+    stats = QueryStats(slow_ms=float("inf"))
+    cursor = InstrumentedCursor(FakeCursor(rows), stats)
+    with tagged_screen("test"):
+        cursor.execute("SELECT id FROM t")
+    read(cursor)
+    return stats.summary()
+
+
+def test_iteration_counts_every_row():
+    [entry] = run([(1,), (2,), (3,)], list)
+    assert entry["calls"] == 1 and entry["rows"] == 3 and entry["screen"] == "test"
+
+
+def test_fetchone_then_fetchall():
+    def read(cursor):
+        cursor.fetchone()
+        cursor.fetchall()
+    [entry] = run([(1,), (2,), (3,)], read)
+    assert entry["rows"] == 3
+
+
+def test_fetchmany_until_empty():
+    def read(cursor):
+        while cursor.fetchmany(2):
+            pass
+    [entry] = run([(1,), (2,), (3,)], read)
+    assert entry["rows"] == 3
+
+
+def test_close_records_partial_read():
+    def read(cursor):
+        cursor.fetchone()
+        assert cursor._stats.summary() == []
+        cursor.close()
+    [entry] = run([(1,), (2,)], read)
+    assert entry["rows"] == 1
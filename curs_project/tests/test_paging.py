@@ -0,0 +1,84 @@
+from database.paging import KeysetPager, OffsetPager
+
+COLS = ["id", "name"]
+
+
+def make_pager(descending=False):
+    return KeysetPager("SELECT * FROM t", [("t.name", "name"), ("t.id", "id")],
+                       descending=descending, page_size=2)
+
+
+def test_seek_expands_composite_key():
+    pager = make_pager()
+    where, params = pager._seek(["b", 7], forward=True)
+    assert where == "((t.name > %s) OR (t.name = %s AND t.id > %s))"
+    assert params == ["b", "b", 7]
+
+
+def test_seek_direction():
+    assert "<" in make_pager()._seek(["b", 7], forward=False)[0]
+    assert "<" in make_pager(descending=True)._seek(["b", 7], forward=True)[0]
+    assert ">" in make_pager(descending=True)._seek(["b", 7], forward=False)[0]
+
+
+def test_first_page_fetches_one_extra_row():
+    request = make_pager().request("first")
+    assert request.sql == "SELECT * FROM t ORDER BY t.name ASC, t.id ASC LIMIT %s"
+    assert request.params == [3]
+    assert not request.reverse
+
+
+def test_next_seeks_from_last_row():
+    pager = make_pager()
+    rows = pager.accept(pager.request("first"), [(1, "a"), (2, "b"), (3, "c")], COLS)
+    assert rows == [(1, "a"), (2, "b")]
+    assert pager.has_next and not pager.has_prev
+    assert pager.last_key == ["b", 2]
+
+    request = pager.request("next")
+    assert "WHERE ((t.name > %s) OR (t.name = %s AND t.id > %s))" in request.sql
+    assert request.params == ["b", "b", 2, 3]
+
+
+def test_prev_scans_backwards_and_restores_order():
+    pager = make_pager()
+    pager.accept(pager.request("first"), [(1, "a"), (2, "b"), (3, "c")], COLS)
+    pager.accept(pager.request("next"), [(3, "c"), (4, "d")], COLS)
+    assert pager.page_number == 2 and not pager.has_next
+
+    request = pager.request("prev")
+    assert request.reverse
+    assert "ORDER BY t.name DESC, t.id DESC" in request.sql
+    rows = pager.accept(request, [(2, "b"), (1, "a")], COLS)
+    assert rows == [(1, "a"), (2, "b")]
+    assert pager.page_number == 1 and not pager.has_prev
+
+
+def test_next_past_the_end_keeps_page():
+    pager = make_pager()
+    pager.accept(pager.request("first"), [(1, "a"), (2, "b")], COLS)
+    assert pager.accept(pager.request("next"), [], COLS) is None
+    assert pager.first_key == ["a", 1] and not pager.has_next
+
+
+def test_offset_pager_pages():
+    pager = OffsetPager("SELECT * FROM t", page_size=2)
+    first = pager.request("first")
+    assert first.sql == "SELECT * FROM t LIMIT %s OFFSET %s"
+    assert first.params == [3, 0]
+    pager.accept(first, [(1,), (1,), (1,)], ["v"])
+    assert pager.page_number == 1 and pager.has_next
+
+    second = pager.request("next")
+    assert second.params == [3, 2]
+    assert pager.accept(second, [(1,)], ["v"]) == [(1,)]
+    assert pager.page_number == 2 and pager.has_prev and not pager.has_next
+
+
+def test_offset_pager_jump_and_past_end():
+    pager = OffsetPager("SELECT * FROM t", page_size=10)
+    assert pager.request("jump", "4").offset == 30
+    assert pager.request("jump", "x").action == "first"
+    pager.accept(pager.request("first"), [(1,)], ["v"])
+    assert pager.accept(pager.request("jump", 5), [], ["v"]) is None
+    assert pager.page_number == 1
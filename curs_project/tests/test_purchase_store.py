@@ -0,0 +1,122 @@
+import datetime
+from decimal import Decimal
+import pytest
+import database.purchase_store as purchase_store
+from database.purchase_store import PurchaseStore
+from database.repository import PurchaseFilter
+
+COLS = ["purchase_id", "buyer_id", "status_key", "country_name", "car_year",
+        "purchase_date", "vin_number", "car_make", "car_model", "price_usd", "updated_at"]
+NOW = datetime.datetime(2024, 6, 1)
+
+
+# Answers the store's queries from `rows`; an incremental refresh gets the
+# ids in `changed`.
+class FakeRepository:
+    def __init__(self):
+        self.rows = {}
+        self.changed = set()
+
+    def add(self, pid, status="paid", country="US", year=2015, day=1, make="BMW"):
+        self.rows[pid] = [pid, 1, status, country, year, datetime.date(2024, 1, day),
+                          f"VIN{pid:04d}", make, "X5", Decimal("1000.50"), NOW]
+        self.changed.add(pid)
+
+    def execute(self, conn, sql, params=()):
+        if "NOW()" in sql:
+            return [(NOW,)], ["NOW()"]
+        if "COUNT(*)" in sql:
+            return [(len(self.rows),)], ["COUNT(*)"]
+        if sql.startswith("SELECT purchase_id"):
+            return [(pid,) for pid in self.rows], ["purchase_id"]
+        ids = self.changed if "updated_at >=" in sql else self.rows
+        self.changed = set()
+        return [tuple(self.rows[pid]) for pid in ids if pid in self.rows], COLS
+
+
+@pytest.fixture
+def repo(monkeypatch):
+    repository = FakeRepository()
+    monkeypatch.setattr(purchase_store, "get_purchase_repository", lambda: repository)
+    return repository
+
+
+def ids(store, **spec):
+    return [row["purchase_id"] for row in store.find(PurchaseFilter(**spec))]
+
+
+def loaded(repo):
+    for pid in range(1, 7):
+        repo.add(pid, status="paid" if pid % 2 else "shipped", day=pid,
+                 country="US" if pid < 4 else "KR")
+    store = PurchaseStore()
+    store.load(None)
+    return store
+
+
+def test_load_orders_and_filters(repo):
+    store = loaded(repo)
+    assert ids(store) == [6, 5, 4, 3, 2, 1]
+    assert ids(store, status_key="paid") == [5, 3, 1]
+    assert ids(store, status_key="paid", country_name="KR") == [5]
+    assert ids(store, status_key="unknown") == []
+
+
+def test_rows_decode_typed_values(repo):
+    row = loaded(repo).find(PurchaseFilter(), limit=1)[0]
+    assert row["price_usd"] == Decimal("1000.50")
+    assert row["purchase_date"] == datetime.date(2024, 1, 6)
+    assert row["updated_at"] == NOW
+
+
+def test_patch_moves_bits_between_bitmaps(repo):
+    store = loaded(repo)
+    repo.add(2, status="paid", day=2)
+    store.refresh(None)
+    assert ids(store, status_key="paid") == [5, 3, 2, 1]
+    assert ids(store, status_key="shipped") == [6, 4]
+    assert store.facets(PurchaseFilter())["status_key"] == {"paid": 4, "shipped": 2}
+
+
+def test_new_row_and_date_change_compact(repo):
+    store = loaded(repo)
+    repo.add(7, day=3)
+    repo.add(1, day=9, status="shipped")
+    store.refresh(None)
+    assert ids(store) == [1, 6, 5, 4, 7, 3, 2]
+    assert ids(store, status_key="shipped") == [1, 6, 4, 2]
+
+
+def test_deleted_rows_are_dropped(repo):
+    store = loaded(repo)
+    del repo.rows[3]
+    store.refresh(None)
+    assert ids(store) == [6, 5, 4, 2, 1]
+    assert ids(store, country_name="US") == [2, 1]
+
+
+def test_found_rows_keep_their_values_after_refresh(repo):
+    store = loaded(repo)
+    found = store.find(PurchaseFilter(status_key="paid"))
+    repo.add(5, status="shipped", day=5, country="KR")
+    store.refresh(None)
+    assert found[0]["status_key"] == "paid"
+    assert ids(store, status_key="paid") == [3, 1]
+
+
+def test_search_cache_is_dropped_on_change(repo):
+    store = loaded(repo)
+    assert ids(store, search="vin0002") == [2]
+    repo.add(2, day=2, make="Audi", status="shipped")
+    store.refresh(None)
+    assert ids(store, search="audi") == [2]
+    assert ids(store, search="a") == [2]
+
+
+def test_invalidate(repo):
+    store = loaded(repo)
+    assert store.fresh()
+    store.invalidate("purchase_images")
+    assert store.loaded and not store.fresh()
+    store.invalidate("statuses")
+    assert not store.loaded
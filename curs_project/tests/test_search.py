@@ -0,0 +1,42 @@
+from database.search import search_clause, search_matches, search_narrows
+
+# Expectations below assume SEARCH_NGRAM_SIZE = 2 (config.py)
+
+
+def test_empty_input_adds_no_clause():
+    assert search_clause("   ") == (None, [])
+    assert search_clause('""') == (None, [])
+
+
+def test_long_terms_use_fulltext():
+    sql, params = search_clause('bmw "x5"')
+    assert sql == "MATCH(p.vin_number, p.car_make, p.car_model) AGAINST (%s IN BOOLEAN MODE)"
+    assert params == ['+"bmw" +"x5"']
+
+
+def test_short_terms_are_dropped_next_to_long_ones():
+    assert search_clause("a bmw")[1] == ['+"bmw"']
+
+
+def test_single_character_uses_escaped_prefix_like():
+    sql, params = search_clause("%", alias="x")
+    assert sql == "(x.vin_number LIKE %s OR x.car_make LIKE %s OR x.car_model LIKE %s)"
+    assert params == ["\\%%"] * 3
+
+
+def test_matches_mirrors_clause():
+    row = {"vin_number": "WBA123", "car_make": "BMW", "car_model": "X5"}
+    assert search_matches(row, "bm x5")
+    assert search_matches(row, "w")
+    assert not search_matches(row, "a")
+    assert not search_matches(row, "bmw audi")
+    assert search_matches(row, "")
+
+
+def test_narrows_only_for_fulltext_prefixes():
+    assert search_narrows("", "bmw")
+    assert search_narrows("bm", "bmw")
+    assert search_narrows("bmw", "bmw x5")
+    assert not search_narrows("b", "bm")
+    assert not search_narrows("bmw", "bm")
+    assert not search_narrows("bmw", "audi")
@@ -0,0 +1,79 @@
+import json
+import os
+from PIL import Image
+from media.thumb_cache import ThumbnailCache
+
+
+def image(mode="RGB"):
+    return Image.new(mode, (8, 8), "red")
+
+
+def reopen(directory):
+    return ThumbnailCache(directory=str(directory))
+
+
+def test_entries_survive_flush_and_reload(tmp_path):
+    cache = reopen(tmp_path)
+    cache.put("a", image(), {"etag": '"1"'})
+    cache.put("b", image("RGBA"))
+    cache.flush()
+
+    cache = reopen(tmp_path)
+    assert cache.get("a").size == (8, 8)
+    assert cache.entry("a")["validators"] == {"etag": '"1"'}
+    assert cache.entry("b")["file"] == "b.png"
+
+
+def test_unflushed_files_are_removed_on_load(tmp_path):
+    cache = reopen(tmp_path)
+    cache.put("a", image())
+    cache.flush()
+    cache.put("b", image())
+
+    cache = reopen(tmp_path)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert sorted(os.listdir(tmp_path)) == ["a.jpg", "index.json"]
+
+
+def test_broken_index_empties_the_cache(tmp_path):
+    cache = reopen(tmp_path)
+    cache.put("a", image())
+    cache.flush()
+    (tmp_path / "index.json").write_text("{not json", encoding="utf-8")
+
+    cache = reopen(tmp_path)
+    assert cache.get("a") is None
+    assert os.listdir(tmp_path) == ["index.json"]
+
+
+def test_invalid_and_missing_entries_are_skipped(tmp_path):
+    (tmp_path / "ok.jpg").write_bytes(b"x")
+    entries = [
+        ["ok", {"file": "ok.jpg", "bytes": 1, "used": 0}],
+        ["gone", {"file": "gone.jpg", "bytes": 1, "used": 0}],
+        ["escape", {"file": "../victim.jpg", "bytes": 1, "used": 0}],
+        ["index", {"file": "index.json", "bytes": 1, "used": 0}],
+        ["bad", {"file": "ok.jpg", "bytes": "1", "used": 0}],
+        "garbage",
+    ]
+    (tmp_path / "index.json").write_text(json.dumps({"version": 1, "entries": entries}),
+                                         encoding="utf-8")
+
+    cache = reopen(tmp_path)
+    assert cache.entry("ok") is not None
+    for key in ("gone", "escape", "index", "bad"):
+        assert cache.entry(key) is None
+    assert cache._total == 1
+
+
+def test_least_recently_used_is_evicted(tmp_path):
+    cache = reopen(tmp_path)
+    cache.put("a", image())
+    size = cache.entry("a")["bytes"]
+    cache.max_bytes = size * 2
+    cache.put("b", image())
+    cache.get("a")
+    cache.put("c", image())
+    assert cache.entry("b") is None
+    assert cache.entry("a") is not None and cache.entry("c") is not None
@@ -1,5 +1,6 @@
 import os
 import io
+import re
 import datetime
 import json
 import csv
@@ -24,9 +25,16 @@ except ImportError:
     print("Для експорту встановіть: pip install pandas openpyxl python-docx")
     PANDAS_AVAILABLE = False
 
-from config import DB_CONFIG, ASSETS_DIR, MAP_COORDINATES, CANVAS_WIDTH, CANVAS_HEIGHT
-from database import DatabaseInitializer, safe_connect
-from ui.widgets import CalendarDialog, CarCard, ModernCRUDDialog, DaysCounterWidget, ImageCarousel, MapWidget
+from config import DB_CONFIG, ASSETS_DIR, MAP_COORDINATES, CANVAS_WIDTH, CANVAS_HEIGHT, TABLE_PAGE_SIZE, TABLE_PAGE_SIZES, SLOW_QUERY_LOG, PURCHASE_STORE_LOCAL
+from database import (DatabaseInitializer, safe_connect, get_schema_catalog, get_reference_data,
+                      REFERENCE_TABLES, KeysetPager, OffsetPager, refresh_image_summary,
+                      get_purchase_repository, PurchaseFilter, PURCHASE_TABLE_QUERY, get_query_stats,
+                      get_purchase_store)
+from ui.widgets import CalendarDialog, VirtualCardGrid, ModernCRUDDialog, DaysCounterWidget, ImageCarousel, MapWidget
+from ui.background import TkDispatcher, QueryExecutor
+from ui.search import SearchPipeline
+from ui.progressive import ProgressiveRenderer
+from media import ImageLoader, load_photo, get_image_memory_cache
 
 ssl_context = ssl.create_default_context()
 ssl_context.check_hostname = False
@@ -56,6 +64,10 @@ class EnhancedAutoTrackerApp(tb.Window):
             return
 
         self.conn = None
+        self.schema = get_schema_catalog()
+        self.reference_data = get_reference_data()
+        self.purchases = get_purchase_repository()
+        self.purchase_store = get_purchase_store()
         self.current_user = None
         self.dark_mode = False
         self.current_table = None
@@ -66,7 +78,18 @@ class EnhancedAutoTrackerApp(tb.Window):
         self.left_frame = None
         self.main_content = None
 
+        self.dispatcher = TkDispatcher(self)
+        self.executor = QueryExecutor(self.dispatcher)
+        self.image_loader = ImageLoader(self.dispatcher)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
         self._build_login_ui()
+
+    def _on_close(self):
+        self.executor.shutdown()
+        self.image_loader.shutdown()
+        self.dispatcher.stop()
+        self.destroy()
         
     def _load_app_icon(self):
         try:
@@ -120,73 +143,47 @@ class EnhancedAutoTrackerApp(tb.Window):
             return []
         
         try:
-            cur = self.conn.cursor()
-            cur.execute(f"SHOW COLUMNS FROM `{table}`")
-            columns = cur.fetchall()
-            cur.close()
-            return columns
+            return self.schema.columns(table)
         except Error as e:
             print(f"Помилка отримання колонок: {e}")
             return []
 
     def _get_primary_key(self, table):
         try:
-            cur = self.conn.cursor()
-            cur.execute(f"SHOW KEYS FROM `{table}` WHERE Key_name = 'PRIMARY'")
-            primary_key = cur.fetchone()
-            cur.close()
-            
-            if primary_key:
-                return primary_key[4]
-            return None
+            return self.schema.primary_key(table)
         except Error as e:
             print(f"Помилка отримання первинного ключа: {e}")
             return None
 
     def _is_foreign_key(self, table, column):
         try:
-            cur = self.conn.cursor()
-            cur.execute(f"""
-                SELECT CONSTRAINT_NAME 
-                FROM information_schema.KEY_COLUMN_USAGE 
-                WHERE TABLE_NAME = '{table}' 
-                AND COLUMN_NAME = '{column}' 
-                AND REFERENCED_TABLE_NAME IS NOT NULL
-            """)
-            result = cur.fetchone()
-            cur.close()
-            return result is not None
+            return self.schema.is_foreign_key(table, column)
         except Error:
             return False
 
     def _get_foreign_key_info(self, table, column):
         try:
-            cur = self.conn.cursor()
-            cur.execute(f"""
-                SELECT REFERENCED_TABLE_NAME, REFERENCED_COLUMN_NAME 
-                FROM information_schema.KEY_COLUMN_USAGE 
-                WHERE TABLE_NAME = '{table}' 
-                AND COLUMN_NAME = '{column}' 
-                AND REFERENCED_TABLE_NAME IS NOT NULL
-            """)
-            result = cur.fetchone()
-            cur.close()
-            return result if result else (None, None)
+            return self.schema.foreign_key(table, column)
         except Error:
             return (None, None)
 
     def _get_foreign_key_values(self, table, column):
         try:
-            cur = self.conn.cursor()
-            cur.execute(f"SHOW COLUMNS FROM `{table}`")
-            cols = cur.fetchall()
+            cols = self.schema.columns(table)
             
             display_column = None
             for col in cols:
                 if col[0] in ['name', 'username', 'country_name', 'status_name', 'port_name', 'auction_name', 'location_name']:
                     display_column = col[0]
                     break
-            
+
+            if table in REFERENCE_TABLES:
+                rows = self.reference_data.rows(table)
+                if display_column and display_column != column:
+                    return [f"{row[column]} - {row[display_column]}" for row in rows if row[column] is not None]
+                return [str(row[column]) for row in rows if row[column] is not None]
+
+            cur = self.conn.cursor()
             if display_column and display_column != column:
                 cur.execute(f"SELECT `{column}`, `{display_column}` FROM `{table}`")
                 rows = cur.fetchall()
@@ -279,18 +276,16 @@ class EnhancedAutoTrackerApp(tb.Window):
         icon_path = os.path.join(ASSETS_DIR, "icon.png")
 
         try:
-            pil = Image.open(icon_path)
-
-            pil.thumbnail((180, 180), Image.Resampling.LANCZOS)
-
-            photo = ImageTk.PhotoImage(pil)
+            photo = load_photo(icon_path, (180, 180))
+        except Exception as e:
+            print(f"Не удалось загрузить иконку приложения: {e}")
+            photo = None
 
+        if photo is not None:
             logo_label = tb.Label(left_side, image=photo)
             logo_label.image = photo
             logo_label.pack(pady=10)
-
-        except Exception as e:
-            print(f"Не удалось загрузить иконку приложения: {e}")
+        else:
             tb.Label(left_side, text="🚗", font=("Segoe UI", 60)).pack(pady=10)
 
 
@@ -460,6 +455,10 @@ class EnhancedAutoTrackerApp(tb.Window):
             
             cur.close()
             
+            # Loaded here, before any screen job can need them: filled lazily
+            # from a job, each would take a second pooled connection
+            self.schema.load(conn)
+            self.reference_data.load(conn)
             self._build_main_ui()
             
         except Error as e:
@@ -549,6 +548,7 @@ class EnhancedAutoTrackerApp(tb.Window):
             ("📊 Головна", "dashboard", "primary"),
             ("🚗 Авто", "purchases_visual", "info"),
             ("📈 Аналітика", "analytics", "warning"),
+            ("🧪 Запити до БД", "query_stats", "secondary"),
         ]
 
         for icon_text, table, color in main_functions:
@@ -612,6 +612,8 @@ class EnhancedAutoTrackerApp(tb.Window):
             self._show_analytics()
         elif destination == "purchases_visual":
             self._show_purchases_visual()
+        elif destination == "query_stats":
+            self._show_query_stats()
         else:
             self._show_table_in_main(destination)
 
@@ -619,6 +621,11 @@ class EnhancedAutoTrackerApp(tb.Window):
         for w in self.main_content.winfo_children():
             w.destroy()
 
+    def _show_loading(self, parent, text="⏳ Завантаження..."):
+        label = tb.Label(parent, text=text, font=("Segoe UI", 10), bootstyle="secondary")
+        label.pack(pady=10)
+        return label
+
     def _show_admin_dashboard(self):
         self._clear_main_content()
         
@@ -630,9 +637,14 @@ class EnhancedAutoTrackerApp(tb.Window):
 
         stats_frame = tb.Frame(self.main_content)
         stats_frame.pack(fill="x", pady=8)
+        stats_loading = self._show_loading(stats_frame)
 
-        try:
-            cur = self.conn.cursor()
+        late_cars_frame = tb.LabelFrame(self.main_content, text="⚠️ Авто з запізненням", padding=12)
+        late_cars_frame.pack(fill="x", pady=15)
+        late_loading = self._show_loading(late_cars_frame)
+
+        def load_stats(conn):
+            cur = conn.cursor()
             
             cur.execute("SELECT COUNT(*) FROM users")
             total_users = cur.fetchone()[0]
@@ -647,6 +659,11 @@ class EnhancedAutoTrackerApp(tb.Window):
             total_countries = cur.fetchone()[0]
             
             cur.close()
+            return total_users, total_purchases, active_deliveries, total_countries
+
+        def render_stats(result):
+            stats_loading.destroy()
+            total_users, total_purchases, active_deliveries, total_countries = result
             
             stats = [
                 ("👥 Користувачі", total_users, "primary"),
@@ -662,15 +679,15 @@ class EnhancedAutoTrackerApp(tb.Window):
                         bootstyle=f"inverse-{style}").pack()
                 tb.Label(card, text=str(count), font=("Segoe UI", 20, "bold"),
                         bootstyle=f"inverse-{style}").pack()
-                
-        except Error as e:
+
+        def stats_failed(e):
+            stats_loading.destroy()
             print(f"Помилка завантаження статистики: {e}")
 
-        late_cars_frame = tb.LabelFrame(self.main_content, text="⚠️ Авто з запізненням", padding=12)
-        late_cars_frame.pack(fill="x", pady=15)
+        self.executor.submit(load_stats, render_stats, stats_failed, owner=stats_frame)
 
-        try:
-            cur = self.conn.cursor(dictionary=True)
+        def load_late_cars(conn):
+            cur = conn.cursor(dictionary=True)
             cur.execute("""
                 SELECT p.*, s.status_name, u.username,
                        DATEDIFF(CURDATE(), p.estimated_arrival_date) as days_late
@@ -684,6 +701,10 @@ class EnhancedAutoTrackerApp(tb.Window):
             """)
             late_cars = cur.fetchall()
             cur.close()
+            return late_cars
+
+        def render_late_cars(late_cars):
+            late_loading.destroy()
 
             late_cars_scroll_container = tb.Frame(late_cars_frame)
             late_cars_scroll_container.pack(fill="both", expand=True)
@@ -704,7 +725,7 @@ class EnhancedAutoTrackerApp(tb.Window):
             scrollbar.pack(side="right", fill="y")
 
             if late_cars:
-                for car in late_cars:
+                def add_car(car, index):
                     car_frame = tb.Frame(late_cars_content)
                     car_frame.pack(fill="x", pady=6)
                     
@@ -721,14 +742,21 @@ class EnhancedAutoTrackerApp(tb.Window):
                              command=lambda c=car: self._show_purchase_details(c)).pack(anchor="w", pady=3)
                     
                     ttk.Separator(car_frame, orient='horizontal').pack(fill='x', pady=3)
+
+                ProgressiveRenderer(late_cars_content, add_car, progress_parent=late_cars_frame,
+                                    progress_pack={"fill": "x", "pady": 3,
+                                                   "before": late_cars_scroll_container}).start(late_cars)
             else:
                 tb.Label(late_cars_content, text="🎉 Немає авто з запізненням!",
                         font=("Segoe UI", 10), bootstyle="success").pack(pady=10)
-                        
-        except Error as e:
+
+        def late_cars_failed(e):
+            late_loading.destroy()
             tb.Label(late_cars_frame, text=f"Помилка завантаження: {e}",
                     bootstyle="danger").pack(pady=10)
 
+        self.executor.submit(load_late_cars, render_late_cars, late_cars_failed, owner=late_cars_frame)
+
     def _show_purchases_visual(self):
         self._clear_main_content()
 
@@ -789,16 +817,18 @@ class EnhancedAutoTrackerApp(tb.Window):
         ).pack(anchor="w")
 
         self.status_filter = tb.StringVar(value="all")
+        status_values = ["all", "bought_auction", "paid", "to_port", "at_port",
+                         "in_sea", "in_klaipeda", "to_ukraine", "cleared_customs", "in_ukraine"]
         status_combo = tb.Combobox(
             status_block,
             textvariable=self.status_filter,
-            values=["all", "bought_auction", "paid", "to_port", "at_port",
-                    "in_sea", "in_klaipeda", "to_ukraine", "cleared_customs", "in_ukraine"],
+            values=status_values,
             state="readonly",
             width=18
         )
         status_combo.pack(fill="x", pady=2)
         status_combo.bind("<<ComboboxSelected>>", self._load_purchases_cards)
+        self._card_facets = {"status_key": (status_combo, self.status_filter, status_values)}
 
         country_block = tb.Frame(row1, padding=(5, 2))
         country_block.pack(side="left", padx=5, fill="x", expand=True)
@@ -811,10 +841,7 @@ class EnhancedAutoTrackerApp(tb.Window):
 
         self.country_filter = tb.StringVar(value="all")
         try:
-            cur = self.conn.cursor()
-            cur.execute("SELECT country_name FROM countries ORDER BY country_name")
-            countries = [row[0] for row in cur.fetchall()]
-            cur.close()
+            countries = self.reference_data.country_names()
 
             country_combo = tb.Combobox(
                 country_block,
@@ -825,6 +852,7 @@ class EnhancedAutoTrackerApp(tb.Window):
             )
             country_combo.pack(fill="x", pady=2)
             country_combo.bind("<<ComboboxSelected>>", self._load_purchases_cards)
+            self._card_facets["country_name"] = (country_combo, self.country_filter, ["all"] + countries)
         except Error as e:
             print(f"Помилка завантаження країн: {e}")
 
@@ -849,6 +877,7 @@ class EnhancedAutoTrackerApp(tb.Window):
         )
         year_combo.pack(fill="x", pady=2)
         year_combo.bind("<<ComboboxSelected>>", self._load_purchases_cards)
+        self._card_facets["car_year"] = (year_combo, self.year_filter, ["all"] + years)
 
         row2 = tb.Frame(filters_card)
         row2.pack(fill="x", pady=5)
@@ -873,13 +902,12 @@ class EnhancedAutoTrackerApp(tb.Window):
 
         search_entry.bind("<FocusIn>", on_search_focus_in)
         search_entry.bind("<FocusOut>", on_search_focus_out)
-        search_entry.bind("<KeyRelease>", lambda e: self._filter_purchases_cards())
 
         tb.Button(
             row2,
             text="🔍 Пошук",
             bootstyle="info",
-            command=self._filter_purchases_cards
+            command=self._load_purchases_cards
         ).pack(side="left", padx=5)
 
         tb.Button(
@@ -889,23 +917,32 @@ class EnhancedAutoTrackerApp(tb.Window):
             command=self._reset_filters
         ).pack(side="right", padx=5)
 
-        cards_container = tb.Frame(self.main_content)
-        cards_container.pack(fill="both", expand=True, pady=8)
-        
-        canvas = Canvas(cards_container)
-        scrollbar = ttk.Scrollbar(cards_container, orient="vertical", command=canvas.yview)
-        self.cards_frame = tb.Frame(canvas)
-        
-        self.cards_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.local_filters = tb.BooleanVar(value=PURCHASE_STORE_LOCAL)
+        tb.Checkbutton(
+            row2,
+            text="⚡ Локальні фільтри",
+            variable=self.local_filters,
+            bootstyle="round-toggle",
+            command=self._load_purchases_cards
+        ).pack(side="right", padx=5)
+
+        self.cards_frame = VirtualCardGrid(self.main_content, on_click=self._show_purchase_details,
+                                           image_loader=self.image_loader,
+                                           on_near_end=lambda: self.cards_search.load_more())
+        self.cards_frame.pack(fill="both", expand=True, pady=8)
+
+        self.cards_search = SearchPipeline(
+            self.cards_frame, self.executor,
+            read_state=self._purchase_cards_state,
+            build_job=self._purchase_cards_query,
+            render=self._render_admin_cards,
+            append=self.cards_frame.append_items,
+            local=self._purchase_cards_local,
+            on_loading=lambda: self._show_cards_loading(self.cards_frame),
+            on_error=lambda e: messagebox.showerror("Помилка", f"Помилка завантаження: {e}"),
+            key="purchases_cards"
         )
-        
-        canvas.create_window((0, 0), window=self.cards_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        search_entry.bind("<KeyRelease>", self.cards_search.on_key)
         
         self._load_purchases_cards()
 
@@ -917,137 +954,75 @@ class EnhancedAutoTrackerApp(tb.Window):
         self.search_var.set("")
         self._load_purchases_cards()
     
+    def _render_purchase_cards(self, grid, purchases, empty_text, has_more=False):
+        grid.set_items(purchases, empty_text, has_more)
+
+    def _render_admin_cards(self, purchases, text, has_more):
+        self._render_purchase_cards(
+            self.cards_frame, purchases,
+            "Нічого не знайдено" if text else "Немає покупок за обраними фільтрами", has_more)
+        self._update_card_facets()
+
+    @staticmethod
+    def _facet_value(label):
+        # "paid (12)" -> "paid"
+        return re.sub(r" \(\d+\)$", "", label)
+
+    def _update_card_facets(self):
+        counts = None
+        if self.local_filters.get():
+            counts = self.purchase_store.facets(self._purchase_cards_filter(*self._purchase_cards_state()))
+
+        for name, (combo, var, values) in self._card_facets.items():
+            if counts is None:
+                labels = list(values)
+            else:
+                labels = ["all"] + [
+                    f"{value} ({counts[name].get(int(value) if name == 'car_year' else value, 0)})"
+                    for value in values[1:]
+                ]
+            current = self._facet_value(var.get())
+            combo.configure(values=labels)
+            var.set(next((label for label in labels if self._facet_value(label) == current), current))
+
+    def _show_cards_loading(self, grid):
+        grid.show_message("⏳ Завантаження...")
+
     def _load_purchases_cards(self, event=None):
-        for w in self.cards_frame.winfo_children():
-            w.destroy()
-        
-        try:
-            cur = self.conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.country_name, a.auction_name, l.location_name, 
-                       s.status_name, u.username, port.port_name,
-                       EXISTS(SELECT 1 FROM purchase_images WHERE purchase_id = p.purchase_id) as has_images,
-                       (SELECT image_url FROM purchase_images WHERE purchase_id = p.purchase_id LIMIT 1) as first_image_path
-                FROM purchases p
-                LEFT JOIN countries c ON p.country_id = c.country_id
-                LEFT JOIN auctions a ON p.auction_id = a.auction_id
-                LEFT JOIN locations l ON p.location_id = l.location_id
-                LEFT JOIN statuses s ON p.status_id = s.status_id
-                LEFT JOIN users u ON p.buyer_id = u.id
-                LEFT JOIN locations loc ON p.location_id = loc.location_id
-                LEFT JOIN ports port ON loc.default_port_id = port.port_id
-                WHERE 1=1
-            """
-            
-            params = []
-            
-            status_filter = self.status_filter.get()
-            if status_filter != "all":
-                query += " AND s.status_key = %s"
-                params.append(status_filter)
-            
-            country_filter = self.country_filter.get()
-            if country_filter != "all":
-                query += " AND c.country_name = %s"
-                params.append(country_filter)
-            
-            year_filter = self.year_filter.get()
-            if year_filter != "all":
-                query += " AND p.car_year = %s"
-                params.append(int(year_filter))
-            
-            query += " ORDER BY p.purchase_date DESC"
-            
-            cur.execute(query, params)
-            purchases = cur.fetchall()
-            cur.close()
-            
-            row_frame = None
-            for idx, purchase in enumerate(purchases):
-                if idx % 3 == 0:
-                    row_frame = tb.Frame(self.cards_frame)
-                    row_frame.pack(fill="x", pady=3)
-                
-                card = CarCard(row_frame, purchase, on_click=self._show_purchase_details)
-                card.pack(side="left", padx=8, fill="both", expand=True)
-            
-            if not purchases:
-                tb.Label(self.cards_frame, text="Немає покупок за обраними фільтрами", 
-                        font=("Segoe UI", 12)).pack(pady=40)
-                
-        except Error as e:
-            messagebox.showerror("Помилка", f"Помилка завантаження: {e}")
-    
-    def _filter_purchases_cards(self):
-        search_text = self.search_var.get().lower()
+        self.cards_search.run_now()
+
+    def _purchase_cards_state(self):
+        search_text = self.search_var.get().strip()
         if search_text == "Пошук по VIN, марці, моделі...":
             search_text = ""
-        
-        for w in self.cards_frame.winfo_children():
-            w.destroy()
-        
-        try:
-            cur = self.conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.country_name, a.auction_name, l.location_name, 
-                       s.status_name, u.username, port.port_name,
-                       EXISTS(SELECT 1 FROM purchase_images WHERE purchase_id = p.purchase_id) as has_images,
-                       (SELECT image_url FROM purchase_images WHERE purchase_id = p.purchase_id LIMIT 1) as first_image_path
-                FROM purchases p
-                LEFT JOIN countries c ON p.country_id = c.country_id
-                LEFT JOIN auctions a ON p.auction_id = a.auction_id
-                LEFT JOIN locations l ON p.location_id = l.location_id
-                LEFT JOIN statuses s ON p.status_id = s.status_id
-                LEFT JOIN users u ON p.buyer_id = u.id
-                LEFT JOIN locations loc ON p.location_id = loc.location_id
-                LEFT JOIN ports port ON loc.default_port_id = port.port_id
-                WHERE 1=1
-            """
-            
-            params = []
-            
-            status_filter = self.status_filter.get()
-            if status_filter != "all":
-                query += " AND s.status_key = %s"
-                params.append(status_filter)
-            
-            country_filter = self.country_filter.get()
-            if country_filter != "all":
-                query += " AND c.country_name = %s"
-                params.append(country_filter)
-            
-            year_filter = self.year_filter.get()
-            if year_filter != "all":
-                query += " AND p.car_year = %s"
-                params.append(int(year_filter))
-            
-            if search_text:
-                query += " AND (LOWER(p.vin_number) LIKE %s OR LOWER(p.car_make) LIKE %s OR LOWER(p.car_model) LIKE %s)"
-                params.extend([f"%{search_text}%", f"%{search_text}%", f"%{search_text}%"])
-            
-            query += " ORDER BY p.purchase_date DESC"
-            
-            cur.execute(query, params)
-            purchases = cur.fetchall()
-            cur.close()
-            
-            row_frame = None
-            for idx, purchase in enumerate(purchases):
-                if idx % 3 == 0:
-                    row_frame = tb.Frame(self.cards_frame)
-                    row_frame.pack(fill="x", pady=3)
-                
-                card = CarCard(row_frame, purchase, on_click=self._show_purchase_details)
-                card.pack(side="left", padx=8, fill="both", expand=True)
-            
-            if not purchases:
-                tb.Label(self.cards_frame, text="Нічого не знайдено", 
-                        font=("Segoe UI", 12)).pack(pady=40)
-                
-        except Error as e:
-            messagebox.showerror("Помилка", f"Помилка пошуку: {e}")
+        filters = tuple(self._facet_value(var.get())
+                        for var in (self.status_filter, self.country_filter, self.year_filter))
+        return search_text, filters
+
+    def _purchase_cards_filter(self, search_text, filters):
+        status_filter, country_filter, year_filter = filters
+        return PurchaseFilter(
+            status_key=None if status_filter == "all" else status_filter,
+            country_name=None if country_filter == "all" else country_filter,
+            car_year=None if year_filter == "all" else year_filter,
+            search=search_text
+        )
+
+    def _purchase_cards_query(self, search_text, filters, after=None):
+        spec = self._purchase_cards_filter(search_text, filters)
+        if self.local_filters.get():
+            def job(conn):
+                self.purchase_store.refresh(conn)
+                return self.purchase_store.find(spec), None
+            return job
+        return lambda conn: self.purchases.find_page(conn, spec, after)
+
+    # Local mode: filters are answered from the in-memory store while it is
+    # fresh; otherwise the query job refreshes it first.
+    def _purchase_cards_local(self, search_text, filters):
+        if not self.local_filters.get() or not self.purchase_store.fresh():
+            return None
+        return self.purchase_store.find(self._purchase_cards_filter(search_text, filters))
 
     def _show_purchase_details(self, purchase):
         self.selected_purchase = purchase
@@ -1170,7 +1145,9 @@ class EnhancedAutoTrackerApp(tb.Window):
         if self.details_view_mode.get() == "photos":
             carousel = ImageCarousel(self.details_view_container, 
                                    self.selected_purchase['purchase_id'], 
-                                   self.conn, self.current_user)
+                                   self.conn, self.current_user,
+                                   executor=self.executor,
+                                   image_loader=self.image_loader)
             carousel.pack(fill="both", expand=True)
         else:
             map_widget = MapWidget(self.details_view_container, self.selected_purchase)
@@ -1194,6 +1171,7 @@ class EnhancedAutoTrackerApp(tb.Window):
                 cur.execute(sql, tuple(values_list))
                 self.conn.commit()
                 cur.close()
+                self.purchase_store.invalidate("purchases")
                 
                 parent_window.destroy()
                 self._show_purchases_visual()
@@ -1247,10 +1225,7 @@ class EnhancedAutoTrackerApp(tb.Window):
         list_card.pack(fill="both", expand=True, padx=10, pady=5)
         
         try:
-            cur = self.conn.cursor(dictionary=True)
-            cur.execute("SELECT status_id, status_name FROM statuses ORDER BY order_index")
-            statuses = cur.fetchall()
-            cur.close()
+            statuses = self.reference_data.statuses()
             
             status_var = tb.StringVar(value=purchase['status_name'])
 
@@ -1291,6 +1266,7 @@ class EnhancedAutoTrackerApp(tb.Window):
                         """, (selected_status['status_id'], purchase['purchase_id']))
                         self.conn.commit()
                         cur.close()
+                        self.purchase_store.invalidate("purchases")
                         
                         messagebox.showinfo("Успіх", "Статус успішно оновлено!")
                         status_dialog.destroy()
@@ -1336,6 +1312,7 @@ class EnhancedAutoTrackerApp(tb.Window):
                 cur.execute(sql, tuple(data.values()))
                 self.conn.commit()
                 cur.close()
+                self.purchase_store.invalidate("purchases")
                 self._show_purchases_visual()
             except Error as e:
                 messagebox.showerror("Помилка", f"Помилка додавання: {str(e)}")
@@ -1362,36 +1339,16 @@ class EnhancedAutoTrackerApp(tb.Window):
         tree_container = tb.Frame(table_frame)
         tree_container.pack(fill="both", expand=True, pady=3)
 
-        try:
-            if table == "purchases":
-                query = """
-                    SELECT p.*, 
-                           c.country_name, 
-                           a.auction_name, 
-                           l.location_name, 
-                           s.status_name, 
-                           u.username,
-                           EXISTS(SELECT 1 FROM purchase_images WHERE purchase_id = p.purchase_id) as has_images
-                    FROM purchases p
-                    LEFT JOIN countries c ON p.country_id = c.country_id
-                    LEFT JOIN auctions a ON p.auction_id = a.auction_id
-                    LEFT JOIN locations l ON p.location_id = l.location_id
-                    LEFT JOIN statuses s ON p.status_id = s.status_id
-                    LEFT JOIN users u ON p.buyer_id = u.id
-                    ORDER BY p.purchase_date DESC
-                    LIMIT 100
-                """
-            else:
-                query = f"SELECT * FROM `{table}` LIMIT 100"
-                
-            cur = self.conn.cursor()
-            cur.execute(query)
-            rows = cur.fetchall()
-            cols = [description[0] for description in cur.description]
-            cur.close()
-        except Error as e:
-            tb.Label(tree_container, text=f"Помилка завантаження таблиці: {e}").pack()
-            return
+        if table == "purchases":
+            pager = KeysetPager(PURCHASE_TABLE_QUERY,
+                                [("p.purchase_date", "purchase_date"), ("p.purchase_id", "purchase_id")],
+                                descending=True, page_size=TABLE_PAGE_SIZE)
+        elif self._get_primary_key(table):
+            pk = self._get_primary_key(table)
+            pager = KeysetPager(f"SELECT * FROM `{table}`", [(f"`{pk}`", pk)],
+                                page_size=TABLE_PAGE_SIZE)
+        else:
+            pager = OffsetPager(f"SELECT * FROM `{table}`", page_size=TABLE_PAGE_SIZE)
 
         style = ttk.Style()
         style.configure("Treeview", 
@@ -1404,6 +1361,7 @@ class EnhancedAutoTrackerApp(tb.Window):
                        foreground="white",
                        relief="flat")
         
+        cols = []
         tree = ttk.Treeview(tree_container, columns=cols, show="headings", height=15, style="Treeview")
         
         vsb = ttk.Scrollbar(tree_container, orient="vertical", command=tree.yview)
@@ -1417,14 +1375,35 @@ class EnhancedAutoTrackerApp(tb.Window):
         tree_container.grid_rowconfigure(0, weight=1)
         tree_container.grid_columnconfigure(0, weight=1)
 
-        for col in cols:
-            tree.heading(col, text=col)
-            if col == 'has_images':
-                tree.column(col, width=70, minwidth=50, anchor="center")
-            else:
-                tree.column(col, width=100, minwidth=70, anchor="w")
+        tree.tag_configure('odd', 
+                          background=self.style.colors.light if hasattr(self.style.colors, 'light') else '#f8f9fa',
+                          foreground=self.style.colors.fg if hasattr(self.style.colors, 'fg') else '#000000')
+        tree.tag_configure('even', 
+                          background=self.style.colors.bg if hasattr(self.style.colors, 'bg') else '#ffffff',
+                          foreground=self.style.colors.fg if hasattr(self.style.colors, 'fg') else '#000000')
+
+        loading_label = tb.Label(table_frame, text="⏳ Завантаження...", 
+                                 font=("Segoe UI", 10), bootstyle="secondary")
+        loading_label.pack(before=tree_container, pady=3)
+
+        def fill_tree(result):
+            loading_label.pack_forget()
+            rows, new_cols = result
+
+            tree.delete(*tree.get_children())
+            if new_cols != cols:
+                cols[:] = new_cols
+                tree["columns"] = cols
+                for col in cols:
+                    tree.heading(col, text=col)
+                    if col == 'has_images':
+                        tree.column(col, width=70, minwidth=50, anchor="center")
+                    else:
+                        tree.column(col, width=100, minwidth=70, anchor="w")
+
+            tree_renderer.start(rows)
 
-        for i, row in enumerate(rows):
+        def insert_row(row, i):
             values = list(row)
             if 'has_images' in cols:
                 has_images_index = cols.index('has_images')
@@ -1435,59 +1414,94 @@ class EnhancedAutoTrackerApp(tb.Window):
             
             tree.insert("", "end", values=values, tags=('even',) if i % 2 == 0 else ('odd',))
 
-        tree.tag_configure('odd', 
-                          background=self.style.colors.light if hasattr(self.style.colors, 'light') else '#f8f9fa',
-                          foreground=self.style.colors.fg if hasattr(self.style.colors, 'fg') else '#000000')
-        tree.tag_configure('even', 
-                          background=self.style.colors.bg if hasattr(self.style.colors, 'bg') else '#ffffff',
-                          foreground=self.style.colors.fg if hasattr(self.style.colors, 'fg') else '#000000')
+        tree_renderer = ProgressiveRenderer(tree, insert_row, progress_parent=table_frame,
+                                            progress_pack={"fill": "x", "pady": 3, "before": tree_container})
+
+        pager_frame = tb.Frame(table_frame)
+        pager_frame.pack(fill="x", pady=3)
+
+        first_btn = tb.Button(pager_frame, text="⏮", bootstyle="secondary-outline", width=3,
+                              command=lambda: show_page("first"))
+        first_btn.pack(side="left", padx=2)
+        prev_btn = tb.Button(pager_frame, text="◀", bootstyle="secondary-outline", width=3,
+                             command=lambda: show_page("prev"))
+        prev_btn.pack(side="left", padx=2)
+
+        page_label = tb.Label(pager_frame, text="", font=("Segoe UI", 9), width=14, anchor="center")
+        page_label.pack(side="left", padx=5)
+
+        next_btn = tb.Button(pager_frame, text="▶", bootstyle="secondary-outline", width=3,
+                             command=lambda: show_page("next"))
+        next_btn.pack(side="left", padx=2)
+        last_btn = tb.Button(pager_frame, text="⏭", bootstyle="secondary-outline", width=3,
+                             command=lambda: show_page("last"))
+        last_btn.pack(side="left", padx=2)
+
+        tb.Label(pager_frame, text="Рядків:", font=("Segoe UI", 9)).pack(side="left", padx=(15, 3))
+        page_size_var = tb.StringVar(value=str(pager.page_size))
+        page_size_combo = tb.Combobox(pager_frame, textvariable=page_size_var,
+                                      values=[str(n) for n in TABLE_PAGE_SIZES],
+                                      state="readonly", width=5)
+        page_size_combo.pack(side="left")
+
+        def change_page_size(event=None):
+            pager.page_size = int(page_size_var.get())
+            show_page("first")
+
+        page_size_combo.bind("<<ComboboxSelected>>", change_page_size)
+
+        jump_var = tb.StringVar()
+        tb.Button(pager_frame, text="Перейти", bootstyle="info-outline",
+                  command=lambda: show_page("jump", jump_var.get().strip())).pack(side="right", padx=3)
+        jump_entry = tb.Entry(pager_frame, textvariable=jump_var, width=14)
+        jump_entry.pack(side="right", padx=3)
+        jump_entry.bind("<Return>", lambda e: show_page("jump", jump_var.get().strip()))
+        tb.Label(pager_frame, text=f"{pager.key_names[0]}:", font=("Segoe UI", 9)).pack(side="right")
+
+        def update_pager_controls():
+            first_btn.configure(state="normal" if pager.has_prev else "disabled")
+            prev_btn.configure(state="normal" if pager.has_prev else "disabled")
+            next_btn.configure(state="normal" if pager.has_next else "disabled")
+            last_btn.configure(state="normal" if pager.has_next and pager.supports_last else "disabled")
+            if pager.page_number:
+                page_label.configure(text=f"Сторінка {pager.page_number}")
+            elif pager.first_key is not None:
+                page_label.configure(text=f"від {pager.first_key[0]}")
+            else:
+                page_label.configure(text="")
+
+        def show_page(action, value=None, refresh=False, on_done=None):
+            request = pager.refresh_request() if refresh else pager.request(action, value)
+
+            def loaded(result):
+                loading_label.pack_forget()
+                rows, cols_ = result
+                page_rows = pager.accept(request, rows, cols_, refresh=refresh)
+                if page_rows is not None:
+                    fill_tree((page_rows, cols_))
+                update_pager_controls()
+                if on_done:
+                    on_done()
+
+            def failed(e):
+                loading_label.configure(text=f"Помилка завантаження таблиці: {e}", bootstyle="danger")
+                loading_label.pack(before=tree_container, pady=3)
+
+            loading_label.configure(text="⏳ Завантаження...", bootstyle="secondary")
+            loading_label.pack(before=tree_container, pady=3)
+            self.executor.submit(
+                lambda conn: self.purchases.execute(conn, request.sql, request.params), loaded, failed,
+                owner=tree, key="table_view"
+            )
+
+        show_page("first")
 
         btn_frame = tb.Frame(table_frame)
         btn_frame.pack(fill="x", pady=8)
 
         def refresh_table():
-            try:
-                tree.delete(*tree.get_children())
-                
-                if table == "purchases":
-                    query = """
-                        SELECT p.*, 
-                               c.country_name, 
-                               a.auction_name, 
-                               l.location_name, 
-                               s.status_name, 
-                               u.username,
-                               EXISTS(SELECT 1 FROM purchase_images WHERE purchase_id = p.purchase_id) as has_images
-                        FROM purchases p
-                        LEFT JOIN countries c ON p.country_id = c.country_id
-                        LEFT JOIN auctions a ON p.auction_id = a.auction_id
-                        LEFT JOIN locations l ON p.location_id = l.location_id
-                        LEFT JOIN statuses s ON p.status_id = s.status_id
-                        LEFT JOIN users u ON p.buyer_id = u.id
-                        ORDER BY p.purchase_date DESC
-                        LIMIT 100
-                    """
-                else:
-                    query = f"SELECT * FROM `{table}` LIMIT 100"
-                    
-                cur = self.conn.cursor()
-                cur.execute(query)
-                rows = cur.fetchall()
-                
-                for i, row in enumerate(rows):
-                    values = list(row)
-                    if 'has_images' in cols:
-                        has_images_index = cols.index('has_images')
-                        if values[has_images_index]:
-                            values[has_images_index] = "📷"
-                        else:
-                            values[has_images_index] = ""
-                    
-                    tree.insert("", "end", values=values, tags=('even',) if i % 2 == 0 else ('odd',))
-                cur.close()
-                messagebox.showinfo("Оновлено", "Таблицю оновлено")
-            except Error as e:
-                messagebox.showerror("Помилка", f"Помилка оновлення: {str(e)}")
+            show_page(None, refresh=True,
+                      on_done=lambda: messagebox.showinfo("Оновлено", "Таблицю оновлено"))
 
         def add_record():
             def save_data(data, mode):
@@ -1503,8 +1517,12 @@ class EnhancedAutoTrackerApp(tb.Window):
                     sql = f"INSERT INTO `{table}` ({columns}) VALUES ({placeholders})"
                     
                     cur.execute(sql, tuple(data.values()))
+                    if table == "purchase_images":
+                        refresh_image_summary(cur, [data.get("purchase_id")])
                     self.conn.commit()
                     cur.close()
+                    self.reference_data.invalidate(table, conn=self.conn)
+                    self.purchase_store.invalidate(table)
                     refresh_table()
                 except Error as e:
                     messagebox.showerror("Помилка", f"Помилка додавання: {str(e)}")
@@ -1546,8 +1564,13 @@ class EnhancedAutoTrackerApp(tb.Window):
                     values_list.append(data[pk])
                     
                     cur.execute(sql, tuple(values_list))
+                    if table == "purchase_images":
+                        refresh_image_summary(cur, [data.get("purchase_id"),
+                                                    updated_data.get("purchase_id")])
                     self.conn.commit()
                     cur.close()
+                    self.reference_data.invalidate(table, conn=self.conn)
+                    self.purchase_store.invalidate(table)
                     refresh_table()
                 except Error as e:
                     messagebox.showerror("Помилка", f"Помилка оновлення: {str(e)}")
@@ -1572,6 +1595,7 @@ class EnhancedAutoTrackerApp(tb.Window):
             try:
                 cur = self.conn.cursor()
                 success_count = 0
+                touched_purchases = []
                 
                 for item in selected:
                     vals = tree.item(item)["values"]
@@ -1581,12 +1605,18 @@ class EnhancedAutoTrackerApp(tb.Window):
                     try:
                         cur.execute(f"DELETE FROM `{table}` WHERE `{pk}`=%s", (pk_value,))
                         success_count += 1
+                        if table == "purchase_images":
+                            touched_purchases.append(vals[cols.index("purchase_id")])
                     except Error as e:
                         print(f"Помилка видалення запису {pk_value}: {e}")
                         continue
                 
+                if touched_purchases:
+                    refresh_image_summary(cur, touched_purchases)
                 self.conn.commit()
                 cur.close()
+                self.reference_data.invalidate(table, conn=self.conn)
+                self.purchase_store.invalidate(table)
                 
                 if success_count > 0:
                     messagebox.showinfo("Успіх", f"Видалено {success_count} записів!")
@@ -1616,6 +1646,81 @@ class EnhancedAutoTrackerApp(tb.Window):
         tb.Button(btn_frame, text="← Назад", bootstyle="dark",
                 command=self._show_admin_dashboard if self.current_user["role"] == "admin" else self._show_user_dashboard).pack(side="right", padx=3)
 
+    def _show_query_stats(self):
+        self._clear_main_content()
+
+        stats_frame = tb.Frame(self.main_content)
+        stats_frame.pack(fill="both", expand=True, padx=20, pady=20)
+
+        header_frame = tb.Frame(stats_frame)
+        header_frame.pack(fill="x", pady=(0, 10))
+
+        tb.Label(
+            header_frame,
+            text="🧪 Запити до бази даних",
+            font=("Segoe UI", 18, "bold")
+        ).pack(side="left")
+
+        stats = get_query_stats()
+
+        tb.Label(
+            stats_frame,
+            text=f"Повільні запити (≥ {stats.slow_ms} мс) записуються у {SLOW_QUERY_LOG}",
+            font=("Segoe UI", 9),
+            bootstyle="secondary"
+        ).pack(anchor="w", pady=(0, 8))
+
+        images_label = tb.Label(stats_frame, font=("Segoe UI", 9), bootstyle="secondary")
+        images_label.pack(anchor="w", pady=(0, 8))
+
+        tree_container = tb.Frame(stats_frame)
+        tree_container.pack(fill="both", expand=True)
+
+        columns = ("screen", "calls", "avg_ms", "max_ms", "total_ms", "rows", "errors", "fingerprint")
+        headings = {
+            "screen": "Екран", "calls": "Викликів", "avg_ms": "Сер., мс", "max_ms": "Макс., мс",
+            "total_ms": "Всього, мс", "rows": "Рядків", "errors": "Помилок", "fingerprint": "Запит",
+        }
+        tree = ttk.Treeview(tree_container, columns=columns, show="headings")
+        for col in columns:
+            tree.heading(col, text=headings[col])
+            tree.column(col, width=600 if col == "fingerprint" else 90,
+                        anchor="w" if col in ("screen", "fingerprint") else "e")
+        tree.column("screen", width=180)
+
+        vsb = ttk.Scrollbar(tree_container, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=vsb.set)
+        tree.pack(side="left", fill="both", expand=True)
+        vsb.pack(side="right", fill="y")
+
+        def fill():
+            images = get_image_memory_cache().stats()
+            images_label.configure(text=(
+                f"Кеш зображень: {images['entries']} шт., "
+                f"{images['bytes'] / 1024 / 1024:.1f} / {images['max_bytes'] / 1024 / 1024:.0f} МБ, "
+                f"влучань {images['hits']}, промахів {images['misses']} "
+                f"({images['hit_rate']:.0%}), витіснено {images['evictions']}"
+            ))
+
+            tree.delete(*tree.get_children())
+            for entry in stats.summary():
+                tree.insert("", "end", values=(
+                    entry["screen"], entry["calls"], f"{entry['avg_ms']:.1f}",
+                    f"{entry['max_ms']:.1f}", f"{entry['total_ms']:.0f}",
+                    entry["rows"], entry["errors"], entry["fingerprint"]
+                ))
+
+        def reset():
+            stats.reset()
+            fill()
+
+        tb.Button(header_frame, text="🗑️ Скинути", bootstyle="danger-outline",
+                  command=reset).pack(side="right", padx=3)
+        tb.Button(header_frame, text="🔄 Оновити", bootstyle="info",
+                  command=fill).pack(side="right", padx=3)
+
+        fill()
+
     def _show_analytics(self):
         self._clear_main_content()
 
@@ -1640,8 +1745,12 @@ class EnhancedAutoTrackerApp(tb.Window):
         ).pack(side="right")
 
 
-        try:
-            cur = self.conn.cursor()
+        stats_frame = tb.Frame(analytics_frame)
+        stats_frame.pack(fill="x", pady=10)
+        loading = self._show_loading(stats_frame)
+
+        def load(conn):
+            cur = conn.cursor()
             cur.execute("""
                 SELECT s.status_name, COUNT(p.purchase_id) as count
                 FROM statuses s
@@ -1651,61 +1760,19 @@ class EnhancedAutoTrackerApp(tb.Window):
             """)
             status_stats = cur.fetchall()
             cur.close()
+            return status_stats
 
-            max_value = max((c for (_, c) in status_stats), default=1)
-
-            stats_frame = tb.Frame(analytics_frame)
-            stats_frame.pack(fill="x", pady=10)
-
-            LABEL_WIDTH = 28
-            NUMBER_WIDTH = 4
-
-            for status_name, count in status_stats:
-                row = tb.Frame(stats_frame)
-                row.pack(fill="x", pady=4)
-
-                name_lower = status_name.lower()
-                if "куп" in name_lower:
-                    style = "info"
-                elif "порт" in name_lower:
-                    style = "warning"
-                elif "мор" in name_lower:
-                    style = "primary"
-                elif "укра" in name_lower:
-                    style = "success"
-                else:
-                    style = "secondary"
-
-                tb.Label(
-                    row,
-                    text=status_name,
-                    width=LABEL_WIDTH,
-                    anchor="w",
-                    font=("Segoe UI", 11)
-                ).pack(side="left")
-
-                percent = int((count / max_value) * 100) if max_value else 0
-
-                pb = tb.Progressbar(
-                    row,
-                    value=percent,
-                    maximum=100,
-                    bootstyle=style
-                )
-                pb.pack(side="left", fill="x", expand=True, padx=10, ipady=2)
+        def render(status_stats):
+            loading.destroy()
+            self._render_status_stats(stats_frame, status_stats)
 
-                tb.Label(
-                    row,
-                    text=str(count),
-                    width=NUMBER_WIDTH,
-                    anchor="e",
-                    font=("Segoe UI", 11, "bold")
-                ).pack(side="right")
-
-        except Error as e:
-            tb.Label(analytics_frame, text=f"Помилка завантаження аналітики: {e}",
+        def failed(e):
+            loading.destroy()
+            tb.Label(stats_frame, text=f"Помилка завантаження аналітики: {e}",
                     bootstyle="danger").pack()
 
+        self.executor.submit(load, render, failed, owner=stats_frame)
+
         tb.Button(
             analytics_frame,
             text="← Назад",
@@ -1715,6 +1782,54 @@ class EnhancedAutoTrackerApp(tb.Window):
         ).pack(side="bottom", pady=10)
 
 
+    def _render_status_stats(self, stats_frame, status_stats):
+        max_value = max((c for (_, c) in status_stats), default=1)
+
+        LABEL_WIDTH = 28
+        NUMBER_WIDTH = 4
+
+        for status_name, count in status_stats:
+            row = tb.Frame(stats_frame)
+            row.pack(fill="x", pady=4)
+
+            name_lower = status_name.lower()
+            if "куп" in name_lower:
+                style = "info"
+            elif "порт" in name_lower:
+                style = "warning"
+            elif "мор" in name_lower:
+                style = "primary"
+            elif "укра" in name_lower:
+                style = "success"
+            else:
+                style = "secondary"
+
+            tb.Label(
+                row,
+                text=status_name,
+                width=LABEL_WIDTH,
+                anchor="w",
+                font=("Segoe UI", 11)
+            ).pack(side="left")
+
+            percent = int((count / max_value) * 100) if max_value else 0
+
+            pb = tb.Progressbar(
+                row,
+                value=percent,
+                maximum=100,
+                bootstyle=style
+            )
+            pb.pack(side="left", fill="x", expand=True, padx=10, ipady=2)
+
+            tb.Label(
+                row,
+                text=str(count),
+                width=NUMBER_WIDTH,
+                anchor="e",
+                font=("Segoe UI", 11, "bold")
+            ).pack(side="right")
+
     def _open_report_range_dialog(self):
         dlg = tb.Toplevel(self)
         dlg.title("Створити звіт за період")
@@ -1827,11 +1942,8 @@ class EnhancedAutoTrackerApp(tb.Window):
 
         ext = os.path.splitext(file)[1].lower()
 
-        try:
-            cur = self.conn.cursor() 
-            cur.execute("SHOW COLUMNS FROM purchases")
-            columns = [col[0] for col in cur.fetchall()]
-            cur.close()
+        def build(conn):
+            columns = self.schema.column_names("purchases")
 
             query = f"""
                 SELECT {", ".join(columns)}
@@ -1840,7 +1952,7 @@ class EnhancedAutoTrackerApp(tb.Window):
                 ORDER BY purchase_date ASC
             """
 
-            cur = self.conn.cursor(dictionary=True)
+            cur = conn.cursor(dictionary=True)
             cur.execute(query, (date_from, date_to))
             rows = cur.fetchall()
             cur.close()
@@ -1848,8 +1960,7 @@ class EnhancedAutoTrackerApp(tb.Window):
             total = len(rows)
 
             if not rows:
-                messagebox.showinfo("Звіт", "Немає покупок за обраний період.")
-                return
+                return None
 
             if ext == ".csv":
                 import csv
@@ -1876,11 +1987,19 @@ class EnhancedAutoTrackerApp(tb.Window):
                 ws.append([f"За період з {date_from} по {date_to} було куплено {total} автомобілів."])
                 wb.save(file)
 
-            messagebox.showinfo("Готово", f"Звіт збережено:\n{file}")
+            return file
 
-        except Exception as e:
+        def done(saved_file):
+            if saved_file is None:
+                messagebox.showinfo("Звіт", "Немає покупок за обраний період.")
+            else:
+                messagebox.showinfo("Готово", f"Звіт збережено:\n{saved_file}")
+
+        def failed(e):
             import traceback
-            messagebox.showerror("Помилка", traceback.format_exc())
+            messagebox.showerror("Помилка", "".join(traceback.format_exception(e)))
+
+        self.executor.submit(build, done, failed)
 
 
 
@@ -1946,22 +2065,45 @@ class EnhancedAutoTrackerApp(tb.Window):
 
         stats_frame = tb.Frame(self.main_content)
         stats_frame.pack(fill="x", pady=8)
+        loading = self._show_loading(stats_frame)
+        user_id = self.current_user['id']
 
-        try:
-            cur = self.conn.cursor()
+        def load(conn):
+            cur = conn.cursor()
             
-            cur.execute("SELECT COUNT(*) FROM purchases WHERE buyer_id = %s", (self.current_user['id'],))
+            cur.execute("SELECT COUNT(*) FROM purchases WHERE buyer_id = %s", (user_id,))
             total_purchases = cur.fetchone()[0]
             
             cur.execute("SELECT COUNT(*) FROM purchases WHERE buyer_id = %s AND status_id in (1,2,3,4,5,6,7,8)", 
-                       (self.current_user['id'],))
+                       (user_id,))
             active_deliveries = cur.fetchone()[0]
             
             cur.execute("SELECT COUNT(*) FROM purchases WHERE buyer_id = %s AND status_id = 9", 
-                       (self.current_user['id'],))
+                       (user_id,))
             delivered = cur.fetchone()[0]
             
             cur.close()
+
+            cur = conn.cursor(dictionary=True)
+            cur.execute("""
+                SELECT p.*, s.status_name,
+                       DATEDIFF(CURDATE(), p.estimated_arrival_date) as days_late
+                FROM purchases p
+                LEFT JOIN statuses s ON p.status_id = s.status_id
+                WHERE p.buyer_id = %s 
+                AND p.estimated_arrival_date < CURDATE()
+                AND p.is_delivered = FALSE
+                AND s.status_name NOT LIKE '%Україні%'
+                ORDER BY p.estimated_arrival_date ASC
+            """, (user_id,))
+            late_cars = cur.fetchall()
+            cur.close()
+
+            return (total_purchases, active_deliveries, delivered), late_cars
+
+        def render(result):
+            loading.destroy()
+            (total_purchases, active_deliveries, delivered), late_cars = result
             
             stats = [
                 ("🚗 Всього авто", total_purchases, "primary"),
@@ -1976,25 +2118,6 @@ class EnhancedAutoTrackerApp(tb.Window):
                         bootstyle=f"inverse-{style}").pack()
                 tb.Label(card, text=str(count), font=("Segoe UI", 18, "bold"),
                         bootstyle=f"inverse-{style}").pack()
-                
-        except Error as e:
-            print(f"Помилка завантаження статистики користувача: {e}")
-
-        try:
-            cur = self.conn.cursor(dictionary=True)
-            cur.execute("""
-                SELECT p.*, s.status_name,
-                       DATEDIFF(CURDATE(), p.estimated_arrival_date) as days_late
-                FROM purchases p
-                LEFT JOIN statuses s ON p.status_id = s.status_id
-                WHERE p.buyer_id = %s 
-                AND p.estimated_arrival_date < CURDATE()
-                AND p.is_delivered = FALSE
-                AND s.status_name NOT LIKE '%Україні%'
-                ORDER BY p.estimated_arrival_date ASC
-            """, (self.current_user['id'],))
-            late_cars = cur.fetchall()
-            cur.close()
 
             if late_cars:
                 late_frame = tb.LabelFrame(self.main_content, text="⚠️ Мої авто з запізненням", padding=12)
@@ -2018,7 +2141,7 @@ class EnhancedAutoTrackerApp(tb.Window):
                 canvas.pack(side="left", fill="both", expand=True)
                 scrollbar.pack(side="right", fill="y")
                 
-                for car in late_cars:
+                def add_car(car, index):
                     car_frame = tb.Frame(late_cars_content)
                     car_frame.pack(fill="x", pady=6)
                     
@@ -2035,9 +2158,16 @@ class EnhancedAutoTrackerApp(tb.Window):
                              command=lambda c=car: self._show_purchase_details(c)).pack(anchor="w", pady=3)
                     
                     ttk.Separator(car_frame, orient='horizontal').pack(fill='x', pady=3)
-                    
-        except Error as e:
-            print(f"Помилка завантаження запізнілих авто для користувача: {e}")
+
+                ProgressiveRenderer(late_cars_content, add_car, progress_parent=late_frame,
+                                    progress_pack={"fill": "x", "pady": 3,
+                                                   "before": late_cars_scroll_container}).start(late_cars)
+
+        def failed(e):
+            loading.destroy()
+            print(f"Помилка завантаження статистики користувача: {e}")
+
+        self.executor.submit(load, render, failed, owner=stats_frame)
 
     def _show_my_purchases(self):
         self._clear_main_content()
@@ -2127,13 +2257,12 @@ class EnhancedAutoTrackerApp(tb.Window):
 
         search_entry.bind("<FocusIn>", on_search_focus_in)
         search_entry.bind("<FocusOut>", on_search_focus_out)
-        search_entry.bind("<KeyRelease>", lambda e: self._filter_my_purchases())
 
         tb.Button(
             row2,
             text="🔍 Пошук",
             bootstyle="info",
-            command=self._filter_my_purchases
+            command=self._load_my_purchases
         ).pack(side="left", padx=5)
 
         tb.Button(
@@ -2143,23 +2272,24 @@ class EnhancedAutoTrackerApp(tb.Window):
             command=self._reset_user_filters
         ).pack(side="right", padx=5)
 
-        cards_container = tb.Frame(self.main_content)
-        cards_container.pack(fill="both", expand=True, pady=8)
-        
-        canvas = Canvas(cards_container)
-        scrollbar = ttk.Scrollbar(cards_container, orient="vertical", command=canvas.yview)
-        self.user_cards_frame = tb.Frame(canvas)
-        
-        self.user_cards_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
+        self.user_cards_frame = VirtualCardGrid(self.main_content, on_click=self._show_purchase_details,
+                                                image_loader=self.image_loader,
+                                                on_near_end=lambda: self.my_cards_search.load_more())
+        self.user_cards_frame.pack(fill="both", expand=True, pady=8)
+
+        self.my_cards_search = SearchPipeline(
+            self.user_cards_frame, self.executor,
+            read_state=self._my_purchases_state,
+            build_job=self._my_purchases_query,
+            render=lambda purchases, text, has_more: self._render_purchase_cards(
+                self.user_cards_frame, purchases,
+                "Нічого не знайдено" if text else "У вас ще немає покупок за обраними фільтрами", has_more),
+            append=self.user_cards_frame.append_items,
+            on_loading=lambda: self._show_cards_loading(self.user_cards_frame),
+            on_error=lambda e: messagebox.showerror("Помилка", f"Помилка завантаження: {e}"),
+            key="my_purchases_cards"
         )
-        
-        canvas.create_window((0, 0), window=self.user_cards_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
-        
-        canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        search_entry.bind("<KeyRelease>", self.my_cards_search.on_key)
         
         self._load_my_purchases()
 
@@ -2171,126 +2301,24 @@ class EnhancedAutoTrackerApp(tb.Window):
         self._load_my_purchases()
     
     def _load_my_purchases(self, event=None):
-        for w in self.user_cards_frame.winfo_children():
-            w.destroy()
-        
-        try:
-            cur = self.conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.country_name, a.auction_name, l.location_name, 
-                       s.status_name, u.username, port.port_name,
-                       EXISTS(SELECT 1 FROM purchase_images WHERE purchase_id = p.purchase_id) as has_images,
-                       (SELECT image_url FROM purchase_images WHERE purchase_id = p.purchase_id LIMIT 1) as first_image_path
-                FROM purchases p
-                LEFT JOIN countries c ON p.country_id = c.country_id
-                LEFT JOIN auctions a ON p.auction_id = a.auction_id
-                LEFT JOIN locations l ON p.location_id = l.location_id
-                LEFT JOIN statuses s ON p.status_id = s.status_id
-                LEFT JOIN users u ON p.buyer_id = u.id
-                LEFT JOIN locations loc ON p.location_id = loc.location_id
-                LEFT JOIN ports port ON loc.default_port_id = port.port_id
-                WHERE p.buyer_id = %s
-            """
-            
-            params = [self.current_user['id']]
-            
-            status_filter = self.user_status_filter.get()
-            if status_filter != "all":
-                query += " AND s.status_key = %s"
-                params.append(status_filter)
-            
-            year_filter = self.user_year_filter.get()
-            if year_filter != "all":
-                query += " AND p.car_year = %s"
-                params.append(int(year_filter))
-            
-            query += " ORDER BY p.purchase_date DESC"
-            
-            cur.execute(query, params)
-            purchases = cur.fetchall()
-            cur.close()
-            
-            row_frame = None
-            for idx, purchase in enumerate(purchases):
-                if idx % 3 == 0:
-                    row_frame = tb.Frame(self.user_cards_frame)
-                    row_frame.pack(fill="x", pady=3)
-                
-                card = CarCard(row_frame, purchase, on_click=self._show_purchase_details)
-                card.pack(side="left", padx=8, fill="both", expand=True)
-            
-            if not purchases:
-                tb.Label(self.user_cards_frame, text="У вас ще немає покупок за обраними фільтрами", 
-                        font=("Segoe UI", 12)).pack(pady=40)
-                
-        except Error as e:
-            messagebox.showerror("Помилка", f"Помилка завантаження: {e}")
-    
-    def _filter_my_purchases(self):
-        search_text = self.user_search_var.get().lower()
+        self.my_cards_search.run_now()
+
+    def _my_purchases_state(self):
+        search_text = self.user_search_var.get().strip()
         if search_text == "Пошук по VIN, марці, моделі...":
             search_text = ""
-        
-        for w in self.user_cards_frame.winfo_children():
-            w.destroy()
-        
-        try:
-            cur = self.conn.cursor(dictionary=True)
-            
-            query = """
-                SELECT p.*, c.country_name, a.auction_name, l.location_name, 
-                       s.status_name, u.username, port.port_name,
-                       EXISTS(SELECT 1 FROM purchase_images WHERE purchase_id = p.purchase_id) as has_images,
-                       (SELECT image_url FROM purchase_images WHERE purchase_id = p.purchase_id LIMIT 1) as first_image_path
-                FROM purchases p
-                LEFT JOIN countries c ON p.country_id = c.country_id
-                LEFT JOIN auctions a ON p.auction_id = a.auction_id
-                LEFT JOIN locations l ON p.location_id = l.location_id
-                LEFT JOIN statuses s ON p.status_id = s.status_id
-                LEFT JOIN users u ON p.buyer_id = u.id
-                LEFT JOIN locations loc ON p.location_id = loc.location_id
-                LEFT JOIN ports port ON loc.default_port_id = port.port_id
-                WHERE p.buyer_id = %s
-            """
-            
-            params = [self.current_user['id']]
-            
-            status_filter = self.user_status_filter.get()
-            if status_filter != "all":
-                query += " AND s.status_key = %s"
-                params.append(status_filter)
-            
-            year_filter = self.user_year_filter.get()
-            if year_filter != "all":
-                query += " AND p.car_year = %s"
-                params.append(int(year_filter))
-            
-            if search_text:
-                query += " AND (LOWER(p.vin_number) LIKE %s OR LOWER(p.car_make) LIKE %s OR LOWER(p.car_model) LIKE %s)"
-                params.extend([f"%{search_text}%", f"%{search_text}%", f"%{search_text}%"])
-            
-            query += " ORDER BY p.purchase_date DESC"
-            
-            cur.execute(query, params)
-            purchases = cur.fetchall()
-            cur.close()
-            
-            row_frame = None
-            for idx, purchase in enumerate(purchases):
-                if idx % 3 == 0:
-                    row_frame = tb.Frame(self.user_cards_frame)
-                    row_frame.pack(fill="x", pady=3)
-                
-                card = CarCard(row_frame, purchase, on_click=self._show_purchase_details)
-                card.pack(side="left", padx=8, fill="both", expand=True)
-            
-            if not purchases:
-                tb.Label(self.user_cards_frame, text="Нічого не знайдено", 
-                        font=("Segoe UI", 12)).pack(pady=40)
-                
-        except Error as e:
-            messagebox.showerror("Помилка", f"Помилка пошуку: {e}")
+        filters = (self.current_user['id'], self.user_status_filter.get(), self.user_year_filter.get())
+        return search_text, filters
+
+    def _my_purchases_query(self, search_text, filters, after=None):
+        user_id, status_filter, year_filter = filters
+        spec = PurchaseFilter(
+            buyer_id=user_id,
+            status_key=None if status_filter == "all" else status_filter,
+            car_year=None if year_filter == "all" else year_filter,
+            search=search_text
+        )
+        return lambda conn: self.purchases.find_page(conn, spec, after)
 
     def _show_user_analytics(self):
         self._clear_main_content()
@@ -2315,8 +2343,13 @@ class EnhancedAutoTrackerApp(tb.Window):
             command=self._open_user_report_dialog
         ).pack(side="right")
 
-        try:
-            cur = self.conn.cursor()
+        stats_frame = tb.Frame(analytics_frame)
+        stats_frame.pack(fill="x", pady=10)
+        loading = self._show_loading(stats_frame)
+        user_id = self.current_user["id"]
+
+        def load(conn):
+            cur = conn.cursor()
             cur.execute("""
                 SELECT s.status_name, COUNT(p.purchase_id) AS count
                 FROM statuses s
@@ -2325,68 +2358,26 @@ class EnhancedAutoTrackerApp(tb.Window):
                     AND p.buyer_id = %s
                 GROUP BY s.status_id, s.status_name
                 ORDER BY s.order_index
-            """, (self.current_user["id"],))
+            """, (user_id,))
 
             status_stats = cur.fetchall()
             cur.close()
+            return status_stats
 
-            stats_frame = tb.Frame(analytics_frame)
-            stats_frame.pack(fill="x", pady=10)
-
-            max_value = max((c for (_, c) in status_stats), default=1)
-
-            LABEL_WIDTH = 28
-            NUMBER_WIDTH = 4
-
-            for status_name, count in status_stats:
-                row = tb.Frame(stats_frame)
-                row.pack(fill="x", pady=4)
-
-                name_lower = status_name.lower()
-                if "куп" in name_lower:
-                    style = "info"
-                elif "порт" in name_lower:
-                    style = "warning"
-                elif "мор" in name_lower:
-                    style = "primary"
-                elif "укра" in name_lower:
-                    style = "success"
-                else:
-                    style = "secondary"
-
-                tb.Label(
-                    row,
-                    text=status_name,
-                    width=LABEL_WIDTH,
-                    anchor="w",
-                    font=("Segoe UI", 11)
-                ).pack(side="left")
-
-                percent = int((count / max_value) * 100) if max_value else 0
-
-                pb = tb.Progressbar(
-                    row,
-                    value=percent,
-                    maximum=100,
-                    bootstyle=style
-                )
-                pb.pack(side="left", fill="x", expand=True, padx=10, ipady=2)
-
-                tb.Label(
-                    row,
-                    text=str(count),
-                    width=NUMBER_WIDTH,
-                    anchor="e",
-                    font=("Segoe UI", 11, "bold")
-                ).pack(side="right")
+        def render(status_stats):
+            loading.destroy()
+            self._render_status_stats(stats_frame, status_stats)
 
-        except Exception as e:
+        def failed(e):
+            loading.destroy()
             tb.Label(
-                analytics_frame,
+                stats_frame,
                 text=f"Помилка завантаження статистики:\n{e}",
                 bootstyle="danger"
             ).pack()
 
+        self.executor.submit(load, render, failed, owner=stats_frame)
+
         tb.Button(
             analytics_frame,
             text="← Назад",
@@ -2503,12 +2494,10 @@ class EnhancedAutoTrackerApp(tb.Window):
         date_to = str(data["to"])
         file = data["file"]
         ext = os.path.splitext(file)[1].lower()
+        user_id = self.current_user["id"]
 
-        try:
-            cur = self.conn.cursor()
-            cur.execute("SHOW COLUMNS FROM purchases")
-            columns = [col[0] for col in cur.fetchall()]
-            cur.close()
+        def build(conn):
+            columns = self.schema.column_names("purchases")
 
             query = f"""
                 SELECT {", ".join(columns)}
@@ -2518,16 +2507,15 @@ class EnhancedAutoTrackerApp(tb.Window):
                 ORDER BY purchase_date ASC
             """
 
-            cur = self.conn.cursor(dictionary=True)
-            cur.execute(query, (self.current_user["id"], date_from, date_to))
+            cur = conn.cursor(dictionary=True)
+            cur.execute(query, (user_id, date_from, date_to))
             rows = cur.fetchall()
             cur.close()
 
             total = len(rows)
 
             if not rows:
-                messagebox.showinfo("Звіт", "Немає ваших покупок за даний період.")
-                return
+                return None
 
             if ext == ".csv":
                 import csv
@@ -2554,11 +2542,19 @@ class EnhancedAutoTrackerApp(tb.Window):
                 ws.append([f"За період з {date_from} по {date_to} ви купили {total} автомобілів."])
                 wb.save(file)
 
-            messagebox.showinfo("Готово", f"Звіт збережено:\n{file}")
+            return file
 
-        except Exception as e:
+        def done(saved_file):
+            if saved_file is None:
+                messagebox.showinfo("Звіт", "Немає ваших покупок за даний період.")
+            else:
+                messagebox.showinfo("Готово", f"Звіт збережено:\n{saved_file}")
+
+        def failed(e):
             import traceback
-            messagebox.showerror("Помилка", traceback.format_exc())
+            messagebox.showerror("Помилка", "".join(traceback.format_exception(e)))
+
+        self.executor.submit(build, done, failed)
 
 
     def _toggle_theme(self):
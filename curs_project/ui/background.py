@@ -0,0 +1,148 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import TclError
+from database import get_pool, calling_screen, tagged_screen
+from config import QUERY_WORKERS, DISPATCH_POLL_MS
+
+
+def widget_alive(widget):
+    try:
+        return bool(widget.winfo_exists())
+    except TclError:
+        return False
+
+
+# Tk is not thread-safe: worker threads post callbacks here and the Tk main
+# loop drains them with after().
+class TkDispatcher:
+    def __init__(self, root, poll_ms=DISPATCH_POLL_MS):
+        self.root = root
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._job = self.root.after(self.poll_ms, self._pump)
+
+    def post(self, callback, *args):
+        self._queue.put((callback, args))
+
+    def _pump(self):
+        while True:
+            try:
+                callback, args = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Помилка обробки результату: {e}")
+        self._job = self.root.after(self.poll_ms, self._pump)
+
+    def stop(self):
+        if self._job is not None:
+            try:
+                self.root.after_cancel(self._job)
+            except TclError:
+                pass
+            self._job = None
+
+
+# Runs work on a fixed pool of worker threads and hands the finished
+# future to `deliver` on the Tk thread. Nothing is delivered once `owner`
+# is destroyed; with `key`, a newer submission under the same key cancels
+# the older one if it has not started yet and suppresses it otherwise.
+class BackgroundPool:
+    def __init__(self, dispatcher, workers, thread_name_prefix):
+        self.dispatcher = dispatcher
+        self._latest = {}
+        self._lock = threading.Lock()
+        self._workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix)
+
+    def cancel(self, key):
+        with self._lock:
+            previous = self._latest.pop(key, None)
+        if previous is not None:
+            previous.cancel()
+
+    def _submit(self, fn, args, deliver, owner=None, key=None):
+        future = self._workers.submit(fn, *args)
+
+        if key is not None:
+            with self._lock:
+                previous = self._latest.get(key)
+                self._latest[key] = future
+            if previous is not None:
+                previous.cancel()
+
+        future.add_done_callback(
+            lambda f: self.dispatcher.post(self._deliver, f, deliver, owner, key)
+        )
+        return future
+
+    def _deliver(self, future, deliver, owner, key):
+        if future.cancelled():
+            return
+
+        if key is not None:
+            with self._lock:
+                if self._latest.get(key) is not future:
+                    return
+                del self._latest[key]
+
+        if owner is not None and not widget_alive(owner):
+            return
+
+        deliver(future)
+
+    # fn() on a worker; on_success(result) or on_error(exception) on the Tk thread
+    def run(self, fn, on_success=None, on_error=None, owner=None, key=None):
+        return self._submit(fn, (), lambda f: self._report(f, on_success, on_error), owner, key)
+
+    def _report(self, future, on_success, on_error):
+        error = future.exception()
+        if error is not None:
+            if on_error:
+                on_error(error)
+            else:
+                print(f"Помилка фонового запиту: {error}")
+            return
+
+        if on_success:
+            on_success(future.result())
+
+    def shutdown(self):
+        self._workers.shutdown(wait=False, cancel_futures=True)
+
+
+class QueryExecutor(BackgroundPool):
+    def __init__(self, dispatcher, workers=QUERY_WORKERS):
+        super().__init__(dispatcher, workers, "db-worker")
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = get_pool().acquire()
+            self._local.conn = conn
+        return conn
+
+    def _run(self, job, screen):
+        conn = self._connection()
+        try:
+            with tagged_screen(screen):
+                result = job(conn)
+            # End the transaction so the next job sees a fresh snapshot.
+            conn.commit()
+            return result
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+
+    # Runs job(conn) on a worker's own connection and delivers the result on
+    # the Tk thread, see BackgroundPool for `owner` and `key`. The job's
+    # statements are credited to the screen that submitted it.
+    def submit(self, job, on_success=None, on_error=None, owner=None, key=None):
+        return self._submit(self._run, (job, calling_screen()),
+                            lambda f: self._report(f, on_success, on_error), owner, key)
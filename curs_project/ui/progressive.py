@@ -0,0 +1,87 @@
+import time
+from tkinter import TclError
+import ttkbootstrap as tb
+from config import RENDER_CHUNK_MS
+from ui.background import widget_alive
+
+
+# Builds UI rows a slice at a time: each slice runs build(item, index) for
+# at most `budget_ms`, then yields back to the Tk event loop with after().
+# The first slice runs straight away, so the first rows appear with the
+# data. Rendering stops by itself once `owner` is destroyed (navigating
+# away clears main_content); start() on the same renderer cancels the
+# previous run. With `progress_parent`, a progress bar is shown there for
+# as long as rows are still being built.
+class ProgressiveRenderer:
+    def __init__(self, owner, build, on_done=None, progress_parent=None, progress_pack=None,
+                 budget_ms=RENDER_CHUNK_MS):
+        self.owner = owner
+        self.build = build
+        self.on_done = on_done
+        self.progress_parent = progress_parent
+        self.progress_pack = progress_pack or {"fill": "x", "pady": 3}
+        self.budget = budget_ms / 1000
+        self._items = []
+        self._index = 0
+        self._job = None
+        self._progress = None
+
+    @property
+    def running(self):
+        return self._job is not None
+
+    def start(self, items):
+        self.cancel()
+        self._items = list(items)
+        self._index = 0
+        self._step()
+
+    def cancel(self):
+        if self._job is not None:
+            try:
+                self.owner.after_cancel(self._job)
+            except TclError:
+                pass
+            self._job = None
+        self._hide_progress()
+
+    def _show_progress(self):
+        if self.progress_parent is None or not widget_alive(self.progress_parent):
+            return
+        if self._progress is None:
+            self._progress = tb.Progressbar(self.progress_parent, mode="determinate",
+                                            bootstyle="info-striped")
+            self._progress.pack(**self.progress_pack)
+        self._progress.configure(maximum=len(self._items), value=self._index)
+
+    def _hide_progress(self):
+        if self._progress is not None:
+            if widget_alive(self._progress):
+                self._progress.destroy()
+            self._progress = None
+
+    def _step(self):
+        self._job = None
+        if not widget_alive(self.owner):
+            self._hide_progress()
+            return
+
+        deadline = time.perf_counter() + self.budget
+        total = len(self._items)
+        while self._index < total:
+            try:
+                self.build(self._items[self._index], self._index)
+            except Exception as e:
+                print(f"Помилка побудови рядка {self._index}: {e}")
+            self._index += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        if self._index < total:
+            self._show_progress()
+            self._job = self.owner.after(1, self._step)
+            return
+
+        self._hide_progress()
+        if self.on_done:
+            self.on_done()
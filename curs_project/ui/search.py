@@ -0,0 +1,153 @@
+from database import search_matches, search_narrows
+from ui.background import widget_alive
+from config import SEARCH_DEBOUNCE_MS
+
+
+# Search box -> query -> render, for the card screens.
+#   read_state()                     -> (search_text, filters), on the Tk thread
+#   build_job(text, filters, after)  -> job(conn) returning (rows, cursor);
+#                                       cursor is None once nothing is left
+#   render(rows, text, has_more)
+#   append(rows, has_more)           -> next page of the same result
+#   local(text, filters)             -> the complete result from memory, or
+#                                       None to go to the database
+# Keystrokes are debounced; results of superseded queries are never shown;
+# when the new text only narrows the last complete result under the same
+# filters, it is filtered in memory and MySQL is not asked at all. A result
+# that still has pages on the server is never narrowed locally.
+class SearchPipeline:
+    def __init__(self, owner, executor, read_state, build_job, render, append=None, local=None,
+                 on_loading=None, on_error=None, key=None, delay_ms=SEARCH_DEBOUNCE_MS):
+        self.owner = owner
+        self.executor = executor
+        self.read_state = read_state
+        self.build_job = build_job
+        self.render = render
+        self.append = append
+        self.local = local
+        self.on_loading = on_loading
+        self.on_error = on_error
+        self.key = key if key is not None else ("search", id(self))
+        self.delay_ms = delay_ms
+
+        self._after_id = None
+        self._requested = None
+        self._base = None  # (text, filters, rows) of the last complete result
+        self._generation = 0
+        self._cursor = None
+        self._loading_more = False
+
+    def on_key(self, event=None):
+        self._cancel_pending()
+        if widget_alive(self.owner):
+            self._after_id = self.owner.after(self.delay_ms, self._fire)
+
+    def _fire(self):
+        self._after_id = None
+        self.run(force=False)
+
+    def _cancel_pending(self):
+        if self._after_id is not None:
+            try:
+                self.owner.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    # Explicit actions (button, filter change, reset) always go to MySQL.
+    def run_now(self):
+        self._cancel_pending()
+        self._base = None
+        self.run(force=True)
+
+    def invalidate(self):
+        self._base = None
+
+    def run(self, force=False):
+        if not widget_alive(self.owner):
+            return
+
+        text, filters = self.read_state()
+        state = (text, filters)
+        if not force and state == self._requested:
+            return
+        self._requested = state
+
+        self._generation += 1
+        self._cursor = None
+        self._loading_more = False
+
+        if self.local is not None:
+            rows = self.local(text, filters)
+            if rows is not None:
+                self.render(rows, text, False)
+                return
+
+        base = self._base
+        if base is not None and base[1] == filters and search_narrows(base[0], text):
+            rows = [row for row in base[2] if search_matches(row, text)]
+            self.render(rows, text, False)
+            return
+
+        if self.on_loading:
+            self.on_loading()
+        generation = self._generation
+        self.executor.submit(
+            self.build_job(text, filters, None),
+            lambda result: self._accept(generation, text, filters, result),
+            lambda e: self._failed(generation, e),
+            owner=self.owner,
+            key=self.key
+        )
+
+    def _accept(self, generation, text, filters, result):
+        rows, cursor = result
+        if cursor is None:
+            self._base = (text, filters, rows)
+        if generation == self._generation:
+            self._cursor = cursor
+            self.render(rows, text, cursor is not None)
+
+    # A failed query must not block retrying the same text and filters.
+    def _failed(self, generation, error):
+        if generation == self._generation:
+            self._requested = None
+        if self.on_error:
+            self.on_error(error)
+
+    # Next page of the result on screen; a no-op while one is in flight or
+    # when everything has been loaded.
+    def load_more(self):
+        if self.append is None or self._cursor is None or self._loading_more:
+            return
+        if not widget_alive(self.owner):
+            return
+        text, filters = self._requested
+        generation = self._generation
+        self._loading_more = True
+        self.executor.submit(
+            self.build_job(text, filters, self._cursor),
+            lambda result: self._accept_more(generation, result),
+            lambda e: self._more_failed(generation, e),
+            owner=self.owner,
+            key=(self.key, "more")
+        )
+
+    def _accept_more(self, generation, result):
+        if generation != self._generation:
+            return
+        self._loading_more = False
+        rows, self._cursor = result
+        self.append(rows, self._cursor is not None)
+
+    # The rest of the result is given up on, so scrolling does not retry and
+    # report it again; running the same search again starts over.
+    def _more_failed(self, generation, error):
+        if generation != self._generation:
+            return
+        self._loading_more = False
+        self._cursor = None
+        self._requested = None
+        self.append([], False)
+        if self.on_error:
+            self.on_error(error)
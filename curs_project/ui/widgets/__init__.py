@@ -1,6 +1,7 @@
 # Widgets package initialization
 from .calendar_dialog import CalendarDialog
 from .car_card import CarCard
+from .card_grid import VirtualCardGrid
 from .crud_dialog import ModernCRUDDialog
 from .days_counter import DaysCounterWidget
 from .image_carousel import ImageCarousel
@@ -9,6 +10,7 @@ from .map_widget import MapWidget
 __all__ = [
     'CalendarDialog',
     'CarCard',
+    'VirtualCardGrid',
     'ModernCRUDDialog',
     'DaysCounterWidget',
     'ImageCarousel',
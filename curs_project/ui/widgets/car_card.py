@@ -1,24 +1,29 @@
 import datetime
 import os
-import io
-import urllib.request
-import ssl
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
-from config import ASSETS_DIR
+from config import ASSETS_DIR, CARD_PHOTO_SIZE
+from media import load_photo, load_thumbnail
 
 
-PHOTO_WIDTH = 260
-PHOTO_HEIGHT = 160
+PHOTO_WIDTH, PHOTO_HEIGHT = CARD_PHOTO_SIZE
 
+_NO_IMAGE = object()
 
+
+# Widgets are built once; rebind() points the card at another purchase and
+# only updates what changed, so a grid can keep reusing the same cards.
 class CarCard(tb.Frame):
-    def __init__(self, parent, car_data, on_click=None):
+    _placeholder_photo = None
+
+    def __init__(self, parent, car_data=None, on_click=None, image_loader=None):
         super().__init__(parent, padding=5)
 
-        self.car_data = car_data
+        self.car_data = None
         self.on_click = on_click
+        self.image_loader = image_loader
+        self._image_path = _NO_IMAGE
 
         self.card = tb.Frame(
             self,
@@ -34,16 +39,23 @@ class CarCard(tb.Frame):
         self._create_card()
 
         if on_click:
-            self.card.bind("<Button-1>", lambda e: on_click(car_data))
+            self.card.bind("<Button-1>", self._clicked)
             for child in self.card.winfo_children():
-                child.bind("<Button-1>", lambda e: on_click(car_data))
+                child.bind("<Button-1>", self._clicked)
+
+        if car_data is not None:
+            self.rebind(car_data)
+
+    def _clicked(self, event=None):
+        if self.on_click and self.car_data is not None:
+            self.on_click(self.car_data)
 
     def _hover(self, active):
         self.card.configure(borderwidth=2 if active else 1)
 
     def _create_card(self):
 
-        image_frame = tb.Frame(
+        self.image_frame = tb.Frame(
             self.card,
             padding=4,
             borderwidth=1,
@@ -51,111 +63,131 @@ class CarCard(tb.Frame):
             width=PHOTO_WIDTH,
             height=PHOTO_HEIGHT
         )
-        image_frame.pack(fill="x", pady=(0, 8))
-        image_frame.pack_propagate(False)
-
-        image_path = self.car_data.get("first_image_path")
-        has_images = self.car_data.get("has_images", False)
+        self.image_frame.pack(fill="x", pady=(0, 8))
+        self.image_frame.pack_propagate(False)
 
-        ok = self._try_load_image(image_frame, image_path)
-        if not ok:
-            self._show_placeholder(image_frame)
+        self.image_label = tb.Label(self.image_frame)
+        self.image_label.pack(expand=True)
+        self.image_caption = tb.Label(self.image_frame, font=("Segoe UI", 8),
+                                      bootstyle="secondary")
 
         info = tb.Frame(self.card)
         info.pack(fill="x")
 
-        title = f"{self.car_data.get('car_make', '')} {self.car_data.get('car_model', '')}"
-        tb.Label(info, text=title, font=("Segoe UI", 12, "bold")).pack(anchor="w")
-
-        tb.Label(info, text=f"Рік: {self.car_data.get('car_year', 'N/A')}",
-                 font=("Segoe UI", 9)).pack(anchor="w", pady=2)
+        self.title_label = tb.Label(info, font=("Segoe UI", 12, "bold"))
+        self.title_label.pack(anchor="w")
 
-        vin = self.car_data.get("vin_number", "N/A")
-        short_vin = f"{vin[:8]}...{vin[-4:]}" if len(str(vin)) > 12 else vin
-        tb.Label(info, text=f"VIN: {short_vin}",
-                 font=("Segoe UI", 8),
-                 bootstyle="secondary").pack(anchor="w", pady=2)
-
-        price = self.car_data.get("price_usd", 0)
-        tb.Label(info, text=f"${price:,.2f}",
-                 font=("Segoe UI", 12, "bold"),
-                 bootstyle="success").pack(anchor="w", pady=4)
+        self.year_label = tb.Label(info, font=("Segoe UI", 9))
+        self.year_label.pack(anchor="w", pady=2)
 
-        status = self.car_data.get("status_name", "Невідомо")
-        color = "success" if "україні" in status.lower() else "warning"
-        tb.Label(info, text=status,
-                 font=("Segoe UI", 8, "bold"),
-                 bootstyle=color,
-                 padding=4).pack(anchor="w", pady=4)
+        self.vin_label = tb.Label(info, font=("Segoe UI", 8), bootstyle="secondary")
+        self.vin_label.pack(anchor="w", pady=2)
 
-        self._add_days_counter()
+        self.price_label = tb.Label(info, font=("Segoe UI", 12, "bold"), bootstyle="success")
+        self.price_label.pack(anchor="w", pady=4)
 
-    def _try_load_image(self, parent, image_path):
-        if not image_path:
-            return False
+        self.status_label = tb.Label(info, font=("Segoe UI", 8, "bold"), padding=4)
+        self.status_label.pack(anchor="w", pady=4)
 
-        try:
-            if os.path.exists(image_path):
-                pil = Image.open(image_path)
-            elif image_path.startswith(("http://", "https://")):
-                req = urllib.request.Request(image_path, headers={"User-Agent": "Mozilla/5.0"})
-                ctx = ssl._create_unverified_context()
-                data = urllib.request.urlopen(req, timeout=15, context=ctx).read()
-                pil = Image.open(io.BytesIO(data))
-            else:
-                alt = os.path.join(ASSETS_DIR, image_path)
-                if os.path.exists(alt):
-                    pil = Image.open(alt)
-                else:
-                    return False
+        self.days_label = tb.Label(self.card, font=("Segoe UI", 8, "bold"), padding=4)
 
-            pil.thumbnail((PHOTO_WIDTH, PHOTO_HEIGHT), Image.Resampling.LANCZOS)
+    def rebind(self, car_data):
+        self.car_data = car_data
 
-            photo = ImageTk.PhotoImage(pil)
+        self._set_image(car_data.get("first_image_path"))
 
-            lbl = tb.Label(parent, image=photo)
-            lbl.image = photo
-            lbl.pack(expand=True)
+        title = f"{car_data.get('car_make', '')} {car_data.get('car_model', '')}"
+        self.title_label.configure(text=title)
+        self.year_label.configure(text=f"Рік: {car_data.get('car_year', 'N/A')}")
 
-            return True
+        vin = car_data.get("vin_number", "N/A")
+        short_vin = f"{vin[:8]}...{vin[-4:]}" if len(str(vin)) > 12 else vin
+        self.vin_label.configure(text=f"VIN: {short_vin}")
 
-        except Exception as e:
-            print("Ошибка загрузки изображения:", e)
-            return False
+        price = car_data.get("price_usd", 0)
+        self.price_label.configure(text=f"${price:,.2f}")
 
-    def _show_placeholder(self, parent):
-        placeholder = os.path.join(ASSETS_DIR, "placeholder.jpg")
+        status = car_data.get("status_name", "Невідомо")
+        color = "success" if "україні" in status.lower() else "warning"
+        self.status_label.configure(text=status, bootstyle=color)
+
+        self._update_days_counter()
+
+    def _set_image(self, image_path):
+        if image_path == self._image_path:
+            return
+        self._image_path = image_path
+
+        if self.image_loader is None:
+            self._image_loaded(image_path, self._try_load_image(image_path))
+            return
+
+        # Show the placeholder right away and swap the photo in when ready
+        self._show_placeholder()
+        if image_path:
+            self.image_loader.request(
+                image_path, (PHOTO_WIDTH, PHOTO_HEIGHT),
+                lambda photo, path=image_path: self._image_loaded(path, photo),
+                owner=self, key=("card", id(self))
+            )
+
+    def _image_loaded(self, image_path, photo):
+        if image_path != self._image_path:
+            return
+        if photo is None:
+            self._show_placeholder()
+            return
+
+        self.image_caption.pack_forget()
+        self.image_label.configure(image=photo, text="")
+        self.image_label.image = photo
+
+    def _try_load_image(self, image_path):
+        if not image_path:
+            return None
 
         try:
-            if os.path.exists(placeholder):
-                pil = Image.open(placeholder)
-                pil.thumbnail((PHOTO_WIDTH, PHOTO_HEIGHT), Image.Resampling.LANCZOS)
-
-                photo = ImageTk.PhotoImage(pil)
-                lbl = tb.Label(parent, image=photo)
-                lbl.image = photo
-                lbl.pack(expand=True)
+            return load_photo(image_path, (PHOTO_WIDTH, PHOTO_HEIGHT))
 
-                tb.Label(parent, text="Фото відсутнє", font=("Segoe UI", 8),
-                         bootstyle="secondary").pack(pady=2)
-                return
-        except:
-            pass
-
-        wrapper = tb.Frame(parent)
-        wrapper.pack(expand=True, fill="both")
-
-        tb.Label(wrapper, text="🚗", font=("Segoe UI", 42)).pack(expand=True)
-        tb.Label(wrapper, text="Немає фото",
-                 font=("Segoe UI", 8),
-                 bootstyle="secondary").pack()
-
-    def _add_days_counter(self):
+        except Exception as e:
+            print("Ошибка загрузки изображения:", e)
+            return None
+
+    @classmethod
+    def _placeholder(cls):
+        # Loaded once for all cards; False when there is no placeholder file
+        if cls._placeholder_photo is None:
+            cls._placeholder_photo = False
+            placeholder = os.path.join(ASSETS_DIR, "placeholder.jpg")
+            try:
+                if os.path.exists(placeholder):
+                    pil = load_thumbnail(placeholder, (PHOTO_WIDTH, PHOTO_HEIGHT))
+                    cls._placeholder_photo = ImageTk.PhotoImage(pil)
+            except:
+                pass
+        return cls._placeholder_photo
+
+    def _show_placeholder(self):
+        photo = self._placeholder()
+        if photo:
+            self.image_label.configure(image=photo, text="")
+            self.image_label.image = photo
+            self.image_caption.configure(text="Фото відсутнє")
+            self.image_caption.pack(pady=2)
+            return
+
+        self.image_label.configure(image="", text="🚗", font=("Segoe UI", 42))
+        self.image_label.image = None
+        self.image_caption.configure(text="Немає фото")
+        self.image_caption.pack()
+
+    def _update_days_counter(self):
         try:
             est = self.car_data.get("estimated_arrival_date")
             status = self.car_data.get("status_name", "").lower()
 
             if not est:
+                self.days_label.pack_forget()
                 return
 
             if isinstance(est, str):
@@ -178,13 +210,9 @@ class CarCard(tb.Frame):
                     txt = f"До прибуття: {diff} дн."
                     color = "warning" if diff > 7 else "success"
 
-            tb.Label(
-                self.card,
-                text=txt,
-                font=("Segoe UI", 8, "bold"),
-                bootstyle=color,
-                padding=4
-            ).pack(anchor="w", pady=4)
+            self.days_label.configure(text=txt, bootstyle=color)
+            self.days_label.pack(anchor="w", pady=4)
 
         except Exception as e:
+            self.days_label.pack_forget()
             print("Помилка розрахунку днів:", e)
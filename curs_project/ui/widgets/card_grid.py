@@ -0,0 +1,241 @@
+import sys
+from collections.abc import Sequence
+from tkinter import Canvas, ttk
+import ttkbootstrap as tb
+from ttkbootstrap.constants import *
+from config import CARD_COLUMNS, CARD_ROW_HEIGHT, CARD_OVERSCAN_ROWS, CARD_PREFETCH_ROWS
+from .car_card import CarCard
+
+
+# Scrollable grid of CarCards that only shows the rows in (or just around)
+# the viewport. Every row has the same height, so the scroll region is known
+# up front. Row widgets are pooled: rows that scroll out, or belong to an old
+# result set, are hidden and later moved and rebound to other purchases
+# instead of being destroyed and rebuilt.
+# When the items are only the first pages of a longer result (has_more),
+# on_near_end() is called whenever the viewport gets within `prefetch` rows
+# of the end, and the caller hands the next page to append_items().
+_FOOTER_HEIGHT = 50
+
+
+class VirtualCardGrid(tb.Frame):
+    def __init__(self, parent, on_click=None, image_loader=None, on_near_end=None,
+                 columns=CARD_COLUMNS, row_height=CARD_ROW_HEIGHT, overscan=CARD_OVERSCAN_ROWS,
+                 prefetch=CARD_PREFETCH_ROWS):
+        super().__init__(parent)
+
+        self.on_click = on_click
+        self.image_loader = image_loader
+        self.on_near_end = on_near_end
+        self.columns = columns
+        self.row_height = row_height
+        self.overscan = overscan
+        self.prefetch = prefetch
+
+        self._items = []
+        self._has_more = False
+        self._footer = None
+        self._rows = {}  # row index -> _RowSlot
+        self._free = []
+        self._message = None
+        self._refresh_job = None
+
+        self.canvas = Canvas(self, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_yscroll)
+
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.canvas.bind("<Configure>", self._on_configure)
+        self.bind("<Enter>", self._bind_wheel)
+        self.bind("<Leave>", self._unbind_wheel)
+        self.bind("<Destroy>", self._on_destroy)
+
+    @property
+    def row_count(self):
+        return (len(self._items) + self.columns - 1) // self.columns
+
+    def set_items(self, items, empty_text="", has_more=False):
+        self._clear()
+        # Lazy sequences (PurchaseRows) are kept: only visible rows are read
+        lazy = isinstance(items, Sequence) and not isinstance(items, (list, tuple))
+        self._items = items if lazy else list(items)
+        self._has_more = has_more and bool(self._items)
+        self.canvas.yview_moveto(0)
+        self._update_scrollregion()
+
+        if not self._items:
+            self.show_message(empty_text)
+            return
+        self._update_footer()
+        self._refresh()
+
+    def append_items(self, items, has_more=False):
+        if not self._items:
+            self.set_items(items, has_more=has_more)
+            return
+        # The last row may have been shown half-empty; let it be rebuilt
+        last = self.row_count - 1
+        if last in self._rows:
+            self._release(last)
+        if not isinstance(self._items, list):
+            self._items = list(self._items)
+        self._items.extend(items)
+        self._has_more = has_more
+        self._update_scrollregion()
+        self._update_footer()
+        self._refresh()
+
+    def show_message(self, text):
+        self._clear()
+        self._items = []
+        self._has_more = False
+        self._update_footer()
+        self._update_scrollregion()
+        self._message = tb.Label(self.canvas, text=text, font=("Segoe UI", 12))
+        self.canvas.create_window(max(self.canvas.winfo_width(), 1) // 2, 40,
+                                  window=self._message, anchor="n", tags="message")
+
+    def _clear(self):
+        for index in list(self._rows):
+            self._release(index)
+        if self._message is not None:
+            self.canvas.delete("message")
+            self._message.destroy()
+            self._message = None
+
+    def _release(self, index):
+        slot = self._rows.pop(index)
+        slot.hide()
+        self._free.append(slot)
+
+    def _update_scrollregion(self):
+        width = max(self.canvas.winfo_width(), 1)
+        height = self.row_count * self.row_height + (_FOOTER_HEIGHT if self._has_more else 0)
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+    def _update_footer(self):
+        if not self._has_more:
+            if self._footer is not None:
+                self.canvas.delete("footer")
+                self._footer.destroy()
+                self._footer = None
+            return
+        if self._footer is None:
+            self._footer = tb.Label(self.canvas, text="⏳ Завантаження...",
+                                    font=("Segoe UI", 10), bootstyle="secondary")
+            self.canvas.create_window(0, 0, window=self._footer, anchor="n", tags="footer")
+        self.canvas.coords("footer", max(self.canvas.winfo_width(), 1) // 2,
+                           self.row_count * self.row_height + 10)
+
+    def _on_configure(self, event):
+        self._update_scrollregion()
+        for slot in self._rows.values():
+            self.canvas.itemconfigure(slot.window, width=event.width)
+        for slot in self._free:
+            self.canvas.itemconfigure(slot.window, width=event.width)
+        if self._message is not None:
+            self.canvas.coords("message", event.width // 2, 40)
+        self._update_footer()
+        self._schedule_refresh()
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        if self._refresh_job is None:
+            self._refresh_job = self.after_idle(self._refresh)
+
+    def _visible_rows(self):
+        top = self.canvas.canvasy(0)
+        height = max(self.canvas.winfo_height(), self.row_height)
+        first = int(top // self.row_height) - self.overscan
+        last = int((top + height) // self.row_height) + self.overscan
+        return max(first, 0), min(last, self.row_count - 1)
+
+    def _refresh(self):
+        self._refresh_job = None
+        if not self._items:
+            return
+
+        first, last = self._visible_rows()
+        for index in [i for i in self._rows if i < first or i > last]:
+            self._release(index)
+
+        for index in range(first, last + 1):
+            if index not in self._rows:
+                slot = self._free.pop() if self._free else self._new_slot()
+                start = index * self.columns
+                slot.show(index * self.row_height, self._items[start:start + self.columns])
+                self._rows[index] = slot
+
+        if self._has_more and self.on_near_end and last >= self.row_count - 1 - self.prefetch:
+            self.on_near_end()
+
+    def _new_slot(self):
+        return _RowSlot(self.canvas, self.columns, self.row_height, self.on_click, self.image_loader)
+
+    def _bind_wheel(self, event=None):
+        if sys.platform.startswith("linux"):
+            self.bind_all("<Button-4>", lambda e: self.canvas.yview_scroll(-1, "units"))
+            self.bind_all("<Button-5>", lambda e: self.canvas.yview_scroll(1, "units"))
+        else:
+            self.bind_all("<MouseWheel>", self._on_wheel)
+
+    def _unbind_wheel(self, event=None):
+        # <Leave> also fires when the pointer moves onto one of the cards
+        if event is not None:
+            widget = self.winfo_containing(event.x_root, event.y_root)
+            if widget is not None and str(widget).startswith(str(self)):
+                return
+        if sys.platform.startswith("linux"):
+            self.unbind_all("<Button-4>")
+            self.unbind_all("<Button-5>")
+        else:
+            self.unbind_all("<MouseWheel>")
+
+    def _on_wheel(self, event):
+        step = -1 if event.delta > 0 else 1
+        if sys.platform == "darwin":
+            step = -event.delta
+        self.canvas.yview_scroll(step, "units")
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self._unbind_wheel()
+            if self._refresh_job is not None:
+                self.after_cancel(self._refresh_job)
+                self._refresh_job = None
+
+
+class _RowSlot:
+    def __init__(self, canvas, columns, row_height, on_click, image_loader):
+        self.canvas = canvas
+        self.frame = tb.Frame(canvas)
+        self.cards = []
+        for col in range(columns):
+            # Equal columns even when the last row is not full
+            self.frame.columnconfigure(col, weight=1, uniform="card")
+            self.cards.append(CarCard(self.frame, on_click=on_click, image_loader=image_loader))
+        self.frame.rowconfigure(0, weight=1)
+
+        self.window = canvas.create_window(
+            0, 0, window=self.frame, anchor="nw",
+            width=max(canvas.winfo_width(), 1), height=row_height
+        )
+
+    def show(self, y, items):
+        for col, card in enumerate(self.cards):
+            if col < len(items):
+                card.rebind(items[col])
+                card.grid(row=0, column=col, sticky="nsew", padx=8)
+            else:
+                card.grid_remove()
+        self.canvas.coords(self.window, 0, y)
+        self.canvas.itemconfigure(self.window, state="normal")
+
+    def hide(self):
+        self.canvas.itemconfigure(self.window, state="hidden")
+        self.canvas.coords(self.window, 0, -10000)
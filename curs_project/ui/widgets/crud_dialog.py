@@ -3,6 +3,7 @@ import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 from tkinter import ttk, messagebox
 from werkzeug.security import generate_password_hash
+from database import get_reference_data
 from .calendar_dialog import CalendarDialog
 from tkinter import Canvas
 
@@ -84,7 +85,7 @@ class ModernCRUDDialog:
             if self.mode == "add" and extra and "auto_increment" in extra.lower():
                 continue
 
-            if field in ['created_at', 'uploaded_at']:
+            if field in ['created_at', 'uploaded_at', 'updated_at', 'image_count', 'cover_image_id']:
                 continue
 
             field_frame = tb.Frame(self.scrollable_frame)
@@ -375,10 +376,7 @@ class ModernCRUDDialog:
 
         self._status_key_map = {}
         try:
-            cur = self.parent.conn.cursor()
-            cur.execute("SELECT status_id, status_key FROM statuses")
-            for sid, skey in cur.fetchall():
-                self._status_key_map[str(skey)] = int(sid)
+            self._status_key_map = get_reference_data().status_key_map()
         except Exception as e:
             print("status_key_map error:", e)
             self._status_key_map = {
@@ -409,17 +407,7 @@ class ModernCRUDDialog:
                 return
             country_id = int(country_id_part)
 
-            cur = self.parent.conn.cursor()
-            cur.execute(
-                """
-                SELECT location_id, location_name
-                FROM locations
-                WHERE country_id = %s
-                ORDER BY location_name
-                """,
-                (country_id,)
-            )
-            rows = cur.fetchall()
+            rows = get_reference_data().locations_for_country(country_id)
 
             loc_info = self.field_widgets["location_id"]
             loc_combo = loc_info["widget"]
@@ -477,34 +465,17 @@ class ModernCRUDDialog:
                 return
             location_id = int(loc_id_part)
 
-            cur = self.parent.conn.cursor()
-            cur.execute(
-                """
-                SELECT days_to_port, default_port_id
-                FROM locations
-                WHERE location_id = %s
-                """,
-                (location_id,)
-            )
-            loc_row = cur.fetchone()
+            reference = get_reference_data()
+            loc_row = reference.location(location_id)
             if not loc_row:
                 return
 
-            days_to_port, default_port_id = loc_row
-
-            cur.execute(
-                """
-                SELECT delivery_to_europe_days
-                FROM ports
-                WHERE port_id = %s
-                """,
-                (default_port_id,)
-            )
-            port_row = cur.fetchone()
+            days_to_port = loc_row["days_to_port"]
+            port_row = reference.port(loc_row["default_port_id"])
             if not port_row:
                 delivery_days = 0
             else:
-                delivery_days = port_row[0]
+                delivery_days = port_row["delivery_to_europe_days"]
 
             total_days = int(days_to_port) + int(delivery_days) + 7
             arrival_date = purchase_date + datetime.timedelta(days=total_days)
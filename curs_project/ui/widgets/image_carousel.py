@@ -1,24 +1,27 @@
 import os
-import io
-import datetime
-import urllib.request
-import ssl
 from tkinter import filedialog, messagebox
 from PIL import Image, ImageTk, ImageDraw
 import ttkbootstrap as tb
 from ttkbootstrap.constants import *
 import mysql.connector
 from mysql.connector import Error
-from config import ASSETS_DIR
+from config import CAROUSEL_PHOTO_SIZE, CAROUSEL_PREFETCH
+from database import refresh_image_summary, get_purchase_store
+from media import load_photo, ingest_image, resolve_source, is_asset_key, get_asset_store
+from ui.background import widget_alive
 
 class ImageCarousel(tb.Frame):
-    def __init__(self, parent, purchase_id, conn, current_user=None):
+    def __init__(self, parent, purchase_id, conn, current_user=None, executor=None,
+                 image_loader=None):
         super().__init__(parent)
         self.purchase_id = purchase_id
         self.conn = conn
+        self.executor = executor
+        self.image_loader = image_loader
         self.images = []
         self.current_index = 0
-        self.image_labels = []
+        self._placeholders = {}
+        self._prefetching = set()
         self.current_user = current_user
         self.can_edit = current_user and current_user.get('role') == 'admin'
         self._create_widgets()
@@ -36,6 +39,7 @@ class ImageCarousel(tb.Frame):
         
         self.carousel_frame = tb.Frame(self)
         self.carousel_frame.pack(fill="both", expand=True, pady=5)
+        self._build_view()
         
         nav_frame = tb.Frame(self)
         nav_frame.pack(fill="x", pady=5)
@@ -49,135 +53,210 @@ class ImageCarousel(tb.Frame):
         tb.Button(nav_frame, text="Наступна ▶", bootstyle="secondary",
                  command=self._next_image).pack(side="right", padx=5)
     
+    def _fetch_images(self, conn):
+        cur = conn.cursor(dictionary=True)
+        cur.execute("""
+            SELECT * FROM purchase_images 
+            WHERE purchase_id = %s 
+            ORDER BY image_type, uploaded_at
+        """, (self.purchase_id,))
+        images = cur.fetchall()
+        cur.close()
+        return images
+
+    def _show_images(self, images):
+        self.all_images = images
+        self.images = self.all_images
+        self.current_index = 0
+        self._display_current_image()
+
     def _load_images(self):
-        try:
-            cur = self.conn.cursor(dictionary=True)
-            cur.execute("""
-                SELECT * FROM purchase_images 
-                WHERE purchase_id = %s 
-                ORDER BY image_type, uploaded_at
-            """, (self.purchase_id,))
-            self.all_images = cur.fetchall()
-            cur.close()
-            
-            self.images = self.all_images
-            self.current_index = 0
-            self._display_current_image()
-            
-        except Error as e:
-            print(f"Помилка завантаження фото: {e}")
-    
+        if self.executor is None:
+            try:
+                self._show_images(self._fetch_images(self.conn))
+            except Error as e:
+                print(f"Помилка завантаження фото: {e}")
+            return
+
+        self._show_view(self.loading_label)
+
+        self.executor.submit(
+            self._fetch_images,
+            self._show_images,
+            lambda e: print(f"Помилка завантаження фото: {e}"),
+            owner=self,
+            key=("carousel", id(self))
+        )
+
+    # The photo view is built once; paging only swaps the image and texts
+    def _build_view(self):
+        self.loading_label = tb.Label(self.carousel_frame, text="⏳ Завантаження фото...",
+                                      font=("Segoe UI", 10), bootstyle="secondary")
+
+        self.empty_frame = tb.Frame(self.carousel_frame)
+        tb.Label(self.empty_frame, text="📷 Немає фото для цього авто",
+                font=("Segoe UI", 10), bootstyle="secondary").pack(pady=20)
+        if self.can_edit:
+            tb.Button(self.empty_frame, text="➕ Додати перше фото", bootstyle="success",
+                    command=self._add_image).pack(pady=10)
+
+        self.img_container = tb.Frame(self.carousel_frame)
+        self.error_label = tb.Label(self.img_container, text="❌ Помилка завантаження фото",
+                                    font=("Segoe UI", 10), bootstyle="danger")
+        self.img_label = tb.Label(self.img_container)
+        self.img_label.pack(pady=5)
+
+        info_frame = tb.Frame(self.img_container)
+        info_frame.pack(fill="x", pady=5)
+        self.type_label = tb.Label(info_frame, font=("Segoe UI", 9, "bold"))
+        self.type_label.pack()
+        self.notes_label = tb.Label(info_frame, font=("Segoe UI", 8), wraplength=400)
+
+        if self.can_edit:
+            btn_frame = tb.Frame(info_frame)
+            btn_frame.pack(pady=5)
+            tb.Button(btn_frame, text="✏️ Редагувати", bootstyle="warning",
+                    command=lambda: self._edit_image(self.images[self.current_index])).pack(side="left", padx=2)
+            tb.Button(btn_frame, text="🗑️ Видалити", bootstyle="danger",
+                    command=lambda: self._delete_image(self.images[self.current_index])).pack(side="left", padx=2)
+
+        self._views = {
+            self.loading_label: {"pady": 20},
+            self.empty_frame: {"expand": True},
+            self.img_container: {"fill": "both", "expand": True, "padx": 10, "pady": 5},
+        }
+
+    def _show_view(self, view):
+        for widget, options in self._views.items():
+            if widget is not view:
+                widget.pack_forget()
+            elif not widget.winfo_manager():
+                widget.pack(**options)
+
     def _display_current_image(self):
-        for widget in self.carousel_frame.winfo_children():
-            widget.destroy()
-        
         if not self.images:
-            no_images_frame = tb.Frame(self.carousel_frame)
-            no_images_frame.pack(expand=True)
-            tb.Label(no_images_frame, text="📷 Немає фото для цього авто",
-                    font=("Segoe UI", 10), bootstyle="secondary").pack(pady=20)
-            
-            if self.can_edit:
-                tb.Button(no_images_frame, text="➕ Додати перше фото", bootstyle="success",
-                        command=self._add_image).pack(pady=10)
-            
+            self._show_view(self.empty_frame)
             self.status_label.config(text="0 / 0")
+            self._cancel_prefetches(keep=())
             return
         
         current_img = self.images[self.current_index]
+        self._show_view(self.img_container)
         
-        img_container = tb.Frame(self.carousel_frame)
-        img_container.pack(fill="both", expand=True, padx=10, pady=5)
+        type_names = {
+            'auction': '🏛️ Аукціон',
+            'port': '⚓ Порт', 
+            'klaipeda': '🚢 Клайпеда'
+        }
         
-        try:
-            image_url = current_img['image_url']
-            pil_image = None
-            
-            if os.path.exists(image_url):
-                pil_image = Image.open(image_url)
-            elif image_url.startswith(('http://', 'https://')):
-                try:
-                    headers = {'User-Agent': 'Mozilla/5.0'}
-                    req = urllib.request.Request(image_url, headers=headers)
-                    ssl_context = ssl._create_unverified_context()
-                    response = urllib.request.urlopen(req, timeout=10, context=ssl_context)
-                    image_data = response.read()
-                    pil_image = Image.open(io.BytesIO(image_data))
-                except Exception as url_error:
-                    print(f"Помилка завантаження URL фото: {url_error}")
-                    pil_image = self._create_placeholder_image(current_img['image_type'])
-            else:
-                possible_paths = [
-                    image_url,
-                    os.path.join(ASSETS_DIR, image_url),
-                    os.path.join(os.path.dirname(__file__), image_url),
-                    os.path.join(os.path.dirname(__file__), "assets", image_url)
-                ]
-                
-                for path in possible_paths:
-                    if os.path.exists(path):
-                        pil_image = Image.open(path)
-                        break
-                
-                if not pil_image:
-                    pil_image = self._create_placeholder_image(current_img['image_type'])
-            
-            pil_image.thumbnail((500, 300), Image.Resampling.LANCZOS)
-            photo = ImageTk.PhotoImage(pil_image)
-            
-            img_label = tb.Label(img_container, image=photo)
-            img_label.image = photo
-            img_label.pack(pady=5)
-            
-            info_frame = tb.Frame(img_container)
-            info_frame.pack(fill="x", pady=5)
-            
-            type_names = {
-                'auction': '🏛️ Аукціон',
-                'port': '⚓ Порт', 
-                'klaipeda': '🚢 Клайпеда'
-            }
-            
-            type_name = type_names.get(current_img['image_type'], current_img['image_type'])
-            tb.Label(info_frame, text=f"Тип: {type_name}", 
-                    font=("Segoe UI", 9, "bold")).pack()
-            
-            if current_img.get('notes'):
-                tb.Label(info_frame, text=f"Примітки: {current_img['notes']}",
-                        font=("Segoe UI", 8), wraplength=400).pack()
+        type_name = type_names.get(current_img['image_type'], current_img['image_type'])
+        self.type_label.config(text=f"Тип: {type_name}")
         
-            if self.can_edit:
-                btn_frame = tb.Frame(info_frame)
-                btn_frame.pack(pady=5)
-                
-                tb.Button(btn_frame, text="✏️ Редагувати", bootstyle="warning",
-                        command=lambda: self._edit_image(current_img)).pack(side="left", padx=2)
-                tb.Button(btn_frame, text="🗑️ Видалити", bootstyle="danger",
-                        command=lambda: self._delete_image(current_img)).pack(side="left", padx=2)
-            
-            self.status_label.config(text=f"{self.current_index + 1} / {len(self.images)}")
-            
-        except Exception as e:
-            print(f"Помилка відображення фото: {e}")
-            error_frame = tb.Frame(img_container)
-            error_frame.pack(expand=True)
-            
-            tb.Label(error_frame, text="❌ Помилка завантаження фото",
-                    font=("Segoe UI", 10), bootstyle="danger").pack(pady=10)
-            
-            placeholder = self._create_placeholder_image(current_img['image_type'])
-            placeholder.thumbnail((500, 300), Image.Resampling.LANCZOS)
-            placeholder_photo = ImageTk.PhotoImage(placeholder)
-            
-            placeholder_label = tb.Label(error_frame, image=placeholder_photo)
-            placeholder_label.image = placeholder_photo
-            placeholder_label.pack(pady=10)
-            
-            tb.Label(error_frame, text="Файл пошкоджено або недоступний",
-                    font=("Segoe UI", 9), bootstyle="secondary").pack()
+        if current_img.get('notes'):
+            self.notes_label.config(text=f"Примітки: {current_img['notes']}")
+            self.notes_label.pack(after=self.type_label)
+        else:
+            self.notes_label.pack_forget()
+        
+        self.status_label.config(text=f"{self.current_index + 1} / {len(self.images)}")
+        # Stale prefetches go first, so they do not queue ahead of this photo
+        neighbours = self._neighbour_urls()
+        self._cancel_prefetches(keep=set(neighbours) | {current_img['image_url']})
+        self._show_photo(current_img)
+        self._prefetch(neighbours)
+
+    # With the image loader the placeholder stays up until the photo is
+    # decoded in the background; one already in memory replaces it before
+    # Tk redraws, one still on its way as a neighbour is shown by
+    # _prefetched(). Without a loader the photo is loaded in place.
+    def _show_photo(self, current_img):
+        image_url = current_img['image_url']
+        if self.image_loader is None:
+            try:
+                photo = load_photo(image_url, CAROUSEL_PHOTO_SIZE)
+            except Exception as e:
+                print(f"Помилка відображення фото: {e}")
+                photo = None
+            self._set_photo(current_img, photo)
+            return
+
+        self.error_label.pack_forget()
+        self._set_label_image(self._placeholder(current_img['image_type']))
+
+        if image_url in self._prefetching:
+            self.image_loader.cancel(("carousel", id(self)))
+            return
+
+        def apply(photo):
+            if self.images and self.images[self.current_index] is current_img:
+                self._set_photo(current_img, photo)
+
+        self.image_loader.request(image_url, CAROUSEL_PHOTO_SIZE, apply,
+                                  owner=self, key=("carousel", id(self)))
+
+    def _set_photo(self, current_img, photo):
+        if photo is None:
+            self.error_label.pack(before=self.img_label, pady=(10, 0))
+            photo = self._placeholder(current_img['image_type'])
+        else:
+            self.error_label.pack_forget()
+        self._set_label_image(photo)
+
+    def _set_label_image(self, photo):
+        self.img_label.configure(image=photo)
+        self.img_label.image = photo
+
+    def _placeholder(self, image_type):
+        photo = self._placeholders.get(image_type)
+        if photo is None:
+            pil_image = self._create_placeholder_image(image_type)
+            pil_image.thumbnail(CAROUSEL_PHOTO_SIZE, Image.Resampling.LANCZOS)
+            photo = ImageTk.PhotoImage(pil_image)
+            self._placeholders[image_type] = photo
+        return photo
+
+    # The CAROUSEL_PREFETCH photos on each side, nearest first, are decoded
+    # into the in-memory cache so that paging to them is only a swap.
+    def _neighbour_urls(self):
+        urls = []
+        if self.image_loader is None or len(self.images) < 2:
+            return urls
+
+        count = len(self.images)
+        current_url = self.images[self.current_index]['image_url']
+        for step in range(1, CAROUSEL_PREFETCH + 1):
+            for index in (self.current_index + step, self.current_index - step):
+                url = self.images[index % count]['image_url']
+                if url != current_url and url not in urls:
+                    urls.append(url)
+        return urls
+
+    def _prefetch_key(self, url):
+        return ("carousel-prefetch", id(self), url)
+
+    # A prefetch that is no longer next to the current photo is cancelled if
+    # it has not started (a started one still lands in the memory cache).
+    def _cancel_prefetches(self, keep):
+        for url in [url for url in self._prefetching if url not in keep]:
+            self._prefetching.discard(url)
+            self.image_loader.cancel(self._prefetch_key(url))
+
+    def _prefetch(self, urls):
+        for url in urls:
+            if url in self._prefetching:
+                continue
+            self._prefetching.add(url)
+            self.image_loader.request(url, CAROUSEL_PHOTO_SIZE,
+                                      lambda photo, url=url: self._prefetched(url, photo),
+                                      owner=self, key=self._prefetch_key(url))
+
+    def _prefetched(self, url, photo):
+        self._prefetching.discard(url)
+        if self.images and self.images[self.current_index]['image_url'] == url:
+            self._set_photo(self.images[self.current_index], photo)
     
     def _create_placeholder_image(self, image_type):
-        img = Image.new('RGB', (500, 300), color='#f8f9fa')
+        img = Image.new('RGB', CAROUSEL_PHOTO_SIZE, color='#f8f9fa')
         draw = ImageDraw.Draw(img)
         
         icons = {
@@ -327,13 +406,9 @@ class ImageCarousel(tb.Frame):
                         messagebox.showerror("Помилка", "Файл не знайдено")
                         return
                     
-                    filename = os.path.basename(file_path)
-                    assets_filename = f"{self.purchase_id}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}_{filename}"
-                    assets_path = os.path.join(ASSETS_DIR, assets_filename)
-                    
-                    import shutil
-                    shutil.copy2(file_path, assets_path)
-                    image_path = assets_path
+                    add_dialog.destroy()
+                    self._ingest_file(file_path, image_type, notes)
+                    return
                     
                 else:
                     url = self.url_var.get().strip()
@@ -347,14 +422,9 @@ class ImageCarousel(tb.Frame):
                     
                     image_path = url
                 
-                cur = self.conn.cursor()
-                cur.execute("""
-                    INSERT INTO purchase_images (purchase_id, image_url, image_type, notes)
-                    VALUES (%s, %s, %s, %s)
-                """, (self.purchase_id, image_path, image_type, notes))
-                
+                self._insert_image(self.conn, image_path, image_type, notes)
+                get_purchase_store().invalidate("purchase_images")
                 self.conn.commit()
-                cur.close()
                 
                 messagebox.showinfo("Успіх", "Фото успішно додано!")
                 add_dialog.destroy()
@@ -368,6 +438,74 @@ class ImageCarousel(tb.Frame):
         tb.Button(btn_frame, text="❌ Скасувати", bootstyle="secondary",
                  command=add_dialog.destroy).pack(side="right", padx=5)
     
+    def _insert_image(self, conn, image_path, image_type, notes):
+        cur = conn.cursor()
+        cur.execute("""
+            INSERT INTO purchase_images (purchase_id, image_url, image_type, notes)
+            VALUES (%s, %s, %s, %s)
+        """, (self.purchase_id, image_path, image_type, notes))
+        refresh_image_summary(cur, [self.purchase_id])
+        cur.close()
+
+    # The picked file is processed (orientation, metadata, size, display
+    # variants) and recorded in the background; a progress row stays above
+    # the photos until it is done.
+    def _ingest_file(self, file_path, image_type, notes):
+        progress_frame = tb.Frame(self)
+        progress_frame.pack(fill="x", padx=10, before=self.carousel_frame)
+        progress_label = tb.Label(progress_frame, text=f"⏳ {os.path.basename(file_path)}",
+                                  font=("Segoe UI", 9), bootstyle="secondary")
+        progress_label.pack(anchor="w")
+        progress_bar = tb.Progressbar(progress_frame, mode="determinate", bootstyle="success-striped")
+        progress_bar.pack(fill="x", pady=2)
+
+        def show_progress(done, total, text):
+            if widget_alive(progress_bar):
+                progress_bar.configure(maximum=total, value=done)
+                progress_label.configure(text=f"⏳ {os.path.basename(file_path)}: {text}")
+
+        def insert(conn, key):
+            try:
+                self._insert_image(conn, key, image_type, notes)
+                conn.commit()
+            finally:
+                get_asset_store().release(key)
+            return key
+
+        def done(key):
+            get_purchase_store().invalidate("purchase_images")
+            if widget_alive(self):
+                progress_frame.destroy()
+                self._load_images()
+
+        def failed(e):
+            if widget_alive(progress_frame):
+                progress_frame.destroy()
+            messagebox.showerror("Помилка", f"Помилка додавання фото: {str(e)}")
+
+        if self.executor is None or self.image_loader is None:
+            def sync_progress(*args):
+                show_progress(*args)
+                self.update_idletasks()
+
+            try:
+                key = insert(self.conn, ingest_image(file_path, progress=sync_progress))
+            except Exception as e:
+                failed(e)
+                return
+            done(key)
+            return
+
+        # The image work runs on the image pool, so a DB worker (and its
+        # pooled connection) is only busy for the INSERT. Neither step is
+        # tied to the carousel: the photo is recorded even if it is closed.
+        post = self.image_loader.dispatcher.post
+        self.image_loader.run(
+            lambda: ingest_image(file_path, progress=lambda *args: post(show_progress, *args)),
+            lambda key: self.executor.submit(lambda conn: insert(conn, key), done, failed),
+            failed
+        )
+
     def _toggle_source_fields(self, parent, source_type):
         for widget in self.source_container.winfo_children():
             widget.pack_forget()
@@ -427,6 +565,8 @@ class ImageCarousel(tb.Frame):
                     SET image_type = %s, notes = %s
                     WHERE image_id = %s
                 """, (type_var.get(), notes_text.get("1.0", "end-1c").strip(), image_data['image_id']))
+                refresh_image_summary(cur, [self.purchase_id])
+                get_purchase_store().invalidate("purchase_images")
                 
                 self.conn.commit()
                 cur.close()
@@ -445,6 +585,13 @@ class ImageCarousel(tb.Frame):
         tb.Button(btn_frame, text="❌ Скасувати", bootstyle="secondary",
                  command=edit_dialog.destroy).pack(side="right", padx=5)
     
+    def _image_url_used(self, image_url):
+        cur = self.conn.cursor()
+        cur.execute("SELECT COUNT(*) FROM purchase_images WHERE image_url = %s", (image_url,))
+        used = cur.fetchone()[0] > 0
+        cur.close()
+        return used
+
     def _delete_image(self, image_data):
         if not self.can_edit:
             messagebox.showwarning("Доступ заборонено", "Тільки адміністратор може видаляти фото")
@@ -455,29 +602,28 @@ class ImageCarousel(tb.Frame):
         
         try:
             image_url = image_data['image_url']
-            is_local_file = False
-            
-            possible_paths = [
-                image_url,
-                os.path.join(ASSETS_DIR, image_url),
-                os.path.join(os.path.dirname(__file__), image_url),
-                os.path.join(os.path.dirname(__file__), "assets", image_url)
-            ]
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    os.remove(path)
-                    is_local_file = True
-                    break
-            
-            if not is_local_file and not image_url.startswith(('http://', 'https://')):
-                print(f"⚠️ Файл не знайдено локально і не є URL: {image_url}")
             
             cur = self.conn.cursor()
             cur.execute("DELETE FROM purchase_images WHERE image_id = %s", (image_data['image_id'],))
+            refresh_image_summary(cur, [self.purchase_id])
+            get_purchase_store().invalidate("purchase_images")
             self.conn.commit()
             cur.close()
             
+            # Stored photos are shared by every row with the same content;
+            # the count runs after the commit, in a fresh snapshot
+            if is_asset_key(image_url):
+                get_asset_store().remove_unused(image_url, lambda: self._image_url_used(image_url))
+            elif not self._image_url_used(image_url):
+                resolved = resolve_source(image_url)
+                if resolved is not None and resolved[0] == "file":
+                    try:
+                        os.remove(resolved[1])
+                    except OSError as e:
+                        print(f"⚠️ Не вдалося видалити файл {resolved[1]}: {e}")
+                elif not image_url.startswith(('http://', 'https://')):
+                    print(f"⚠️ Файл не знайдено локально і не є URL: {image_url}")
+            
             messagebox.showinfo("Успіх", "Фото успішно видалено!")
             self._load_images()
             